@@ -2,4 +2,6 @@
 # -*- coding: utf-8 -*-
 from . import models
 from . import controllers
-from .controllers import main
\ No newline at end of file
+from . import wizard
+from . import cli
+from .controllers import main
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 {
     'name': 'Website Video Upload & Image Quality Preservation',
-    'version': '19.0.1.0.0',
+    'version': '19.0.1.4.0',
     'category': 'Website',
     'summary': 'Upload videos and preserve original high-quality product images',
     'description': '''
@@ -60,28 +60,45 @@ USAGE:
         'base',
     ],
     'data': [
+        'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/product_image_preserve_views.xml',
+        'views/video_asset_views.xml',
+        'wizard/product_image_import_wizard_views.xml',
     ],
     'assets': {
         'web.assets_backend': [
             # ERROR HANDLERS MUST LOAD FIRST - Critical for Python 3.12 compatibility
+            'website_video_upload/static/src/js/video_dom_observer.js',
             'website_video_upload/static/src/js/error_handlers.js',
+            # Loads website_video_upload.assets_video_uploader when the video tab is opened
+            'website_video_upload/static/src/js/video_uploader_loader.js',
+            'website_video_upload/static/src/xml/product_image_upload_templates.xml',
+            'website_video_upload/static/src/js/product_image_chunked_upload.js',
+            'website_video_upload/static/src/css/video_styles.css',
+            'website_video_upload/static/src/css/image_quality_preserve.css',
+        ],
+        'website_video_upload.assets_video_uploader': [
             'website_video_upload/static/src/xml/video_upload_templates.xml',
             'website_video_upload/static/src/js/video_selector_upload.js',
-            'website_video_upload/static/src/css/video_styles.css',
             'website_video_upload/static/src/css/video_upload.css',
-            'website_video_upload/static/src/css/image_quality_preserve.css',
         ],
         'web.assets_frontend': [
+            # Loads website_video_upload.assets_frontend_video on pages with local videos
+            'website_video_upload/static/src/js/video_bundle_loader.js',
+            'website_video_upload/static/src/css/image_quality_preserve.css',
+        ],
+        'website_video_upload.assets_frontend_video': [
             # ERROR HANDLERS MUST LOAD FIRST
+            'website_video_upload/static/src/js/video_dom_observer.js',
             'website_video_upload/static/src/js/error_handlers.js',
             'website_video_upload/static/src/js/video_frontend_processor.js',
             'website_video_upload/static/src/css/video_styles.css',
             'website_video_upload/static/src/css/video_upload.css',
-            'website_video_upload/static/src/css/image_quality_preserve.css',
         ],
         'website.assets_editor': [
             # ERROR HANDLERS MUST LOAD FIRST - Critical for website editor
+            'website_video_upload/static/src/js/video_dom_observer.js',
             'website_video_upload/static/src/js/error_handlers.js',
             'website_video_upload/static/src/js/video_selector_upload.js',
             'website_video_upload/static/src/css/video_styles.css',
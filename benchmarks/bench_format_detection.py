@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: format/dimension detection cost per created image
+
+Measures the detection step ``ProductImage.create`` runs on each
+``image_1920`` value, in-process: decoding the whole base64 value before
+parsing the header, versus ``probe_image_base64`` which only decodes its
+first bytes. This is one step of an import, not the import throughput:
+``create`` also stores the attachments and computes placeholders/hashes.
+
+Usage:
+    python3 benchmarks/bench_format_detection.py [--images 2000] [--size 1920x1080]
+"""
+
+import argparse
+import base64
+import importlib.util
+import io
+import os
+import time
+
+from PIL import Image
+
+# Load the probe helpers by path: importing them through the addon package
+# would pull in the whole Odoo server
+_PROBE_PATH = os.path.join(os.path.dirname(__file__), '..', 'tools', 'image_probe.py')
+_spec = importlib.util.spec_from_file_location('image_probe', _PROBE_PATH)
+image_probe = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(image_probe)
+
+
+def make_images(count, width, height):
+    """Return ``count`` base64 images alternating PNG/JPEG, like a CSV import"""
+    images = []
+    for index in range(count):
+        image = Image.effect_noise((width, height), 64).convert('RGB')
+        buffer = io.BytesIO()
+        image.save(buffer, format='PNG' if index % 2 else 'JPEG')
+        images.append(base64.b64encode(buffer.getvalue()).decode())
+    return images
+
+
+def probe_full_decode(image_data):
+    """Detection as it was: the whole value is decoded to read the header"""
+    return image_probe.parse_image_header(base64.b64decode(image_data))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--images', type=int, default=2000, help='Number of images per run')
+    parser.add_argument('--unique', type=int, default=50, help='Distinct images generated (reused cyclically)')
+    parser.add_argument('--size', default='1920x1080', help='Image size, WIDTHxHEIGHT')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per method (best is kept)')
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.lower().split('x'))
+    unique = make_images(min(args.unique, args.images), width, height)
+    images = [unique[i % len(unique)] for i in range(args.images)]
+    megabytes = sum(len(data) for data in images) / 1024 / 1024
+
+    print(f"{args.images} images ({width}x{height}, {megabytes:.0f} MB base64)")
+    print(f"{'method':>12} {'seconds':>9} {'images/s':>10} {'us/image':>9}")
+    for label, func in (('full decode', probe_full_decode), ('head only', image_probe.probe_image_base64)):
+        best = min(_timed(func, images) for _ in range(args.repeat))
+        print(f"{label:>12} {best:>9.3f} {args.images / best:>10.0f} {best / args.images * 1e6:>9.1f}")
+
+
+def _timed(func, images):
+    start = time.perf_counter()
+    results = [func(data) for data in images]
+    elapsed = time.perf_counter() - start
+    assert all(fmt for fmt, _w, _h in results), "detection failed"
+    return elapsed
+
+
+if __name__ == '__main__':
+    main()
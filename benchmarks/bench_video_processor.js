@@ -0,0 +1,104 @@
+// Driver of bench_video_processor.html, see there for usage
+
+const params = new URLSearchParams(window.location.search);
+const CARDS = parseInt(params.get('cards') || '20000');
+const VIDEOS = parseInt(params.get('videos') || '200');
+const BATCHES = parseInt(params.get('batches') || '50');
+const BATCH_CARDS = parseInt(params.get('batch_cards') || '20');
+
+// The benchmark logs its own numbers only
+const log = console.log;
+console.log = () => {};
+
+const CARD_HTML = `
+    <div class="col-lg-3"><div class="card">
+        <a href="#"><img class="card-img-top" src="data:," alt=""/></a>
+        <div class="card-body"><h6 class="card-title">Product</h6><span class="price">10.00</span></div>
+    </div></div>`;
+
+function videoHtml(index) {
+    switch (index % 3) {
+        case 0:
+            return `<div class="o_custom_video_container" data-is-local-video="true" data-video-loop="true">
+                        <video src="/web/video/bench_${index}.mp4"></video></div>`;
+        case 1:
+            return `<div class="media_iframe_video"><iframe src="/web/video/bench_${index}.mp4"></iframe></div>`;
+        default:
+            return `<img class="o_local_video_placeholder" data-is-local-video="true"
+                         data-video-src="/web/video/bench_${index}.mp4" src="data:,"/>`;
+    }
+}
+
+function makeSection(cards, videos, offset) {
+    const section = document.createElement('section');
+    const every = videos ? Math.max(1, Math.floor(cards / videos)) : 0;
+    let html = '<div class="container"><div class="row">';
+    for (let index = 0; index < cards; index++) {
+        html += CARD_HTML;
+        if (every && index % every === 0) {
+            html += videoHtml(offset + index);
+        }
+    }
+    section.innerHTML = html + '</div></div>';
+    return section;
+}
+
+// What the page did on each change before the shared observer: both scripts
+// queried the whole document, and the processor ran all its selectors again
+function legacyRescan() {
+    document.querySelectorAll('.o_custom_video_container[data-is-local-video="true"]:not(.video-processed)');
+    document.querySelectorAll('.o_custom_video_container[data-is-local-video="true"]');
+    document.querySelectorAll('iframe').forEach(iframe => iframe.src || iframe.getAttribute('data-src'));
+    document.querySelectorAll('img.o_local_video_placeholder[data-is-local-video="true"]');
+    document.querySelectorAll('img.o_we_background_video[data-is-local-video="true"]');
+    document.querySelectorAll('.o_custom_video_container, .o_product_video_container')
+        .forEach(container => container.querySelector('video'));
+}
+
+const nextFrame = () => new Promise(resolve => requestAnimationFrame(() => requestAnimationFrame(resolve)));
+
+async function run() {
+    const { processLocalVideos } = await import('@website_video_upload/js/video_frontend_processor');
+    const { observerStats } = await import('@website_video_upload/js/video_dom_observer');
+    const page = document.getElementById('page');
+
+    page.appendChild(makeSection(CARDS, VIDEOS, 0));
+    let start = performance.now();
+    const initial = processLocalVideos();
+    const initialTime = performance.now() - start;
+    const elements = document.getElementsByTagName('*').length;
+    await nextFrame();
+    // Sources are only attached near the viewport or on click
+    const videos = document.querySelectorAll('video[data-is-local-video], .o_custom_video_container video');
+    const requested = [...videos].filter(video => video.getAttribute('src')).length;
+
+    let legacyTime = 0;
+    for (let batch = 0; batch < BATCHES; batch++) {
+        start = performance.now();
+        legacyRescan();
+        legacyTime += performance.now() - start;
+    }
+
+    Object.assign(observerStats, { batches: 0, roots: 0, time: 0 });
+    for (let batch = 0; batch < BATCHES; batch++) {
+        page.appendChild(makeSection(BATCH_CARDS, 1, CARDS + batch * BATCH_CARDS));
+        await nextFrame();
+    }
+    const remaining = document.querySelectorAll('iframe[src*="/web/video/"], img.o_local_video_placeholder').length;
+
+    const results = [
+        `Page: ${elements} elements, ${VIDEOS} videos`,
+        `Initial pass: ${initial} elements processed in ${initialTime.toFixed(1)} ms`,
+        `Videos loading a source after the initial pass: ${requested} of ${videos.length}`,
+        `${BATCHES} added snippets of ${BATCH_CARDS} cards:`,
+        `  incremental (shared observer): ${observerStats.time.toFixed(1)} ms over ${observerStats.batches} flushes `
+            + `(${(observerStats.time / BATCHES).toFixed(2)} ms per snippet)`,
+        `  full-document rescans:         ${legacyTime.toFixed(1)} ms `
+            + `(${(legacyTime / BATCHES).toFixed(2)} ms per snippet)`,
+        `Unconverted placeholders left: ${remaining}`,
+    ].join('\n');
+    document.getElementById('results').textContent = results;
+    log(results);
+}
+
+run();
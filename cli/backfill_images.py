@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+Command line entry point for the product image metadata backfill
+
+Usage:
+    ./odoo-bin backfill_product_images -d mydb [--batch-size 500] [--workers 8]
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+from odoo.api import Environment, SUPERUSER_ID
+from odoo.cli import Command
+from odoo.modules.registry import Registry
+from odoo.tools import config
+
+from ..models.product_image_backfill import BACKFILL_WORKERS_PARAM
+
+_logger = logging.getLogger(__name__)
+
+
+class BackfillProductImages(Command):
+    """Fill original format/dimensions and placeholders on existing product images"""
+    name = 'backfill_product_images'
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog=f'{Path(sys.argv[0]).name} {self.name}',
+            description=self.__doc__,
+        )
+        parser.add_argument('-c', '--config', dest='config', help='Odoo configuration file')
+        parser.add_argument('-d', '--database', dest='db_name', required=True, help='Database name')
+        parser.add_argument('--batch-size', type=int, default=None, help='Records per batch (default: MigrationSettings.BATCH_SIZE)')
+        parser.add_argument('--workers', type=int, default=None, help='Header parsing processes (default: backfill_workers parameter, then CPU count)')
+        parser.add_argument('--max-batches', type=int, default=None, help='Stop after this many batches (resumable)')
+        args = parser.parse_args(cmdargs)
+
+        config_args = ['-d', args.db_name]
+        if args.config:
+            config_args += ['-c', args.config]
+        config.parse_config(config_args)
+
+        registry = Registry(args.db_name)
+        with registry.cursor() as cr:
+            env = Environment(cr, SUPERUSER_ID, {})
+            workers = (args.workers
+                       or int(env['ir.config_parameter'].sudo().get_param(BACKFILL_WORKERS_PARAM, 0))
+                       or os.cpu_count())
+            stats = env['product.image']._backfill_original_info(
+                batch_size=args.batch_size,
+                max_batches=args.max_batches,
+                workers=workers,
+            )
+        print(
+            "Processed {processed} images ({updated} updated) in {elapsed:.1f}s "
+            "- {rate:.1f} images/s - last id {last_id} - done: {done}".format(**stats)
+        )
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Command line entry point for bulk product image imports
+
+Usage:
+    ./odoo-bin import_product_images -d mydb --source /srv/drop.zip [--pattern REGEX]
+        [--match-field default_code|barcode|name] [--batch-size 500] [--workers 8]
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from odoo.api import Environment, SUPERUSER_ID
+from odoo.cli import Command
+from odoo.modules.registry import Registry
+from odoo.tools import config
+
+_logger = logging.getLogger(__name__)
+
+
+class ImportProductImages(Command):
+    """Create product images from a ZIP archive or a directory"""
+    name = 'import_product_images'
+
+    def run(self, cmdargs):
+        parser = argparse.ArgumentParser(
+            prog=f'{Path(sys.argv[0]).name} {self.name}',
+            description=self.__doc__,
+        )
+        parser.add_argument('-c', '--config', dest='config', help='Odoo configuration file')
+        parser.add_argument('-d', '--database', dest='db_name', required=True, help='Database name')
+        parser.add_argument('--source', required=True, help='ZIP archive or directory of images')
+        parser.add_argument('--pattern', default=None, help='File name regex, "ref" group identifies the product')
+        parser.add_argument('--match-field', default='default_code', choices=['default_code', 'barcode', 'name'])
+        parser.add_argument('--batch-size', type=int, default=None, help='Images per create/commit (default: MigrationSettings.BATCH_SIZE)')
+        parser.add_argument('--workers', type=int, default=None, help='Decoding processes (default: CPU count)')
+        parser.add_argument('--no-prewarm', action='store_true', help='Do not pre-generate responsive variants')
+        args = parser.parse_args(cmdargs)
+
+        config_args = ['-d', args.db_name]
+        if args.config:
+            config_args += ['-c', args.config]
+        config.parse_config(config_args)
+
+        registry = Registry(args.db_name)
+        with registry.cursor() as cr:
+            env = Environment(cr, SUPERUSER_ID, {})
+            stats = env['product.image']._bulk_import_images(
+                args.source,
+                pattern=args.pattern,
+                match_field=args.match_field,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                prewarm=not args.no_prewarm,
+            )
+        print(
+            "Created {created} images from {processed} files in {elapsed:.1f}s "
+            "- {rate:.1f} files/s - {variants} variants".format(**stats)
+        )
+        for label, names in (('unmatched', stats['unmatched']), ('invalid', stats['invalid'])):
+            if names:
+                print(f"{len(names)} {label}: {', '.join(names[:50])}")
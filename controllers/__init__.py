@@ -1,3 +1,6 @@
 # -*- coding: utf-8 -*-
 from . import main
 from . import image_quality
+from . import website_sale
+from . import product_image_upload
+from . import product_image_storage
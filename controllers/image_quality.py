@@ -4,11 +4,24 @@ Web image serving override to maintain quality
 """
 
 from odoo.http import request, Response, route, Controller
+from odoo.tools import config, str2bool
 import base64
 import logging
+import os
+
+from ..ADVANCED_CONFIG import CacheSettings
+from ..tools.image_variants import (
+    FORMAT_MIMETYPES, cache_path, resize_to_width, variant_widths, write_cache_file,
+)
+from ..tools.lossless_optimize import lossless_alternate
 
 _logger = logging.getLogger(__name__)
 
+PRESERVED_IMAGE_MODELS = ['product.image', 'product.template', 'product.product']
+
+# Negotiated lossless alternates, most compact first
+ALTERNATE_FORMATS = [('AVIF', 'image/avif'), ('WEBP', 'image/webp')]
+
 
 class ImageQualityPreserveController(Controller):
     """Controller to serve original quality product images"""
@@ -20,7 +33,7 @@ class ImageQualityPreserveController(Controller):
         """Serve original unprocessed images for product models"""
         try:
             # Only serve product images with quality preservation
-            if model in ['product.image', 'product.template', 'product.product']:
+            if model in PRESERVED_IMAGE_MODELS:
                 record = request.env[model].sudo().browse(int(id))
                 if record and hasattr(record, 'image_1920') and record.image_1920:
                     image_data = base64.b64decode(record.image_1920)
@@ -39,10 +52,101 @@ class ImageQualityPreserveController(Controller):
                         }
                         mimetype = mime_map.get(fmt, 'image/jpeg')
                     
+                    headers = []
+                    if self._lossless_alternates_enabled():
+                        # Same URL, different bytes per Accept header
+                        headers.append(('Vary', 'Accept'))
+                        alternate = self._get_lossless_alternate(record, image_data)
+                        if alternate:
+                            image_data, mimetype = alternate
+
                     _logger.info(f"Serving {mimetype} image for {model} ID {id}")
-                    return Response(image_data, mimetype=mimetype, direct_passthrough=True)
+                    return Response(image_data, mimetype=mimetype, headers=headers, direct_passthrough=True)
         except Exception as e:
             _logger.warning(f"Error serving image: {e}")
         
         # For non-product images, let Odoo handle it normally
         return request.env['ir.http']._serve_files(model, id, field, filename=filename, **kwargs)
+
+    @route('/web/image_variant/<string:model>/<int:id>/<int:width>',
+           type='http', auth='public', csrf=False)
+    def serve_product_image_variant(self, model, id, width, **kwargs):
+        """Serve a narrower copy of a preserved product image for srcset
+
+        Variants keep the original format and are generated lazily into a
+        checksum-keyed directory of the filestore, so a new image gets new
+        variants and stale ones are never served.
+        """
+        if model not in PRESERVED_IMAGE_MODELS:
+            return request.not_found()
+        record = request.env[model].sudo().browse(int(id)).exists()
+        if not record:
+            return request.not_found()
+
+        image_format, original_width, _height = record._get_original_image_info()
+        attachment = record._get_preserved_image_attachment()
+        if not attachment or width not in variant_widths(original_width, image_format):
+            return request.not_found()
+
+        variant_path = self._get_cache_path('image_variants', attachment.checksum, f"{width}w")
+        try:
+            if os.path.exists(variant_path):
+                with open(variant_path, 'rb') as f:
+                    image_data = f.read()
+            else:
+                quality = int(request.env['ir.config_parameter'].sudo().get_param('website.image.quality', 95))
+                image_data, image_format = resize_to_width(attachment.raw, width, quality=quality)
+                if not image_data:
+                    return request.not_found()
+                write_cache_file(variant_path, image_data)
+                _logger.info(f"Generated {width}w variant for {model} ID {id}")
+        except Exception as e:
+            _logger.warning(f"Error serving image variant: {e}")
+            return request.not_found()
+
+        return Response(
+            image_data,
+            mimetype=FORMAT_MIMETYPES.get((image_format or '').upper(), 'image/jpeg'),
+            headers=[('Cache-Control', f'public, max-age={CacheSettings.CACHE_DURATION}')],
+            direct_passthrough=True,
+        )
+
+    def _get_cache_path(self, kind, checksum, suffix):
+        """Filestore cache path of a derived image for the current database"""
+        return cache_path(config.filestore(request.db), kind, checksum, suffix)
+
+    def _lossless_alternates_enabled(self):
+        param = request.env['ir.config_parameter'].sudo()
+        return str2bool(param.get_param('website_video_upload.serve_lossless_alternates', 'False'), False)
+
+    def _get_lossless_alternate(self, record, image_data):
+        """Return ``(bytes, mimetype)`` of a smaller pixel-identical alternate the client accepts
+
+        Alternates are generated on first request into a checksum-keyed
+        filestore cache; an empty cache file records that no smaller
+        lossless alternate exists. The stored original is never modified.
+        """
+        accepted = {value for value, quality in request.httprequest.accept_mimetypes if quality > 0}
+        formats = [(fmt, mimetype) for fmt, mimetype in ALTERNATE_FORMATS if mimetype in accepted]
+        if not formats:
+            return None
+        attachment = record._get_preserved_image_attachment()
+        if not attachment or not attachment.checksum:
+            return None
+        for fmt, mimetype in formats:
+            path = self._get_cache_path('image_alternates', attachment.checksum, fmt.lower())
+            try:
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        alternate = f.read()
+                else:
+                    alternate = lossless_alternate(image_data, fmt) or b''
+                    write_cache_file(path, alternate)
+                    _logger.info(f"Generated lossless {fmt} alternate for {record._name} ID {record.id}: "
+                                 f"{len(alternate) or 'not smaller'}")
+            except Exception as e:
+                _logger.warning(f"Error generating {fmt} alternate: {e}")
+                continue
+            if alternate:
+                return alternate, mimetype
+        return None
@@ -2,12 +2,16 @@
 import base64
 import logging
 import os
-import json
 from odoo import http
 from odoo.exceptions import AccessError, ValidationError
 
+from ..tools.video_probe import probe_video
+
 _logger = logging.getLogger(__name__)
 
+# Batch routes act as superuser: only website designers may call them
+VIDEO_BATCH_GROUP = 'website.group_website_designer'
+
 
 class VideoUploadController(http.Controller):
     """Controller to handle video file uploads"""
@@ -106,15 +110,15 @@ class VideoUploadController(http.Controller):
                     'public': True,
                     'res_model': 'ir.ui.view',  # Associate with views (website content)
                     'res_id': 0,
-                    'description': json.dumps({
-                        'original_filename': filename,
-                        'video_options': {
-                            'autoplay': False,
-                            'loop': False,
-                            'hideControls': False,
-                            'hideFullscreen': False,
-                        }
-                    }),
+                })
+                http.request.env['video.asset'].sudo().create({
+                    'name': filename,
+                    'attachment_id': attachment.id,
+                    'storage_key': safe_filename,
+                    'mimetype': mimetype,
+                    'checksum': hashlib.sha1(file_bytes).hexdigest(),
+                    'file_size': file_size,
+                    **probe_video(file_path),
                 })
                 
                 _logger.info(f"Created video attachment ID: {attachment.id}, URL: {video_url}")
@@ -213,6 +217,23 @@ class VideoUploadController(http.Controller):
             _logger.exception(f"Error serving video {filename}")
             return http.request.not_found()
     
+    @http.route(
+        "/web/video_poster/<filename>",
+        type="http",
+        auth="public",
+        methods=["GET"],
+    )
+    def get_video_poster(self, filename, **kw):
+        """Serve the poster frame of a video, shown before it is loaded"""
+        asset = http.request.env['video.asset'].sudo().search([
+            ('storage_key', '=', filename),
+            ('status', '=', 'ready'),
+        ], limit=1)
+        if not asset or not asset.with_context(bin_size=True).poster:
+            return http.request.not_found()
+        stream = http.request.env['ir.binary']._get_image_stream_from(asset, 'poster')
+        return stream.get_response(immutable=bool(kw.get('unique')))
+
     @http.route(
         "/web/video/save-options",
         type="json",
@@ -222,20 +243,11 @@ class VideoUploadController(http.Controller):
     def save_video_options(self, attachment_id, options, **kw):
         """Save video control options to attachment"""
         try:
-            attachment = http.request.env['ir.attachment'].sudo().browse(int(attachment_id))
-            if attachment.exists():
-                # Get existing description (might have other data)
-                try:
-                    current_desc = json.loads(attachment.description) if attachment.description else {}
-                except:
-                    current_desc = {}
-                
-                # Update video options
-                current_desc['video_options'] = options
-                
-                # Store updated description
-                attachment.description = json.dumps(current_desc)
-                
+            asset = http.request.env['video.asset'].sudo().search(
+                [('attachment_id', '=', int(attachment_id))], limit=1,
+            )
+            if asset:
+                asset.write(asset._options_to_vals(options))
                 _logger.info(f"Saved options for video {attachment_id}: {options}")
                 return {'success': True, 'message': 'Options saved'}
         except Exception as e:
@@ -249,55 +261,41 @@ class VideoUploadController(http.Controller):
         auth="user",
         methods=["POST"],
     )
-    def list_uploaded_videos(self):
-        """Return list of uploaded videos for suggestions - ONLY videos, not documents"""
+    def list_uploaded_videos(self, search=None, mimetypes=None, min_size=None, max_size=None,
+                             date_from=None, date_to=None, cursor=None, limit=None, etag=None, **kw):
+        """Return one page of uploaded videos for suggestions - ONLY videos, not documents
+
+        Pass the returned ``next_cursor`` as ``cursor`` to get the next page.
+        Pass the ``etag`` of a previous answer to get ``not_modified`` back
+        instead of the videos when the library did not change since.
+        """
         try:
-            # Get all video attachments that are URL type (not binary)
-            videos = http.request.env['ir.attachment'].sudo().search([
-                ('mimetype', 'in', [
-                    'video/mp4',
-                    'video/webm',
-                    'video/ogg',
-                    'video/quicktime',
-                    'video/x-msvideo',
-                ]),
-                ('type', '=', 'url'),
-                ('public', '=', True),
-                ('res_model', '=', 'ir.ui.view'),
-            ], order='create_date desc', limit=50)
-            
-            result = []
-            for video in videos:
-                video_url = video.url or f'/web/content/{video.id}'
-                
-                # Try to parse options from description
-                options = {
-                    'autoplay': False,
-                    'loop': False,
-                    'hideControls': False,
-                    'hideFullscreen': False,
-                }
-                try:
-                    if video.description:
-                        desc_data = json.loads(video.description)
-                        if 'video_options' in desc_data:
-                            options.update(desc_data['video_options'])
-                except:
-                    pass
-                
-                result.append({
-                    'id': video.id,
-                    'name': video.name,
-                    'url': video_url,
-                    'mimetype': video.mimetype,
-                    'create_date': video.create_date.isoformat() if video.create_date else None,
-                    'options': options,
-                })
+            VideoAsset = http.request.env['video.asset'].sudo()
+            params = {
+                'search': search,
+                'mimetypes': mimetypes,
+                'min_size': min_size,
+                'max_size': max_size,
+                'date_from': date_from,
+                'date_to': date_to,
+                'cursor': cursor,
+                'limit': limit,
+            }
+            current_etag, _key = VideoAsset._get_library_etag(**params)
+            if etag and etag == current_etag:
+                return {'success': True, 'not_modified': True, 'etag': current_etag}
+
+            current_etag, page = VideoAsset._get_library_page(**params)
+            result = page['videos']
             
-            _logger.info(f"Found {len(result)} uploaded videos (URL type only)")
+            _logger.info(f"Found {len(result)} uploaded videos")
             return {
                 'success': True,
                 'videos': result,
+                'next_cursor': page['next_cursor'],
+                'total': page['total'],
+                'total_is_estimate': page['total_is_estimate'],
+                'etag': current_etag,
             }
         except Exception as e:
             _logger.exception("Error fetching video list")
@@ -324,32 +322,24 @@ class VideoUploadController(http.Controller):
                     'error': 'Video not found',
                 }
             
-            # Check if user has permission
-            if attachment.type != 'url' or not attachment.url.startswith('/web/video/'):
+            asset = http.request.env['video.asset'].sudo().search(
+                [('attachment_id', '=', attachment.id)], limit=1,
+            )
+            if not asset:
                 return {
                     'success': False,
                     'error': 'Invalid video attachment',
                 }
             
-            # Extract filename from URL
-            video_url = attachment.url
-            filename = video_url.replace('/web/video/', '')
-            
-            # Delete physical file
-            try:
-                from odoo.tools import config
-                filestore_path = config.filestore(http.request.db)
-                video_path = os.path.join(filestore_path, 'videos', filename)
-                
-                if os.path.exists(video_path):
-                    os.remove(video_path)
-                    _logger.info(f"Deleted video file: {video_path}")
-            except Exception as e:
-                _logger.warning(f"Could not delete video file: {e}")
+            if asset.usage_count:
+                return {
+                    'success': False,
+                    'error': f'Video "{asset.name}" is used on {asset.usage_count} pages',
+                }
             
-            # Delete attachment record
-            video_name = attachment.name
-            attachment.unlink()
+            # Delete the asset, its attachment and the physical file
+            video_name = asset.name
+            asset._delete_videos()
             
             _logger.info(f"Deleted video attachment ID: {attachment_id}, name: {video_name}")
             
@@ -363,4 +353,58 @@ class VideoUploadController(http.Controller):
             return {
                 'success': False,
                 'error': f'Delete error: {str(e)}',
-            }
\ No newline at end of file
+            }
+
+    def _can_batch_edit_videos(self):
+        return http.request.env.user.has_group(VIDEO_BATCH_GROUP)
+
+    @http.route(
+        "/web/video/delete/batch",
+        type="jsonrpc",
+        auth="user",
+        methods=["POST"],
+    )
+    def delete_uploaded_videos(self, attachment_ids):
+        """Delete several uploaded videos in one transaction, one result per id"""
+        if not self._can_batch_edit_videos():
+            return {'success': False, 'error': 'Access denied'}
+        try:
+            results = http.request.env['video.asset'].sudo()._batch_delete(attachment_ids)
+            return {'success': True, 'results': results}
+        except Exception as e:
+            _logger.exception("Error batch deleting videos")
+            return {'success': False, 'error': f'Delete error: {str(e)}'}
+
+    @http.route(
+        "/web/video/save-options/batch",
+        type="jsonrpc",
+        auth="user",
+        methods=["POST"],
+    )
+    def save_videos_options(self, patches, **kw):
+        """Save ``[{'attachment_id', 'options'}]`` option patches in one transaction"""
+        if not self._can_batch_edit_videos():
+            return {'success': False, 'error': 'Access denied'}
+        try:
+            results = http.request.env['video.asset'].sudo()._batch_update_options(patches)
+            return {'success': True, 'results': results}
+        except Exception as e:
+            _logger.exception("Error batch saving video options")
+            return {'success': False, 'error': str(e)}
+
+    @http.route(
+        "/web/video/metadata/batch",
+        type="jsonrpc",
+        auth="user",
+        methods=["POST"],
+    )
+    def get_videos_metadata(self, attachment_ids):
+        """Return the metadata and options of several videos, one result per id"""
+        if not self._can_batch_edit_videos():
+            return {'success': False, 'error': 'Access denied'}
+        try:
+            results = http.request.env['video.asset'].sudo()._batch_metadata(attachment_ids)
+            return {'success': True, 'results': results}
+        except Exception as e:
+            _logger.exception("Error fetching video metadata")
+            return {'success': False, 'error': str(e)}
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""
+CSV export of the product image storage ledger
+"""
+
+from odoo import http
+from odoo.http import request
+import csv
+import io
+
+
+class ProductImageStorageController(http.Controller):
+    """Controller exporting what preserved product images cost in the filestore"""
+
+    @http.route("/web/product_image/storage_report.csv", type="http", auth="user")
+    def export_storage_report(self, **kw):
+        """One row per product, image owner and image field, plus a total row"""
+        if not request.env.user.has_group('base.group_system'):
+            return request.not_found()
+
+        groups = request.env['product.image.storage.line']._read_group(
+            [],
+            groupby=['product_tmpl_id', 'res_model', 'res_field'],
+            aggregates=['__count', 'file_size:sum', 'physical_size:sum', 'blob_share:sum'],
+            order='product_tmpl_id, res_model, res_field',
+        )
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(['Product ID', 'Product', 'Image Of', 'Image Field', 'Attachments',
+                         'Logical Bytes', 'Physical Bytes', 'Blobs'])
+        totals = [0, 0, 0.0, 0.0]
+        for template, res_model, res_field, count, logical, physical, blobs in groups:
+            writer.writerow([template.id or '', template.display_name or '', res_model or '', res_field or '',
+                             count, logical, round(physical), round(blobs, 2)])
+            totals = [totals[0] + count, totals[1] + logical, totals[2] + physical, totals[3] + blobs]
+        writer.writerow(['', 'Total', '', '', totals[0], totals[1], round(totals[2]), round(totals[3], 2)])
+
+        return request.make_response(buffer.getvalue(), headers=[
+            ('Content-Type', 'text/csv; charset=utf-8'),
+            ('Content-Disposition', 'attachment; filename="product_image_storage.csv"'),
+        ])
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""
+Chunked streaming upload of large product image originals
+
+The browser sends the raw file in chunks; each chunk is streamed to a
+temporary file in the filestore, so neither the browser nor the server
+ever holds the whole image in memory or as base64.
+"""
+
+from odoo import http
+from odoo.exceptions import AccessError, UserError
+from odoo.http import request
+from odoo.tools import config
+import json
+import logging
+import os
+import time
+import uuid
+
+from ..tools.image_probe import probe_image_source
+
+_logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 8 * 1024 * 1024
+STREAM_BLOCK_SIZE = 1024 * 1024
+# Unfinished uploads older than this are removed when a new one starts
+STALE_UPLOAD_AGE = 24 * 3600
+
+
+class ProductImageUploadController(http.Controller):
+    """Controller for chunked uploads of product image originals"""
+
+    def _get_uploads_dir(self):
+        uploads_dir = os.path.join(config.filestore(request.db), 'product_image_uploads')
+        os.makedirs(uploads_dir, exist_ok=True)
+        return uploads_dir
+
+    def _get_upload(self, upload_id):
+        """Return ``(part_path, meta)`` of an upload started by the current user"""
+        try:
+            upload_id = uuid.UUID(upload_id).hex
+        except (ValueError, TypeError, AttributeError):
+            raise UserError("Invalid upload")
+        part_path = os.path.join(self._get_uploads_dir(), f"{upload_id}.part")
+        try:
+            with open(f"{part_path}.json") as f:
+                meta = json.load(f)
+        except OSError:
+            raise UserError("Upload not found or expired")
+        if meta['uid'] != request.env.uid:
+            raise AccessError("Upload started by another user")
+        return part_path, meta
+
+    def _remove_stale_uploads(self, uploads_dir):
+        now = time.time()
+        for name in os.listdir(uploads_dir):
+            path = os.path.join(uploads_dir, name)
+            try:
+                if now - os.path.getmtime(path) > STALE_UPLOAD_AGE:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    @http.route(
+        "/web/product_image/upload/start",
+        type="jsonrpc",
+        auth="user",
+        methods=["POST"],
+    )
+    def upload_start(self, filename, size):
+        """Open an upload session for a file of ``size`` bytes"""
+        try:
+            if not request.env['product.image'].has_access('write'):
+                return {'success': False, 'error': 'Not allowed to edit product images'}
+            param = request.env['ir.config_parameter'].sudo()
+            max_size = int(param.get_param('website_video_upload.max_original_upload_size', 500 * 1024 * 1024))
+            if int(size) > max_size:
+                return {'success': False, 'error': f"File too large. Maximum {max_size // (1024 * 1024)}MB."}
+
+            uploads_dir = self._get_uploads_dir()
+            self._remove_stale_uploads(uploads_dir)
+            upload_id = uuid.uuid4().hex
+            part_path = os.path.join(uploads_dir, f"{upload_id}.part")
+            open(part_path, 'wb').close()
+            with open(f"{part_path}.json", 'w') as f:
+                json.dump({'uid': request.env.uid, 'filename': filename, 'size': int(size)}, f)
+
+            _logger.info(f"Large image upload started: {filename}, {size} bytes")
+            return {'success': True, 'upload_id': upload_id, 'chunk_size': CHUNK_SIZE}
+        except Exception as e:
+            _logger.exception("Error starting image upload")
+            return {'success': False, 'error': str(e)}
+
+    @http.route(
+        "/web/product_image/upload/chunk/<string:upload_id>",
+        type="http",
+        auth="user",
+        methods=["POST"],
+    )
+    def upload_chunk(self, upload_id, offset=0, **kw):
+        """Write the raw request body at ``offset``; retrying a chunk is safe
+
+        The first chunk is sniffed right away so non-images are rejected
+        before the rest of the file is sent.
+        """
+        try:
+            part_path, meta = self._get_upload(upload_id)
+            offset = int(offset)
+            if offset > os.path.getsize(part_path):
+                raise UserError("Chunk out of order")
+
+            stream = request.httprequest.stream
+            written = 0
+            with open(part_path, 'r+b') as f:
+                f.seek(offset)
+                for block in iter(lambda: stream.read(STREAM_BLOCK_SIZE), b''):
+                    written += len(block)
+                    if offset + written > meta['size']:
+                        raise UserError("More data than announced")
+                    f.write(block)
+                f.truncate(offset + written)
+
+            result = {'success': True, 'received': offset + written}
+            if offset == 0:
+                image_format, width, height = probe_image_source(part_path)
+                if not image_format:
+                    os.remove(part_path)
+                    os.remove(f"{part_path}.json")
+                    raise UserError("The uploaded file is not a supported image")
+                result.update({'format': image_format, 'width': width, 'height': height})
+            return request.make_json_response(result)
+        except (UserError, AccessError) as e:
+            return request.make_json_response({'success': False, 'error': str(e)}, status=400)
+        except Exception as e:
+            _logger.exception("Error writing image upload chunk")
+            return request.make_json_response({'success': False, 'error': str(e)}, status=500)
+
+    @http.route(
+        "/web/product_image/upload/finish",
+        type="jsonrpc",
+        auth="user",
+        methods=["POST"],
+    )
+    def upload_finish(self, upload_id, product_image_id=None, product_tmpl_id=None, name=None):
+        """Attach the completed file to a product image, creating it if needed"""
+        try:
+            part_path, meta = self._get_upload(upload_id)
+            if os.path.getsize(part_path) != meta['size']:
+                return {'success': False, 'error': 'Upload incomplete'}
+
+            ProductImage = request.env['product.image']
+            if product_image_id:
+                product_image = ProductImage.browse(int(product_image_id)).exists()
+                if not product_image:
+                    return {'success': False, 'error': 'Product image not found'}
+            elif product_tmpl_id:
+                product_image = ProductImage.create({
+                    'name': name or meta['filename'].rsplit('.', 1)[0],
+                    'product_tmpl_id': int(product_tmpl_id),
+                })
+            else:
+                return {'success': False, 'error': 'No product image or product given'}
+            product_image.check_access('write')
+
+            product_image.sudo()._attach_original_from_file(part_path)
+            os.remove(f"{part_path}.json")
+            return {
+                'success': True,
+                'product_image_id': product_image.id,
+                'format': product_image.original_format,
+                'dimensions': product_image.original_dimensions,
+            }
+        except (UserError, AccessError) as e:
+            return {'success': False, 'error': str(e)}
+        except Exception as e:
+            _logger.exception("Error finishing image upload")
+            return {'success': False, 'error': str(e)}
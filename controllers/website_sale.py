@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""
+website_sale integration: preload the main product image
+"""
+
+from odoo import http
+from odoo.http import request
+from odoo.tools import str2bool
+from odoo.addons.website_sale.controllers.main import WebsiteSale
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class WebsiteSaleImagePreload(WebsiteSale):
+    """Announce the product hero image (the LCP element) in the response headers"""
+
+    @http.route()
+    def product(self, product, category='', search='', **kwargs):
+        response = super().product(product, category=category, search=search, **kwargs)
+        try:
+            link = self._get_product_image_preload_link(self._get_product_main_image(product, response))
+            if link:
+                response.headers.add('Link', link)
+        except Exception as e:
+            _logger.warning(f"Could not add image preload link for product {product.id}: {e}")
+        return response
+
+    def _get_product_main_image(self, product, response):
+        """Return the record whose ``image_1920`` is the first image of the product page
+
+        The page renders the images of the displayed variant (itself first,
+        then its extra images), so the preload must use the same record and
+        URLs: ``product.product``, not the template.
+        """
+        qcontext = getattr(response, 'qcontext', None) or {}
+        record = qcontext.get('product_variant') or product
+        images = record.sudo()._get_images()
+        return images[0] if images else None
+
+    def _get_product_image_preload_link(self, image):
+        """Return a ``Link: rel=preload`` value for the main product ``image`` record
+
+        Only emitted when the image is rendered with our srcset, so that
+        ``imagesrcset``/``imagesizes`` match the <img> exactly and the
+        browser reuses the preloaded candidate instead of fetching twice.
+        A CDN or proxy that supports 103 Early Hints (e.g. Cloudflare)
+        turns this header into an early hint; WSGI cannot send 1xx itself.
+        """
+        if not image:
+            return None
+        param = request.env['ir.config_parameter'].sudo()
+        if not str2bool(param.get_param('website_video_upload.preload_product_image', 'True'), True):
+            return None
+        attrs = image.sudo()._get_responsive_image_attrs('image_1920')
+        if not attrs.get('srcset'):
+            return None
+        largest = attrs['srcset'].rsplit(', ', 1)[-1].rsplit(' ', 1)[0]
+        return (
+            f'<{largest}>; rel=preload; as=image; fetchpriority=high; '
+            f'imagesrcset="{attrs["srcset"]}"; imagesizes="{attrs["sizes"]}"'
+        )
@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+Move video options and metadata out of ir.attachment.description into video.asset
+"""
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['video.asset']._migrate_from_attachments()
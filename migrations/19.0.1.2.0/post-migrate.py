@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+Index the views and HTML fields already embedding uploaded videos
+"""
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['video.usage']._rebuild_usage_index()
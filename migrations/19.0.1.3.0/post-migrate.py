@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+"""
+Render the local-video placeholders of existing pages into final <video> markup
+"""
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env['video.usage']._normalize_indexed_markup()
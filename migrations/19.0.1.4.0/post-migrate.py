@@ -0,0 +1,13 @@
+# -*- coding: utf-8 -*-
+"""
+Account the images of products and variants in the storage ledger and
+generate the posters of existing videos
+"""
+
+from odoo import api, SUPERUSER_ID
+
+
+def migrate(cr, version):
+    env = api.Environment(cr, SUPERUSER_ID, {})
+    env.ref('website_video_upload.ir_cron_rebuild_image_storage_ledger')._trigger()
+    env.ref('website_video_upload.ir_cron_generate_video_posters')._trigger()
@@ -0,0 +1,22 @@
+# -*- coding: utf-8 -*-
+"""
+Fill the owner columns of the existing storage ledger lines before the
+registry makes them required
+"""
+
+from odoo.tools.sql import table_exists
+
+
+def migrate(cr, version):
+    if not table_exists(cr, 'product_image_storage_line'):
+        return
+    cr.execute("""
+        ALTER TABLE product_image_storage_line
+            ADD COLUMN IF NOT EXISTS res_model varchar,
+            ADD COLUMN IF NOT EXISTS res_id integer
+    """)
+    cr.execute("""
+        UPDATE product_image_storage_line
+           SET res_model = 'product.image', res_id = product_image_id
+         WHERE res_id IS NULL
+    """)
@@ -1,3 +1,17 @@
 # -*- coding: utf-8 -*-
 from . import product_image_preserve
 from . import image_quality_config
+from . import product_image_backfill
+from . import product_image_responsive
+from . import product_image_optimize
+from . import product_image_placeholder
+from . import product_image_duplicate
+from . import product_image_import
+from . import product_image_upload
+from . import product_image_storage
+from . import video_asset
+from . import video_gc
+from . import video_usage
+from . import video_file_deletion
+from . import video_markup
+from . import video_poster
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+"""
+Backfill of original format/dimensions, placeholders and perceptual hashes for pre-existing product images
+Resumable keyset-ordered batches, image parsing spread over a process pool
+"""
+
+from odoo import models, api
+import logging
+import time
+
+from ..tools.image_derivatives import probe_image_derivatives
+from ..tools.image_probe import make_pool, pool_map
+from ..ADVANCED_CONFIG import MigrationSettings
+
+_logger = logging.getLogger(__name__)
+
+BACKFILL_CURSOR_PARAM = 'website_video_upload.backfill_last_id'
+BACKFILL_WORKERS_PARAM = 'website_video_upload.backfill_workers'
+
+
+class ProductImage(models.Model):
+    _inherit = 'product.image'
+
+    @api.model
+    def _backfill_image_sources(self, images):
+        """Return ``{image_id: path_or_bytes}`` for the ``image_1920`` of ``images``
+
+        Filestore attachments are handed to the workers as paths so that the
+        parent process never loads the image bytes.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        attachments = Attachment.search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', 'in', images.ids),
+        ])
+        sources = {}
+        for attachment in attachments:
+            if attachment.store_fname:
+                sources[attachment.res_id] = Attachment._full_path(attachment.store_fname)
+            elif attachment.raw:
+                sources[attachment.res_id] = attachment.raw
+        return sources
+
+    @api.model
+    def _backfill_original_info(self, batch_size=None, max_batches=None, workers=None, commit=True):
+        """Fill ``original_format``/``original_dimensions``, placeholders and hashes on existing images
+
+        Records are processed in ``id`` order, batch by batch. The last
+        processed id is checkpointed in ``ir.config_parameter`` after each
+        batch (and committed when ``commit`` is set) so an interrupted run
+        resumes where it stopped.
+
+        :return: dict with ``processed``, ``updated``, ``elapsed``, ``rate``
+                 (records per second), ``last_id`` and ``done``
+        """
+        stats = {'processed': 0, 'updated': 0, 'elapsed': 0.0, 'rate': 0.0, 'last_id': 0, 'done': True}
+        if not MigrationSettings.RECOVER_ORIGINAL_FORMAT:
+            _logger.info("Backfill skipped: RECOVER_ORIGINAL_FORMAT is disabled")
+            return stats
+
+        param = self.env['ir.config_parameter'].sudo()
+        batch_size = batch_size or MigrationSettings.BATCH_SIZE
+        # In-process by default: crons run in server threads, only the CLI forks a pool
+        workers = workers or 1
+        last_id = int(param.get_param(BACKFILL_CURSOR_PARAM, 0))
+        stats['last_id'] = last_id
+
+        executor = make_pool(workers)
+        start = time.monotonic()
+        batches = 0
+        try:
+            while max_batches is None or batches < max_batches:
+                images = self.sudo().with_context(prefetch_fields=False).search([
+                    ('id', '>', last_id),
+                    '|', '|', '|', ('original_format', '=', False), ('dominant_color', '=', False),
+                    ('image_phash', '=', False), ('image_color_signature', '=', False),
+                ], order='id', limit=batch_size)
+                if not images:
+                    param.set_param(BACKFILL_CURSOR_PARAM, 0)
+                    stats['done'] = True
+                    break
+
+                sources = self._backfill_image_sources(images)
+                ids = [image_id for image_id in images.ids if image_id in sources]
+                payload = [sources[image_id] for image_id in ids]
+                results = pool_map(executor, probe_image_derivatives, payload, workers)
+
+                for image_id, info in zip(ids, results):
+                    vals = {}
+                    if info['format']:
+                        vals.update({
+                            'original_format': info['format'],
+                            'original_dimensions': f"{info['width']} x {info['height']} px",
+                        })
+                    if info['color']:
+                        vals.update({
+                            'placeholder_data_uri': info['placeholder'],
+                            'dominant_color': info['color'],
+                        })
+                    if info['phash']:
+                        vals.update({
+                            'image_phash': info['phash'],
+                            'image_color_signature': info['color_signature'],
+                        })
+                    if vals:
+                        self.browse(image_id).sudo().write(vals)
+                        stats['updated'] += 1
+
+                last_id = images[-1].id
+                param.set_param(BACKFILL_CURSOR_PARAM, last_id)
+                if commit:
+                    self.env.cr.commit()
+
+                batches += 1
+                stats['processed'] += len(images)
+                stats['last_id'] = last_id
+                stats['done'] = False
+                elapsed = time.monotonic() - start
+                _logger.info(
+                    "Backfill batch %s: %s images processed (%s updated), last id %s, %.1f images/s",
+                    batches, stats['processed'], stats['updated'], last_id,
+                    stats['processed'] / elapsed if elapsed else 0.0,
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+
+        stats['elapsed'] = time.monotonic() - start
+        stats['rate'] = stats['processed'] / stats['elapsed'] if stats['elapsed'] else 0.0
+        _logger.info(
+            "Backfill finished: %(processed)s processed, %(updated)s updated in %(elapsed).1fs "
+            "(%(rate).1f images/s), done: %(done)s", stats,
+        )
+        return stats
+
+    @api.model
+    def _cron_backfill_original_info(self, max_batches=50):
+        """Cron entry point: bounded run that re-triggers itself until done"""
+        stats = self._backfill_original_info(max_batches=max_batches)
+        if not stats['done']:
+            self.env.ref('website_video_upload.ir_cron_backfill_product_image_info')._trigger()
+        return stats
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+"""
+Perceptual duplicate detection across product images
+dHash and colour signature per image, multi-index hashing on indexed
+segments, merge onto one blob
+"""
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+import base64
+import logging
+
+from ..tools.image_phash import (
+    FLAT_SEGMENTS, MAX_COLOR_DISTANCE, MAX_INDEXED_DISTANCE, SEGMENTS, color_distance, hamming_distance,
+    hash_segments, is_informative_hash, perceptual_hashes, perceptual_hashes_from_base64,
+)
+
+_logger = logging.getLogger(__name__)
+
+DUPLICATE_DISTANCE_PARAM = 'website_video_upload.duplicate_max_distance'
+# Candidate pairs are read from the cursor in chunks
+CANDIDATE_FETCH_SIZE = 10000
+
+
+def _looks_alike(signature_a, signature_b, max_distance):
+    """Whether two ``(hash, color_signature)`` pairs are close in both shape and colour"""
+    (hash_a, color_a), (hash_b, color_b) = signature_a, signature_b
+    if not (hash_a and hash_b and color_a and color_b):
+        return False
+    return (
+        hamming_distance(hash_a, hash_b) <= max_distance
+        and color_distance(color_a, color_b) <= MAX_COLOR_DISTANCE
+    )
+
+
+class ProductImage(models.Model):
+    _inherit = 'product.image'
+
+    image_phash = fields.Char(
+        string='Perceptual Hash',
+        help='64-bit difference hash of the image, equal for re-exports of the same picture',
+        readonly=True,
+        index=True
+    )
+
+    image_color_signature = fields.Char(
+        string='Colour Signature',
+        help='Mean colour of a 2x2 grid of the image: the perceptual hash ignores colour',
+        readonly=True
+    )
+
+    # Multi-index hashing: one indexed column per 16-bit hash segment
+    phash_seg0 = fields.Integer(compute='_compute_phash_segments', store=True, index=True)
+    phash_seg1 = fields.Integer(compute='_compute_phash_segments', store=True, index=True)
+    phash_seg2 = fields.Integer(compute='_compute_phash_segments', store=True, index=True)
+    phash_seg3 = fields.Integer(compute='_compute_phash_segments', store=True, index=True)
+
+    duplicate_of_id = fields.Many2one(
+        'product.image',
+        string='Duplicate Of',
+        help='Image this one is a perceptual duplicate of, set by the duplicate scan',
+        readonly=True,
+        index='btree_not_null',
+        ondelete='set null'
+    )
+
+    @api.depends('image_phash')
+    def _compute_phash_segments(self):
+        """Index the informative segments only
+
+        Solid or near-uniform images and flat bands (e.g. a white top
+        margin) would match every other such image, turning the candidate
+        join quadratic: they are left NULL and never become candidates.
+        """
+        for record in self:
+            segments = [False] * SEGMENTS
+            if record.image_phash and is_informative_hash(record.image_phash):
+                segments = [
+                    segment if segment not in FLAT_SEGMENTS else False
+                    for segment in hash_segments(record.image_phash)
+                ]
+            for index, segment in enumerate(segments):
+                record[f'phash_seg{index}'] = segment
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Hash new images, bulk imports pass hashes computed in their own pool"""
+        for vals in vals_list:
+            if vals.get('image_1920') and 'image_phash' not in vals:
+                image_hash, color_signature = perceptual_hashes_from_base64(vals['image_1920'])
+                vals['image_phash'] = image_hash or False
+                vals['image_color_signature'] = color_signature or False
+        return super().create(vals_list)
+
+    def write(self, vals):
+        """Re-hash replaced images"""
+        if 'image_1920' in vals:
+            image_hash, color_signature = None, None
+            if vals['image_1920']:
+                image_hash, color_signature = perceptual_hashes(base64.b64decode(vals['image_1920']))
+            vals['image_phash'] = image_hash or False
+            vals['image_color_signature'] = color_signature or False
+            if 'duplicate_of_id' not in vals:
+                vals['duplicate_of_id'] = False
+        return super().write(vals)
+
+    @api.model
+    def _get_duplicate_max_distance(self):
+        param = self.env['ir.config_parameter'].sudo()
+        distance = int(param.get_param(DUPLICATE_DISTANCE_PARAM, MAX_INDEXED_DISTANCE))
+        # Larger distances would need smaller segments to stay exhaustive
+        return max(0, min(distance, MAX_INDEXED_DISTANCE))
+
+    @api.model
+    def _find_duplicate_candidates(self):
+        """Yield ``(id_a, hash_a, color_a, id_b, hash_b, color_b)`` for pairs sharing an indexed segment
+
+        Rows are streamed from the cursor: no other query may run on it
+        until the generator is exhausted.
+        """
+        self.flush_model([
+            'image_phash', 'image_color_signature', 'phash_seg0', 'phash_seg1', 'phash_seg2', 'phash_seg3',
+        ])
+        queries = [
+            SQL(
+                """SELECT a.id, a.image_phash, a.image_color_signature, b.id, b.image_phash, b.image_color_signature
+                     FROM product_image a
+                     JOIN product_image b ON b.%(segment)s = a.%(segment)s AND b.id > a.id
+                    WHERE a.%(segment)s IS NOT NULL""",
+                segment=SQL.identifier(f'phash_seg{index}'),
+            )
+            for index in range(SEGMENTS)
+        ]
+        self.env.cr.execute(SQL(' UNION ').join(queries))
+        while rows := self.env.cr.fetchmany(CANDIDATE_FETCH_SIZE):
+            yield from rows
+
+    @api.model
+    def _scan_duplicates(self):
+        """Group perceptual duplicates and point each group at its best image
+
+        The kept image of a group is the one with the most pixels, then the
+        most bytes, then the oldest. Candidate pairs only partition the
+        images: every member is checked against the keeper itself, so a
+        chain of near pairs never merges two images that are far apart.
+        Returns the number of groups found.
+        """
+        max_distance = self._get_duplicate_max_distance()
+        parent = {}
+        signatures = {}
+
+        def find(image_id):
+            while parent.setdefault(image_id, image_id) != image_id:
+                parent[image_id] = parent[parent[image_id]]
+                image_id = parent[image_id]
+            return image_id
+
+        for id_a, hash_a, color_a, id_b, hash_b, color_b in self._find_duplicate_candidates():
+            if _looks_alike((hash_a, color_a), (hash_b, color_b), max_distance):
+                signatures[id_a], signatures[id_b] = (hash_a, color_a), (hash_b, color_b)
+                parent[find(id_a)] = find(id_b)
+
+        components = {}
+        for image_id in parent:
+            components.setdefault(find(image_id), []).append(image_id)
+        components = [ids for ids in components.values() if len(ids) > 1]
+
+        self.sudo().search([('duplicate_of_id', '!=', False)]).write({'duplicate_of_id': False})
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', 'in', [image_id for ids in components for image_id in ids]),
+        ])
+        file_sizes = {attachment.res_id: attachment.file_size for attachment in attachments}
+
+        def quality_key(image):
+            _format, width, height = image._get_original_image_info()
+            return ((width or 0) * (height or 0), file_sizes.get(image.id, 0), -image.id)
+
+        groups = 0
+        for ids in components:
+            remaining = self.sudo().browse(ids)
+            while len(remaining) > 1:
+                keeper = max(remaining, key=quality_key)
+                members = (remaining - keeper).filtered(
+                    lambda image: _looks_alike(signatures[image.id], signatures[keeper.id], max_distance)
+                )
+                if members:
+                    members.write({'duplicate_of_id': keeper.id})
+                    groups += 1
+                remaining -= keeper | members
+
+        _logger.info(f"Duplicate scan: {groups} groups, max distance {max_distance}")
+        return groups
+
+    @api.model
+    def _cron_scan_duplicates(self):
+        return self._scan_duplicates()
+
+    def action_scan_duplicates(self):
+        groups = self._scan_duplicates()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _("%s groups of duplicate images found.", groups),
+                'type': 'info',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+    def action_merge_duplicates(self):
+        """Replace each selected duplicate by the blob of the image it duplicates
+
+        The filestore deduplicates attachments by checksum, so all merged
+        images (and their replicated size fields) share a single file.
+        """
+        duplicates = self.filtered('duplicate_of_id')
+        if not duplicates:
+            raise UserError(_("None of the selected images is a detected duplicate."))
+        keepers = duplicates.duplicate_of_id
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', 'in', keepers.ids),
+        ])
+        blobs = {attachment.res_id: attachment.raw for attachment in attachments}
+        merged = 0
+        for keeper in keepers:
+            if keeper.id not in blobs:
+                continue
+            group = duplicates.filtered(lambda image: image.duplicate_of_id == keeper)
+            group.with_context(skip_lossless_optimize=True).write({
+                'image_1920': base64.b64encode(blobs[keeper.id]),
+                'duplicate_of_id': False,
+            })
+            merged += len(group)
+        _logger.info(f"Merged {merged} duplicate product images onto {len(keepers)} originals")
+        return True
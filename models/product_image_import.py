@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Bulk import of product images from a ZIP archive or a local directory
+Streams entries, sniffs them in a process pool, creates in batches
+"""
+
+from odoo import models, api
+from odoo.tools import config
+import base64
+import itertools
+import logging
+import os
+import re
+import time
+import zipfile
+
+from ..ADVANCED_CONFIG import MigrationSettings
+from ..tools.image_derivatives import probe_image_derivatives
+from ..tools.image_probe import make_pool, pool_map
+from ..tools.image_variants import cache_path, generate_variant_files, variant_widths
+
+_logger = logging.getLogger(__name__)
+
+IMPORT_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.tif', '.tiff', '.bmp')
+
+# "SKU123.jpg", "SKU123_2.png", "SKU123-back.jpeg" -> "SKU123"
+DEFAULT_FILENAME_PATTERN = r'^(?P<ref>[^_\-.\s]+)'
+
+
+class ProductImage(models.Model):
+    _inherit = 'product.image'
+
+    @api.model
+    def _iter_import_entries(self, source):
+        """Yield ``(filename, path_or_bytes)`` for the images of a ZIP or directory
+
+        ``source`` is a directory path, a ZIP path or a binary file object.
+        ZIP members are read one at a time; directory files are handed over
+        as paths so they are only read when needed.
+        """
+        if isinstance(source, str) and os.path.isdir(source):
+            for root, dirs, files in os.walk(source):
+                dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+                for name in sorted(files):
+                    if not name.startswith('.') and name.lower().endswith(IMPORT_EXTENSIONS):
+                        yield name, os.path.join(root, name)
+            return
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                if (info.is_dir() or info.filename.startswith('__MACOSX/') or name.startswith('.')
+                        or not name.lower().endswith(IMPORT_EXTENSIONS)):
+                    continue
+                yield name, archive.read(info)
+
+    @api.model
+    def _match_import_products(self, refs, match_field='default_code'):
+        """Return ``{ref: product.template}`` for the references found in a batch"""
+        if not refs:
+            return {}
+        if match_field == 'name':
+            templates = self.env['product.template'].search([('name', 'in', list(refs))])
+            return {template.name: template for template in templates}
+        variants = self.env['product.product'].with_context(active_test=False).search([
+            (match_field, 'in', list(refs)),
+        ])
+        return {variant[match_field]: variant.product_tmpl_id for variant in variants}
+
+    def _prewarm_image_variants(self, executor=None, workers=1):
+        """Generate the srcset width variants of these images into the filestore cache"""
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', 'in', self.ids),
+        ])
+        filestore = config.filestore(self.env.cr.dbname)
+        quality = int(self.env['ir.config_parameter'].sudo().get_param('website.image.quality', 95))
+        tasks = []
+        for attachment in attachments:
+            if not attachment.store_fname or not attachment.checksum:
+                continue
+            image_format, width, _height = self.browse(attachment.res_id)._get_original_image_info()
+            targets = [
+                (variant, cache_path(filestore, 'image_variants', attachment.checksum, f"{variant}w"))
+                for variant in variant_widths(width, image_format)
+            ]
+            if targets:
+                tasks.append((attachment._full_path(attachment.store_fname), targets, quality))
+        return sum(pool_map(executor, generate_variant_files, tasks, workers))
+
+    @api.model
+    def _bulk_import_images(self, source, pattern=None, match_field='default_code',
+                            batch_size=None, workers=None, commit=True, prewarm=True):
+        """Create ``product.image`` rows for every matching file of ``source``
+
+        File names are matched to products with ``pattern`` (a regex whose
+        ``ref`` group, or whole match, is looked up on ``match_field``).
+        Each batch is sniffed in a process pool, created with one ``create``
+        call and committed when ``commit`` is set.
+
+        :return: dict with ``processed``, ``created``, ``unmatched`` and
+                 ``invalid`` file names, ``variants``, ``elapsed`` and ``rate``
+        """
+        regex = re.compile(pattern or DEFAULT_FILENAME_PATTERN)
+        batch_size = batch_size or MigrationSettings.BATCH_SIZE
+        workers = workers or os.cpu_count() or 1
+        stats = {'processed': 0, 'created': 0, 'unmatched': [], 'invalid': [], 'variants': 0,
+                 'elapsed': 0.0, 'rate': 0.0}
+        start = time.monotonic()
+        executor = make_pool(workers)
+        entries = self._iter_import_entries(source)
+        try:
+            while True:
+                batch = list(itertools.islice(entries, batch_size))
+                if not batch:
+                    break
+                stats['processed'] += len(batch)
+
+                refs = {}
+                for filename, data in batch:
+                    match = regex.search(os.path.splitext(filename)[0])
+                    ref = match and (match.groupdict().get('ref') or match.group(0))
+                    if ref:
+                        refs[filename] = ref
+                products = self._match_import_products(set(refs.values()), match_field)
+                matched = [(filename, data) for filename, data in batch if products.get(refs.get(filename))]
+                stats['unmatched'] += [filename for filename, _data in batch if not products.get(refs.get(filename))]
+
+                results = pool_map(executor, probe_image_derivatives, [data for _name, data in matched], workers)
+                vals_list = []
+                for (filename, data), info in zip(matched, results):
+                    if not info['format']:
+                        stats['invalid'].append(filename)
+                        continue
+                    if isinstance(data, str):
+                        with open(data, 'rb') as f:
+                            data = f.read()
+                    vals_list.append({
+                        'name': os.path.splitext(filename)[0],
+                        'product_tmpl_id': products[refs[filename]].id,
+                        'image_1920': base64.b64encode(data),
+                        'original_format': info['format'],
+                        'original_dimensions': f"{info['width']} x {info['height']} px",
+                        'placeholder_data_uri': info['placeholder'] or False,
+                        'dominant_color': info['color'] or False,
+                        'image_phash': info['phash'] or False,
+                        'image_color_signature': info['color_signature'] or False,
+                    })
+                images = self.create(vals_list)
+                if prewarm:
+                    stats['variants'] += images._prewarm_image_variants(executor, workers)
+                if commit:
+                    self.env.cr.commit()
+                # Image bytes of the batch are no longer needed
+                images.invalidate_recordset(['image_1920', 'image_1024', 'image_512', 'image_256', 'image_128'])
+
+                stats['created'] += len(images)
+                elapsed = time.monotonic() - start
+                _logger.info(
+                    "Bulk image import: %s files processed, %s images created, %.1f files/s",
+                    stats['processed'], stats['created'], stats['processed'] / elapsed if elapsed else 0.0,
+                )
+        finally:
+            if executor:
+                executor.shutdown()
+
+        stats['elapsed'] = time.monotonic() - start
+        stats['rate'] = stats['processed'] / stats['elapsed'] if stats['elapsed'] else 0.0
+        _logger.info(
+            "Bulk image import finished: %s created, %s unmatched, %s invalid, %s variants in %.1fs",
+            stats['created'], len(stats['unmatched']), len(stats['invalid']), stats['variants'], stats['elapsed'],
+        )
+        return stats
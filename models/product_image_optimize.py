@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Optional lossless byte optimization of preserved product images
+Runs at upload and as a resumable batch job over existing images
+"""
+
+from odoo import models, fields, api
+from odoo.tools import str2bool
+import base64
+import hashlib
+import logging
+import time
+
+from ..ADVANCED_CONFIG import MigrationSettings
+from ..tools.lossless_optimize import optimize_image
+
+_logger = logging.getLogger(__name__)
+
+OPTIMIZE_ENABLED_PARAM = 'website_video_upload.lossless_optimize'
+OPTIMIZE_CURSOR_PARAM = 'website_video_upload.optimize_last_id'
+
+
+class ProductImage(models.Model):
+    _inherit = 'product.image'
+
+    lossless_saved_bytes = fields.Integer(
+        string='Bytes Saved (Lossless)',
+        help='Bytes removed from the original by lossless optimization, pixels are unchanged',
+        readonly=True,
+        aggregator='sum'
+    )
+
+    lossless_checksum = fields.Char(
+        string='Optimized Checksum',
+        help='Checksum of the original once it went through lossless optimization, '
+             'the batch job skips images whose original still has it',
+        readonly=True,
+        copy=False
+    )
+
+    @api.model
+    def _is_lossless_optimize_enabled(self):
+        param = self.env['ir.config_parameter'].sudo()
+        return str2bool(param.get_param(OPTIMIZE_ENABLED_PARAM, 'False'), False)
+
+    @api.model
+    def _lossless_optimize_vals(self, vals):
+        """Replace ``vals['image_1920']`` by its losslessly optimized version"""
+        if not vals.get('image_1920') or self.env.context.get('skip_lossless_optimize'):
+            return
+        try:
+            image_bytes = base64.b64decode(vals['image_1920'])
+        except Exception:
+            return
+        optimized, saved = optimize_image(image_bytes)
+        if saved:
+            vals['image_1920'] = base64.b64encode(optimized)
+            vals['lossless_saved_bytes'] = saved
+            _logger.info(f"Image optimized losslessly - {saved} bytes saved")
+        vals['lossless_checksum'] = hashlib.sha1(optimized if saved else image_bytes).hexdigest()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Optimize uploaded originals before they are replicated and stored"""
+        if self._is_lossless_optimize_enabled():
+            for vals in vals_list:
+                self._lossless_optimize_vals(vals)
+        return super().create(vals_list)
+
+    def write(self, vals):
+        """Optimize replaced originals before they are replicated and stored"""
+        if vals.get('image_1920') and self._is_lossless_optimize_enabled():
+            self._lossless_optimize_vals(vals)
+        return super().write(vals)
+
+    @api.model
+    def _optimize_existing_images(self, batch_size=None, max_batches=None, commit=True):
+        """Losslessly optimize stored originals in resumable ``id``-ordered batches
+
+        Originals whose checksum matches ``lossless_checksum`` went through
+        optimization already and are not decoded again.
+
+        :return: dict with ``processed``, ``optimized``, ``skipped``, ``saved`` (bytes),
+                 ``per_product`` (``{product.template id: bytes saved}``),
+                 ``elapsed``, ``last_id`` and ``done``
+        """
+        param = self.env['ir.config_parameter'].sudo()
+        batch_size = batch_size or MigrationSettings.BATCH_SIZE
+        last_id = int(param.get_param(OPTIMIZE_CURSOR_PARAM, 0))
+        stats = {'processed': 0, 'optimized': 0, 'skipped': 0, 'saved': 0, 'per_product': {},
+                 'elapsed': 0.0, 'last_id': last_id, 'done': True}
+        start = time.monotonic()
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            images = self.sudo().search([('id', '>', last_id)], order='id', limit=batch_size)
+            if not images:
+                param.set_param(OPTIMIZE_CURSOR_PARAM, 0)
+                stats['done'] = True
+                break
+
+            attachments = self.env['ir.attachment'].sudo().search([
+                ('res_model', '=', self._name),
+                ('res_field', '=', 'image_1920'),
+                ('res_id', 'in', images.ids),
+            ])
+            for attachment in attachments:
+                image = images.browse(attachment.res_id)
+                if attachment.checksum and image.lossless_checksum == attachment.checksum:
+                    stats['skipped'] += 1
+                    continue
+                optimized, saved = optimize_image(attachment.raw)
+                if not saved:
+                    image.lossless_checksum = attachment.checksum
+                    continue
+                image.with_context(skip_lossless_optimize=True).write({
+                    'image_1920': base64.b64encode(optimized),
+                    'lossless_saved_bytes': image.lossless_saved_bytes + saved,
+                    'lossless_checksum': hashlib.sha1(optimized).hexdigest(),
+                })
+                stats['optimized'] += 1
+                stats['saved'] += saved
+                template_id = image.product_tmpl_id.id
+                stats['per_product'][template_id] = stats['per_product'].get(template_id, 0) + saved
+
+            last_id = images[-1].id
+            param.set_param(OPTIMIZE_CURSOR_PARAM, last_id)
+            if commit:
+                self.env.cr.commit()
+            batches += 1
+            stats['processed'] += len(images)
+            stats['last_id'] = last_id
+            stats['done'] = False
+            _logger.info(
+                "Lossless optimization batch %s: %s images processed, %s optimized, %s already done, %s bytes saved",
+                batches, stats['processed'], stats['optimized'], stats['skipped'], stats['saved'],
+            )
+
+        stats['elapsed'] = time.monotonic() - start
+        for template_id, saved in sorted(stats['per_product'].items(), key=lambda item: -item[1]):
+            _logger.info("Lossless optimization: product.template %s - %s bytes saved", template_id, saved)
+        return stats
+
+    @api.model
+    def _cron_optimize_existing_images(self, max_batches=20):
+        """Cron entry point: bounded run that re-triggers itself until done"""
+        stats = self._optimize_existing_images(max_batches=max_batches)
+        if not stats['done']:
+            self.env.ref('website_video_upload.ir_cron_optimize_product_images')._trigger()
+        return stats
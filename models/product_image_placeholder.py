@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""
+Precomputed placeholders for product images
+Tiny inline data URI and dominant colour, painted before the original loads
+"""
+
+from odoo import models, fields, api
+import base64
+import logging
+
+from ..tools.image_placeholder import compute_placeholder, placeholder_from_base64
+
+_logger = logging.getLogger(__name__)
+
+
+class ProductImage(models.Model):
+    _inherit = 'product.image'
+
+    placeholder_data_uri = fields.Char(
+        string='Placeholder',
+        help='~20px JPEG data URI rendered inline while the original image loads',
+        readonly=True
+    )
+
+    dominant_color = fields.Char(
+        string='Dominant Color',
+        help='Most frequent colour of the image (#rrggbb)',
+        readonly=True
+    )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        """Compute placeholders for new images
+
+        Bulk imports compute them in their own process pool and pass them in
+        ``vals``; request workers never fork one.
+        """
+        for vals in vals_list:
+            if vals.get('image_1920') and 'dominant_color' not in vals:
+                data_uri, dominant_color = placeholder_from_base64(vals['image_1920'])
+                vals['placeholder_data_uri'] = data_uri or False
+                vals['dominant_color'] = dominant_color or False
+        return super().create(vals_list)
+
+    def write(self, vals):
+        """Recompute placeholders when the image is replaced"""
+        if 'image_1920' in vals:
+            data_uri, dominant_color = None, None
+            if vals['image_1920']:
+                data_uri, dominant_color = compute_placeholder(base64.b64decode(vals['image_1920']))
+            vals['placeholder_data_uri'] = data_uri or False
+            vals['dominant_color'] = dominant_color or False
+        return super().write(vals)
+
+    def _get_image_placeholder_style(self):
+        """Inline CSS painting the placeholder behind the <img> until it loads"""
+        self.ensure_one()
+        styles = []
+        if self.dominant_color:
+            styles.append(f"background-color: {self.dominant_color}")
+        if self.placeholder_data_uri:
+            styles.append(f"background-image: url('{self.placeholder_data_uri}')")
+            styles.append("background-size: cover")
+            styles.append("background-position: center")
+        return '; '.join(styles)
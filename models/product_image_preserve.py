@@ -9,6 +9,8 @@ import base64
 import io
 import logging
 
+from ..tools.image_probe import probe_image_base64
+
 try:
     from PIL import Image
     HAS_PIL = True
@@ -64,15 +66,18 @@ class ProductImage(models.Model):
             for size_field in ['image_1024', 'image_512', 'image_256', 'image_128']:
                 if 'image_1920' in vals:
                     vals[size_field] = vals['image_1920']
-            
-            # Detect and store image format and dimensions
-            if 'image_1920' in vals and vals['image_1920']:
-                image_format, dimensions = self._detect_image_format_and_dimensions(vals['image_1920'])
+
+        # Detect and store image format and dimensions: only the head of
+        # each value is decoded, cheap enough to stay in the request
+        to_detect = [vals for vals in vals_list if vals.get('image_1920') and not vals.get('original_format')]
+        if to_detect:
+            for vals in to_detect:
+                image_format, width, height = probe_image_base64(vals['image_1920'])
                 if image_format:
                     vals['original_format'] = image_format
-                    vals['original_dimensions'] = dimensions
-                    _logger.info(f"Image created - Format: {image_format}, Dimensions: {dimensions}")
-        
+                    vals['original_dimensions'] = f"{width} x {height} px"
+            _logger.info(f"Images created - detected format/dimensions for {len(to_detect)} image(s)")
+
         return super().create(vals_list)
 
     def write(self, vals):
@@ -99,33 +104,75 @@ class ProductTemplate(models.Model):
     main_image_format = fields.Char(
         string='Main Image Format',
         compute='_compute_main_image_info',
-        store=False
+        store=True,
+        index=True
     )
 
     main_image_dimensions = fields.Char(
         string='Main Image Dimensions',
         compute='_compute_main_image_info',
-        store=False
+        store=True
+    )
+
+    main_image_width = fields.Integer(
+        string='Main Image Width',
+        help='Width of the main image in pixels',
+        compute='_compute_main_image_info',
+        store=True,
+        index=True
+    )
+
+    main_image_height = fields.Integer(
+        string='Main Image Height',
+        help='Height of the main image in pixels',
+        compute='_compute_main_image_info',
+        store=True,
+        index=True
+    )
+
+    main_image_size = fields.Integer(
+        string='Main Image Size',
+        help='Size of the stored main image in bytes',
+        compute='_compute_main_image_info',
+        store=True,
+        index=True
     )
 
     @api.depends('image_1920')
     def _compute_main_image_info(self):
-        """Display main image format and dimensions"""
+        """Store main image format, dimensions and byte size
+
+        Stored so that list views, exports and searches never need to decode
+        the image again; only recomputed when ``image_1920`` changes.
+        """
         for record in self:
-            if record.image_1920 and HAS_PIL:
+            info = {
+                'main_image_format': False,
+                'main_image_dimensions': False,
+                'main_image_width': 0,
+                'main_image_height': 0,
+                'main_image_size': 0,
+            }
+            if record.image_1920:
                 try:
                     image_bytes = base64.b64decode(record.image_1920)
-                    image = Image.open(io.BytesIO(image_bytes))
-                    record.main_image_format = image.format or 'UNKNOWN'
-                    width, height = image.size
-                    record.main_image_dimensions = f"{width} x {height} px"
+                    info['main_image_size'] = len(image_bytes)
+                    image_format, width, height = parse_image_header(image_bytes)
+                    if image_format:
+                        info.update({
+                            'main_image_format': image_format,
+                            'main_image_dimensions': f"{width} x {height} px",
+                            'main_image_width': width,
+                            'main_image_height': height,
+                        })
+                    else:
+                        info['main_image_format'] = 'Unknown'
+                        info['main_image_dimensions'] = 'Unknown'
                 except Exception as e:
                     _logger.warning(f"Error computing image info: {e}")
-                    record.main_image_format = 'Unknown'
-                    record.main_image_dimensions = 'Unknown'
-            else:
-                record.main_image_format = False
-                record.main_image_dimensions = False
+                    info['main_image_format'] = 'Unknown'
+                    info['main_image_dimensions'] = 'Unknown'
+            record.update(info)
 
 
 class ImageMixin(models.AbstractModel):
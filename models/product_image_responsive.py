@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+"""
+Responsive image markup for website_sale product images
+Adds srcset/sizes, intrinsic width/height and placeholders to product <img> tags
+"""
+
+from odoo import models, api
+from markupsafe import Markup
+from lxml import etree, html
+import logging
+
+from ..tools.image_variants import variant_widths
+
+_logger = logging.getLogger(__name__)
+
+PRESERVED_IMAGE_MODELS = ('product.image', 'product.template', 'product.product')
+
+# Shop grid thumbnails vs. product page images
+SIZES_PRODUCT_PAGE = '(min-width: 992px) 50vw, 100vw'
+SIZES_PRODUCT_GRID = '(min-width: 1200px) 25vw, (min-width: 768px) 33vw, 50vw'
+GRID_IMAGE_FIELDS = ('image_512', 'image_256', 'image_128')
+
+
+class ImageMixin(models.AbstractModel):
+    _inherit = 'image.mixin'
+
+    def _get_preserved_image_attachment(self):
+        """Return the attachment holding the original image of this record"""
+        self.ensure_one()
+        field_name = 'image_variant_1920' if self._name == 'product.product' else 'image_1920'
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', field_name),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not attachment and self._name == 'product.product':
+            return self.product_tmpl_id._get_preserved_image_attachment()
+        return attachment
+
+    def _get_original_image_info(self):
+        """Return ``(format, width, height)`` of the original image from stored fields"""
+        self.ensure_one()
+        if self._name == 'product.template':
+            return self.main_image_format, self.main_image_width, self.main_image_height
+        if self._name == 'product.product':
+            if not self.with_context(bin_size=True).image_variant_1920:
+                return self.product_tmpl_id._get_original_image_info()
+            return None, 0, 0
+        if self._name == 'product.image' and self.original_dimensions:
+            try:
+                width, height = self.original_dimensions.replace('px', '').split('x')
+                return self.original_format, int(width), int(height)
+            except ValueError:
+                pass
+        return None, 0, 0
+
+    def _get_image_placeholder_style(self):
+        """Inline CSS shown behind the <img> while it loads, none by default"""
+        return ''
+
+    def _get_responsive_image_attrs(self, field_name, sizes=None):
+        """Return the ``srcset``/``sizes``/``width``/``height`` attributes for an <img>
+
+        Candidates point to the width variant route; the original image is
+        the largest candidate. Empty when no stored dimensions are known.
+        """
+        self.ensure_one()
+        image_format, width, height = self._get_original_image_info()
+        if not width or not height:
+            return {}
+        attrs = {'width': str(width), 'height': str(height)}
+        widths = variant_widths(width, image_format)
+        attachment = widths and self._get_preserved_image_attachment()
+        if not attachment:
+            return attrs
+        unique = (attachment.checksum or '')[:8]
+        candidates = [
+            f'/web/image_variant/{self._name}/{self.id}/{variant}?unique={unique} {variant}w'
+            for variant in widths
+        ]
+        candidates.append(f'/web/image/{self._name}/{self.id}/image_1920?unique={unique} {width}w')
+        attrs['srcset'] = ', '.join(candidates)
+        attrs['sizes'] = sizes or (SIZES_PRODUCT_GRID if field_name in GRID_IMAGE_FIELDS else SIZES_PRODUCT_PAGE)
+        return attrs
+
+
+class ProductProduct(models.Model):
+    """Variants are not an ``image.mixin``: they get the same helpers
+
+    Product pages render the images of the displayed variant, so its first
+    image is a ``product.product`` record.
+    """
+    _inherit = 'product.product'
+
+    _get_preserved_image_attachment = ImageMixin._get_preserved_image_attachment
+    _get_original_image_info = ImageMixin._get_original_image_info
+    _get_image_placeholder_style = ImageMixin._get_image_placeholder_style
+    _get_responsive_image_attrs = ImageMixin._get_responsive_image_attrs
+
+
+class ImageConverter(models.AbstractModel):
+    """Emit responsive attributes on product images rendered by t-field"""
+    _inherit = 'ir.qweb.field.image'
+
+    @api.model
+    def record_to_html(self, record, field_name, options):
+        value = super().record_to_html(record, field_name, options)
+        if not value or record._name not in PRESERVED_IMAGE_MODELS or options.get('responsive') is False:
+            return value
+        try:
+            attrs = record._get_responsive_image_attrs(field_name, sizes=options.get('sizes'))
+            placeholder_style = record._get_image_placeholder_style()
+            if not attrs and not placeholder_style:
+                return value
+            wrapper = html.fragment_fromstring(str(value), create_parent='div')
+            img = next(wrapper.iter('img'), None)
+            if img is None:
+                return value
+            for name, attr_value in attrs.items():
+                if not img.get(name):
+                    img.set(name, attr_value)
+            if placeholder_style:
+                img.set('style', '; '.join(filter(None, [img.get('style', '').strip().rstrip(';'), placeholder_style])))
+            return Markup((wrapper.text or '') + ''.join(
+                etree.tostring(child, encoding='unicode', method='html') for child in wrapper
+            ))
+        except Exception as e:
+            _logger.warning(f"Could not add responsive attributes to {record._name} image: {e}")
+            return value
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+"""
+Filestore storage ledger of product images
+One line per image attachment of product images, products and variants,
+kept up to date on create/write/unlink, with the number of attachments
+sharing each filestore blob
+"""
+
+from odoo import models, fields, api, _
+from odoo.tools import SQL
+import logging
+import time
+
+from ..ADVANCED_CONFIG import MigrationSettings
+from .product_image_upload import IMAGE_SIZE_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+STORAGE_CURSOR_PARAM = 'website_video_upload.storage_ledger_last_id'
+STORAGE_MODEL_PARAM = 'website_video_upload.storage_ledger_model'
+
+VARIANT_IMAGE_FIELDS = ['image_variant_1920', 'image_variant_1024', 'image_variant_512',
+                        'image_variant_256', 'image_variant_128']
+# Stored image fields accounted per model, in rebuild order. The image_*
+# fields of a variant are computed from its own image_variant_* fields or
+# its template's, so only the former are stored on the variant
+LEDGER_IMAGE_FIELDS = {
+    'product.image': IMAGE_SIZE_FIELDS,
+    'product.template': IMAGE_SIZE_FIELDS,
+    'product.product': VARIANT_IMAGE_FIELDS,
+}
+
+
+def _ledger_template(record):
+    """Product template a ledger line of ``record`` is reported under"""
+    if record._name == 'product.template':
+        return record
+    if record._name == 'product.product':
+        return record.product_tmpl_id
+    return record.product_tmpl_id or record.product_variant_id.product_tmpl_id
+
+
+class ProductImageStorageLine(models.Model):
+    _name = 'product.image.storage.line'
+    _description = 'Product Image Storage Ledger'
+    _order = 'res_model, res_id, res_field'
+
+    res_model = fields.Selection([
+        ('product.image', 'Extra Image'),
+        ('product.template', 'Product'),
+        ('product.product', 'Product Variant'),
+    ], string='Image Of', required=True, default='product.image', index=True, readonly=True)
+    res_id = fields.Integer(string='Record ID', required=True, index=True, readonly=True)
+    product_image_id = fields.Many2one('product.image', string='Product Image',
+                                       index='btree_not_null', ondelete='cascade', readonly=True)
+    product_tmpl_id = fields.Many2one('product.template', string='Product', index=True, readonly=True)
+    res_field = fields.Selection([(name, name) for name in IMAGE_SIZE_FIELDS + VARIANT_IMAGE_FIELDS],
+                                 string='Image Field', readonly=True)
+    checksum = fields.Char(string='Checksum', index=True, readonly=True)
+    store_fname = fields.Char(string='Stored Filename', index=True, readonly=True)
+    file_size = fields.Integer(
+        string='Logical Bytes',
+        help='Size of the file this field points to, as if it were stored on its own',
+        readonly=True,
+        aggregator='sum'
+    )
+    blob_refs = fields.Integer(
+        string='Blob References',
+        help='Number of attachments (of any model) pointing to the same filestore file',
+        readonly=True,
+        aggregator='max'
+    )
+    physical_size = fields.Float(
+        string='Physical Bytes',
+        help='Share of the filestore file charged to this field: logical bytes / blob references',
+        readonly=True,
+        aggregator='sum'
+    )
+    blob_share = fields.Float(
+        string='Blobs',
+        help='Share of the filestore file charged to this field, sums up to the number of distinct files',
+        readonly=True,
+        aggregator='sum'
+    )
+    is_shared = fields.Boolean(string='Shared Blob', readonly=True, index=True)
+
+    @api.model
+    def _refresh_blob_refs(self, store_fnames):
+        """Recount the attachments pointing to each of ``store_fnames``"""
+        store_fnames = tuple(name for name in store_fnames if name)
+        if not store_fnames:
+            return
+        self.env['ir.attachment'].flush_model(['store_fname'])
+        self.flush_model()
+        self.env.cr.execute(SQL(
+            """UPDATE product_image_storage_line line
+                  SET blob_refs = blob.refs,
+                      physical_size = line.file_size::float / blob.refs,
+                      blob_share = 1.0 / blob.refs,
+                      is_shared = blob.refs > 1
+                 FROM (SELECT store_fname, count(*) AS refs
+                         FROM ir_attachment
+                        WHERE store_fname IN %s
+                     GROUP BY store_fname) blob
+                WHERE line.store_fname = blob.store_fname""",
+            store_fnames,
+        ))
+        self.invalidate_model(['blob_refs', 'physical_size', 'blob_share', 'is_shared'])
+
+    @api.model
+    def _sync_records(self, records):
+        """Rewrite the ledger lines of ``records`` from their image attachments"""
+        Ledger = self.sudo()
+        old_lines = Ledger.search([('res_model', '=', records._name), ('res_id', 'in', records.ids)])
+        store_fnames = set(old_lines.mapped('store_fname'))
+        old_lines.unlink()
+
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', records._name),
+            ('res_field', 'in', LEDGER_IMAGE_FIELDS[records._name]),
+            ('res_id', 'in', records.ids),
+        ])
+        owners = records.sudo().browse(attachments.mapped('res_id'))
+        templates = {owner.id: _ledger_template(owner) for owner in owners}
+        lines = Ledger.create([{
+            'res_model': records._name,
+            'res_id': attachment.res_id,
+            'product_image_id': attachment.res_id if records._name == 'product.image' else False,
+            'product_tmpl_id': templates[attachment.res_id].id,
+            'res_field': attachment.res_field,
+            'checksum': attachment.checksum,
+            'store_fname': attachment.store_fname,
+            'file_size': attachment.file_size,
+        } for attachment in attachments if attachment.store_fname])
+        Ledger._refresh_blob_refs(store_fnames | set(lines.mapped('store_fname')))
+        return lines
+
+    @api.model
+    def _remove_records(self, records):
+        """Drop the ledger lines of ``records`` before they are deleted
+
+        Returns the filestore names they pointed to, to be recounted once
+        the attachments are gone.
+        """
+        lines = self.sudo().search([('res_model', '=', records._name), ('res_id', 'in', records.ids)])
+        store_fnames = set(lines.mapped('store_fname'))
+        lines.unlink()
+        return store_fnames
+
+
+class ProductImage(models.Model):
+    _inherit = 'product.image'
+
+    def _sync_storage_ledger(self):
+        """Rewrite the ledger lines of these images from their attachments"""
+        return self.env['product.image.storage.line']._sync_records(self)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        images = super().create(vals_list)
+        images._sync_storage_ledger()
+        return images
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & set(IMAGE_SIZE_FIELDS):
+            self._sync_storage_ledger()
+        return res
+
+    def unlink(self):
+        Ledger = self.env['product.image.storage.line']
+        store_fnames = Ledger._remove_records(self)
+        res = super().unlink()
+        # The remaining sharers of the released blobs are recounted
+        Ledger._refresh_blob_refs(store_fnames)
+        return res
+
+    def _attach_original_from_file(self, path):
+        res = super()._attach_original_from_file(path)
+        self._sync_storage_ledger()
+        return res
+
+    @api.model
+    def _rebuild_storage_ledger(self, batch_size=None, max_batches=None, commit=True):
+        """Rebuild the ledger in resumable ``id``-ordered batches
+
+        Product images, then products, then variants. Catches up with blobs
+        shared or released by attachments of other models, which the
+        incremental updates do not see.
+
+        :return: dict with ``processed``, ``lines``, ``elapsed``, ``last_id`` and ``done``
+        """
+        param = self.env['ir.config_parameter'].sudo()
+        Ledger = self.env['product.image.storage.line']
+        batch_size = batch_size or MigrationSettings.BATCH_SIZE
+        model_names = list(LEDGER_IMAGE_FIELDS)
+        model_name = param.get_param(STORAGE_MODEL_PARAM) or model_names[0]
+        if model_name not in model_names:
+            model_name = model_names[0]
+        last_id = int(param.get_param(STORAGE_CURSOR_PARAM, 0))
+        stats = {'processed': 0, 'lines': 0, 'elapsed': 0.0, 'last_id': last_id, 'done': True}
+        start = time.monotonic()
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            records = self.env[model_name].sudo().with_context(prefetch_fields=False, active_test=False).search(
+                [('id', '>', last_id)], order='id', limit=batch_size,
+            )
+            if not records:
+                next_index = model_names.index(model_name) + 1
+                if next_index == len(model_names):
+                    param.set_param(STORAGE_MODEL_PARAM, '')
+                    param.set_param(STORAGE_CURSOR_PARAM, 0)
+                    stats['done'] = True
+                    break
+                model_name, last_id = model_names[next_index], 0
+                param.set_param(STORAGE_MODEL_PARAM, model_name)
+                param.set_param(STORAGE_CURSOR_PARAM, 0)
+                continue
+
+            stats['lines'] += len(Ledger._sync_records(records))
+            last_id = records[-1].id
+            param.set_param(STORAGE_CURSOR_PARAM, last_id)
+            if commit:
+                self.env.cr.commit()
+            batches += 1
+            stats['processed'] += len(records)
+            stats['last_id'] = last_id
+            stats['done'] = False
+            _logger.info("Storage ledger batch %s (%s): %s records, %s lines",
+                         batches, model_name, stats['processed'], stats['lines'])
+
+        stats['elapsed'] = time.monotonic() - start
+        return stats
+
+    @api.model
+    def _cron_rebuild_storage_ledger(self, max_batches=20):
+        """Cron entry point: bounded run that re-triggers itself until done"""
+        stats = self._rebuild_storage_ledger(max_batches=max_batches)
+        if not stats['done']:
+            self.env.ref('website_video_upload.ir_cron_rebuild_image_storage_ledger')._trigger()
+        return stats
+
+    def action_rebuild_storage_ledger(self):
+        self.env.ref('website_video_upload.ir_cron_rebuild_image_storage_ledger')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _("The storage ledger is being rebuilt in the background."),
+                'type': 'info',
+            },
+        }
+
+
+class ProductTemplate(models.Model):
+    _inherit = 'product.template'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        templates = super().create(vals_list)
+        self.env['product.image.storage.line']._sync_records(templates)
+        return templates
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & set(IMAGE_SIZE_FIELDS):
+            self.env['product.image.storage.line']._sync_records(self)
+        return res
+
+    def unlink(self):
+        Ledger = self.env['product.image.storage.line']
+        # Variants are deleted along with their template
+        store_fnames = Ledger._remove_records(self) | Ledger._remove_records(
+            self.with_context(active_test=False).product_variant_ids
+        )
+        res = super().unlink()
+        # The remaining sharers of the released blobs are recounted
+        Ledger._refresh_blob_refs(store_fnames)
+        return res
+
+
+class ProductProduct(models.Model):
+    _inherit = 'product.product'
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        products = super().create(vals_list)
+        self.env['product.image.storage.line']._sync_records(products)
+        return products
+
+    def write(self, vals):
+        res = super().write(vals)
+        if set(vals) & set(IMAGE_SIZE_FIELDS + VARIANT_IMAGE_FIELDS):
+            # image_1920 of a variant is written to its template when the
+            # variant has no image of its own
+            Ledger = self.env['product.image.storage.line']
+            Ledger._sync_records(self)
+            Ledger._sync_records(self.product_tmpl_id)
+        return res
+
+    def unlink(self):
+        Ledger = self.env['product.image.storage.line']
+        store_fnames = Ledger._remove_records(self)
+        res = super().unlink()
+        # The remaining sharers of the released blobs are recounted
+        Ledger._refresh_blob_refs(store_fnames)
+        return res
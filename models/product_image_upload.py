@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Attach large originals to product images straight from a file on disk
+Used by the chunked upload endpoint: the image never goes through base64
+"""
+
+from odoo import models, _
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+import hashlib
+import logging
+import os
+
+from ..tools.image_probe import probe_image_source
+from ..tools.image_variants import FORMAT_MIMETYPES
+
+_logger = logging.getLogger(__name__)
+
+IMAGE_SIZE_FIELDS = ['image_1920', 'image_1024', 'image_512', 'image_256', 'image_128']
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+
+
+class ProductImage(models.Model):
+    _inherit = 'product.image'
+
+    def _attach_original_from_file(self, path):
+        """Make the file at ``path`` the original image of this record
+
+        The file is hashed in blocks and moved into the checksum-addressed
+        filestore; the image attachments of every size field then point to
+        that single file. ``path`` must be on the filestore's filesystem.
+        """
+        self.ensure_one()
+        image_format, width, height = probe_image_source(path)
+        if not image_format:
+            raise UserError(_("The uploaded file is not a supported image."))
+
+        sha = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b''):
+                sha.update(block)
+        checksum = sha.hexdigest()
+        file_size = os.path.getsize(path)
+
+        Attachment = self.env['ir.attachment'].sudo()
+        store_fname = f"{checksum[:2]}/{checksum}"
+        full_path = Attachment._full_path(store_fname)
+        if os.path.exists(full_path):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            os.replace(path, full_path)
+
+        Attachment.search([
+            ('res_model', '=', self._name),
+            ('res_field', 'in', IMAGE_SIZE_FIELDS),
+            ('res_id', '=', self.id),
+        ]).unlink()
+        attachments = Attachment.create([{
+            'name': field_name,
+            'res_model': self._name,
+            'res_field': field_name,
+            'res_id': self.id,
+            'type': 'binary',
+        } for field_name in IMAGE_SIZE_FIELDS])
+        # ir.attachment refuses file fields in create/write, they are only
+        # derived from in-memory data there
+        self.env.cr.execute(SQL(
+            """UPDATE ir_attachment
+                  SET store_fname = %s, checksum = %s, file_size = %s, mimetype = %s
+                WHERE id IN %s""",
+            store_fname, checksum, file_size,
+            FORMAT_MIMETYPES.get(image_format, 'application/octet-stream'), tuple(attachments.ids),
+        ))
+        attachments.invalidate_recordset()
+        self.invalidate_recordset(IMAGE_SIZE_FIELDS)
+
+        # Placeholder and perceptual hash need a full decode: left to the
+        # backfill job, which runs it in its worker pool
+        self.write({
+            'original_format': image_format,
+            'original_dimensions': f"{width} x {height} px",
+            'placeholder_data_uri': False,
+            'dominant_color': False,
+            'image_phash': False,
+            'image_color_signature': False,
+            'duplicate_of_id': False,
+        })
+        self.env.ref('website_video_upload.ir_cron_backfill_product_image_info')._trigger()
+        _logger.info(f"Large original attached to product.image {self.id}: {image_format} "
+                     f"{width}x{height}px, {file_size} bytes")
+        return True
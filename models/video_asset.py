@@ -0,0 +1,369 @@
+# -*- coding: utf-8 -*-
+"""
+Uploaded website videos
+One row per video file with its playback options and metadata as real,
+indexed columns; the ir.attachment only keeps the media library entry
+"""
+
+from odoo import models, fields, api
+from odoo.tools import SQL, config
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+from ..ADVANCED_CONFIG import MigrationSettings
+from ..tools.image_variants import write_cache_file
+from ..tools.video_probe import file_sha1, probe_video
+
+_logger = logging.getLogger(__name__)
+
+VIDEO_MIMETYPES = [
+    'video/mp4',
+    'video/webm',
+    'video/ogg',
+    'video/quicktime',
+    'video/x-msvideo',
+]
+VIDEO_URL_PREFIX = '/web/video/'
+
+# Changed on every change of the library, part of every cached page key.
+# A sequence: reading it takes no lock nor cache, bumping it never waits for
+# another transaction, and a rolled back bump is never handed out again
+LIBRARY_VERSION_SEQUENCE = 'video_asset_library_version_seq'
+LIBRARY_PAGE_SIZE = 50
+LIBRARY_MAX_PAGE_SIZE = 200
+# Above this many matches the library total is reported as an estimate
+LIBRARY_EXACT_COUNT_LIMIT = 10000
+
+# Option keys used by the editor, mapped to their column
+VIDEO_OPTION_FIELDS = {
+    'autoplay': 'autoplay',
+    'loop': 'loop',
+    'hideControls': 'hide_controls',
+    'hideFullscreen': 'hide_fullscreen',
+}
+
+
+class VideoAsset(models.Model):
+    _name = 'video.asset'
+    _description = 'Website Video'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True, index='trigram')
+    attachment_id = fields.Many2one('ir.attachment', string='Attachment', required=True,
+                                    index=True, ondelete='cascade')
+    storage_key = fields.Char(string='Storage Key', required=True,
+                              help='File name of the video in the filestore "videos" directory')
+    url = fields.Char(string='URL', compute='_compute_url')
+    mimetype = fields.Char(string='MIME Type')
+    checksum = fields.Char(string='Checksum', help='SHA1 of the video file', index=True)
+    file_size = fields.Integer(string='Size (bytes)')
+    duration = fields.Float(string='Duration (s)')
+    width = fields.Integer(string='Width')
+    height = fields.Integer(string='Height')
+    status = fields.Selection([
+        ('ready', 'Ready'),
+        ('missing', 'File Missing'),
+    ], string='Status', default='ready', required=True, index=True)
+
+    autoplay = fields.Boolean(string='Autoplay')
+    loop = fields.Boolean(string='Loop')
+    hide_controls = fields.Boolean(string='Hide Controls')
+    hide_fullscreen = fields.Boolean(string='Hide Fullscreen')
+
+    _attachment_uniq = models.Constraint('UNIQUE(attachment_id)', 'A video already exists for this attachment.')
+    _storage_key_uniq = models.Constraint('UNIQUE(storage_key)', 'The storage key of a video must be unique.')
+    # Library listing: keyset scan in id order, filters evaluated on the index
+    _library_idx = models.Index("(id DESC, mimetype, file_size, create_date) WHERE status = 'ready'")
+
+    def init(self):
+        self.env.cr.execute(SQL("CREATE SEQUENCE IF NOT EXISTS %s", SQL.identifier(LIBRARY_VERSION_SEQUENCE)))
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        assets = super().create(vals_list)
+        if assets:
+            self._bump_library_version()
+        return assets
+
+    def write(self, vals):
+        res = super().write(vals)
+        if self:
+            self._bump_library_version()
+        return res
+
+    def unlink(self):
+        if not self:
+            return True
+        res = super().unlink()
+        self._bump_library_version()
+        return res
+
+    @api.depends('storage_key')
+    def _compute_url(self):
+        for asset in self:
+            asset.url = f"{VIDEO_URL_PREFIX}{asset.storage_key}" if asset.storage_key else False
+
+    @api.model
+    def _get_videos_dir(self):
+        return os.path.join(config.filestore(self.env.cr.dbname), 'videos')
+
+    def _get_file_path(self):
+        self.ensure_one()
+        return os.path.join(self._get_videos_dir(), self.storage_key)
+
+    def _get_video_options(self):
+        """Return the playback options in the format used by the editor"""
+        self.ensure_one()
+        return {key: self[field_name] for key, field_name in VIDEO_OPTION_FIELDS.items()}
+
+    @api.model
+    def _options_to_vals(self, options):
+        return {
+            field_name: bool(options[key])
+            for key, field_name in VIDEO_OPTION_FIELDS.items()
+            if key in (options or {})
+        }
+
+    def _to_list_item(self):
+        """Serialize for the editor's uploaded videos list"""
+        self.ensure_one()
+        return {
+            'id': self.attachment_id.id,
+            'name': self.name,
+            'url': self.url,
+            'mimetype': self.mimetype,
+            'create_date': self.create_date.isoformat() if self.create_date else None,
+            'options': self._get_video_options(),
+            'size': self.file_size,
+            'duration': self.duration,
+            'width': self.width,
+            'height': self.height,
+        }
+
+    def _delete_videos(self):
+        """Delete these videos and their attachments, queue their files
+
+        The files are removed by a background job once this transaction is
+        committed, see ``video.file.deletion``.
+        """
+        attachments = self.attachment_id
+        self.env['video.file.deletion']._enqueue(self.mapped('storage_key'))
+        # Unlinked explicitly (not through the cascade) to bump the library version
+        self.unlink()
+        attachments.unlink()
+        return True
+
+    @api.model
+    def _browse_by_attachment(self, attachment_ids):
+        """Return ``{attachment id: video.asset}`` for the given attachment ids"""
+        assets = self.search([('attachment_id', 'in', [int(attachment_id) for attachment_id in attachment_ids])])
+        return {asset.attachment_id.id: asset for asset in assets}
+
+    @api.model
+    def _batch_results(self, attachment_ids, found, values=None):
+        """Return one ``{'id', 'success'[, 'error']}`` result per requested id, in request order"""
+        values = values or {}
+        results = []
+        for attachment_id in map(int, attachment_ids):
+            if attachment_id in found:
+                results.append({'id': attachment_id, 'success': True, **values.get(attachment_id, {})})
+            else:
+                results.append({'id': attachment_id, 'success': False, 'error': 'Video not found'})
+        return results
+
+    @api.model
+    def _batch_delete(self, attachment_ids):
+        """Delete the videos of ``attachment_ids`` at once, return one result per id"""
+        found = self._browse_by_attachment(attachment_ids)
+        self.browse([asset.id for asset in found.values()])._delete_videos()
+        _logger.info(f"Batch deleted {len(found)} videos")
+        return self._batch_results(attachment_ids, found)
+
+    @api.model
+    def _batch_update_options(self, patches):
+        """Apply ``[{'attachment_id', 'options'}]`` patches, one write per distinct patch"""
+        found = self._browse_by_attachment([patch['attachment_id'] for patch in patches])
+        groups = {}
+        for patch in patches:
+            asset = found.get(int(patch['attachment_id']))
+            vals = self._options_to_vals(patch.get('options') or {})
+            if asset and vals:
+                key = tuple(sorted(vals.items()))
+                groups[key] = groups.get(key, self.browse()) | asset
+        for key, assets in groups.items():
+            assets.write(dict(key))
+        _logger.info(f"Batch saved options of {len(found)} videos in {len(groups)} writes")
+        return self._batch_results([patch['attachment_id'] for patch in patches], found)
+
+    @api.model
+    def _batch_metadata(self, attachment_ids):
+        """Return the library item of each of ``attachment_ids``"""
+        found = self._browse_by_attachment(attachment_ids)
+        values = {attachment_id: {'video': asset._to_list_item()} for attachment_id, asset in found.items()}
+        return self._batch_results(attachment_ids, found, values)
+
+    @api.model
+    def _get_library_domain(self, search=None, mimetypes=None, min_size=None, max_size=None,
+                            date_from=None, date_to=None):
+        domain = [('status', '=', 'ready')]
+        if search:
+            domain.append(('name', 'ilike', search))
+        if mimetypes:
+            domain.append(('mimetype', 'in', list(mimetypes)))
+        if min_size:
+            domain.append(('file_size', '>=', int(min_size)))
+        if max_size:
+            domain.append(('file_size', '<=', int(max_size)))
+        if date_from:
+            domain.append(('create_date', '>=', fields.Datetime.to_datetime(date_from)))
+        if date_to:
+            domain.append(('create_date', '<=', fields.Datetime.to_datetime(date_to)))
+        return domain
+
+    @api.model
+    def _count_library(self, domain):
+        """Return ``(total, is_estimate)``, exact up to ``LIBRARY_EXACT_COUNT_LIMIT`` matches"""
+        count = self.search_count(domain, limit=LIBRARY_EXACT_COUNT_LIMIT + 1)
+        if count <= LIBRARY_EXACT_COUNT_LIMIT:
+            return count, False
+        # Row estimate of the planner for this very domain instead of a full count
+        query = self._search(domain)
+        self.env.cr.execute(SQL("EXPLAIN (FORMAT JSON) %s", query.select()))
+        plan = self.env.cr.fetchone()[0]
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        return max(count, estimate), True
+
+    @api.model
+    def _search_library(self, cursor=None, limit=None, **filters):
+        """Return one page of the video library, newest first
+
+        Pagination is keyset-based: ``cursor`` is the ``next_cursor`` of the
+        previous page, so deep pages cost the same as the first one.
+
+        :return: dict with ``videos``, ``next_cursor`` (None on the last page),
+                 ``total`` and ``total_is_estimate``
+        """
+        limit = max(1, min(int(limit or LIBRARY_PAGE_SIZE), LIBRARY_MAX_PAGE_SIZE))
+        domain = self._get_library_domain(**filters)
+        page_domain = domain + [('id', '<', int(cursor))] if cursor else domain
+        videos = self.search(page_domain, order='id desc', limit=limit + 1)
+        next_cursor = videos[limit - 1].id if len(videos) > limit else None
+        total, is_estimate = self._count_library(domain)
+        return {
+            'videos': [video._to_list_item() for video in videos[:limit]],
+            'next_cursor': next_cursor,
+            'total': total,
+            'total_is_estimate': is_estimate,
+        }
+
+    @api.model
+    def _get_library_version(self):
+        self.env.cr.execute(SQL("SELECT last_value FROM %s", SQL.identifier(LIBRARY_VERSION_SEQUENCE)))
+        return str(self.env.cr.fetchone()[0])
+
+    @api.model
+    def _bump_library_version(self):
+        """Invalidate every cached library page, now and once the change is committed
+
+        Sequences are not transactional: a page read by another worker
+        between the bump and the commit may be cached under the new version
+        with the old data. The bump after commit retires that version.
+        """
+        self.env.cr.execute(SQL("SELECT nextval(%s)", LIBRARY_VERSION_SEQUENCE))
+        postcommit = self.env.cr.postcommit
+        if not postcommit.data.get('video_library_bump'):
+            postcommit.data['video_library_bump'] = True
+            registry = self.env.registry
+
+            def bump_after_commit():
+                with registry.cursor() as cr:
+                    cr.execute(SQL("SELECT nextval(%s)", LIBRARY_VERSION_SEQUENCE))
+
+            postcommit.add(bump_after_commit)
+
+    @api.model
+    def _get_library_etag(self, **params):
+        """Return ``(etag, cache_key)`` of the library page for ``params``"""
+        key = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self._get_library_version()}-{key[:16]}", key
+
+    @api.model
+    def _get_library_page(self, **params):
+        """Return ``(etag, page)``: ``_search_library`` through a filestore cache shared by all workers
+
+        Pages are stored under a directory named after the library version;
+        writing into a new version removes the directories of older ones.
+        """
+        etag, key = self._get_library_etag(**params)
+        version = etag.split('-', 1)[0]
+        cache_dir = os.path.join(config.filestore(self.env.cr.dbname), 'video_library')
+        path = os.path.join(cache_dir, f"v{version}", f"{key}.json")
+        try:
+            with open(path, 'rb') as f:
+                return etag, json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        page = self._search_library(**params)
+        try:
+            write_cache_file(path, json.dumps(page).encode())
+            for name in os.listdir(cache_dir):
+                if name != f"v{version}":
+                    shutil.rmtree(os.path.join(cache_dir, name), ignore_errors=True)
+        except OSError as e:
+            _logger.warning(f"Could not cache video library page: {e}")
+        return etag, page
+
+    @api.model
+    def _migrate_from_attachments(self, batch_size=None):
+        """Create the assets of video attachments uploaded before ``video.asset`` existed
+
+        Options are read once from the JSON stored in the attachment
+        description; files that are gone are flagged ``missing``.
+
+        :return: number of assets created
+        """
+        batch_size = batch_size or MigrationSettings.BATCH_SIZE
+        Attachment = self.env['ir.attachment'].sudo()
+        videos_dir = self._get_videos_dir()
+        created = 0
+        last_id = 0
+        while True:
+            attachments = Attachment.search([
+                ('id', '>', last_id),
+                ('type', '=', 'url'),
+                ('url', '=like', f'{VIDEO_URL_PREFIX}%'),
+                ('mimetype', 'in', VIDEO_MIMETYPES),
+            ], order='id', limit=batch_size)
+            if not attachments:
+                break
+            last_id = attachments[-1].id
+            existing = set(self.sudo().search([('attachment_id', 'in', attachments.ids)]).attachment_id.ids)
+            vals_list = []
+            for attachment in attachments:
+                if attachment.id in existing:
+                    continue
+                storage_key = attachment.url[len(VIDEO_URL_PREFIX):]
+                try:
+                    description = json.loads(attachment.description) if attachment.description else {}
+                except (TypeError, ValueError):
+                    description = {}
+                vals = {
+                    'name': attachment.name,
+                    'attachment_id': attachment.id,
+                    'storage_key': storage_key,
+                    'mimetype': attachment.mimetype,
+                    **self._options_to_vals(description.get('video_options') or {}),
+                }
+                path = os.path.join(videos_dir, storage_key)
+                if os.path.isfile(path):
+                    vals.update(probe_video(path), file_size=os.path.getsize(path), checksum=file_sha1(path))
+                else:
+                    vals['status'] = 'missing'
+                vals_list.append(vals)
+            created += len(self.sudo().create(vals_list))
+        _logger.info(f"Migrated {created} video attachments to video.asset")
+        return created
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Deferred, transaction-safe deletion of video files
+Files are queued in the transaction that deletes their video and removed
+by a background job once that transaction is committed
+"""
+
+from odoo import models, fields, api
+import logging
+import os
+
+from ..ADVANCED_CONFIG import MigrationSettings
+
+_logger = logging.getLogger(__name__)
+
+MAX_DELETION_ATTEMPTS = 5
+
+
+class VideoFileDeletion(models.Model):
+    _name = 'video.file.deletion'
+    _description = 'Queued Video File Deletion'
+    _order = 'id'
+
+    storage_key = fields.Char(string='File Name', required=True, readonly=True)
+    attempts = fields.Integer(string='Attempts', readonly=True)
+    last_error = fields.Char(string='Last Error', readonly=True)
+
+    @api.model
+    def _enqueue(self, storage_keys):
+        """Queue files for deletion, they go only if the current transaction commits"""
+        if not storage_keys:
+            return self.browse()
+        queued = self.sudo().create([{'storage_key': key} for key in storage_keys])
+        # The trigger is part of the transaction too: a rollback cancels both
+        self.env.ref('website_video_upload.ir_cron_process_video_file_deletions')._trigger()
+        return queued
+
+    @api.model
+    def _process_queue(self, batch_size=None, max_batches=None, commit=True):
+        """Delete queued files in ``id``-ordered batches
+
+        Files a video or a page points to again are kept. Failed deletions
+        are retried on later runs, up to ``MAX_DELETION_ATTEMPTS`` times.
+
+        :return: dict with ``deleted``, ``kept``, ``failed`` and ``done``
+        """
+        batch_size = batch_size or MigrationSettings.BATCH_SIZE
+        VideoAsset = self.env['video.asset']
+        videos_dir = VideoAsset._get_videos_dir()
+        stats = {'deleted': 0, 'kept': 0, 'failed': 0, 'done': True}
+        last_id = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            entries = self.sudo().search([
+                ('id', '>', last_id),
+                ('attempts', '<', MAX_DELETION_ATTEMPTS),
+            ], limit=batch_size)
+            if not entries:
+                stats['done'] = True
+                break
+            last_id = entries[-1].id
+            referenced = VideoAsset._get_referenced_storage_keys(entries.mapped('storage_key'))
+            processed = self.browse()
+            for entry in entries:
+                if entry.storage_key in referenced:
+                    stats['kept'] += 1
+                    processed |= entry
+                    continue
+                path = os.path.join(videos_dir, entry.storage_key)
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                        _logger.info(f"Deleted video file: {path}")
+                    stats['deleted'] += 1
+                    processed |= entry
+                except OSError as e:
+                    _logger.warning(f"Could not delete video file {path}: {e}")
+                    entry.write({'attempts': entry.attempts + 1, 'last_error': str(e)})
+                    stats['failed'] += 1
+            processed.unlink()
+            if commit:
+                self.env.cr.commit()
+            batches += 1
+            stats['done'] = False
+        return stats
+
+    @api.model
+    def _cron_process_queue(self, max_batches=20):
+        """Cron entry point: bounded run that re-triggers itself until the queue is drained"""
+        stats = self._process_queue(max_batches=max_batches)
+        if not stats['done']:
+            self.env.ref('website_video_upload.ir_cron_process_video_file_deletions')._trigger()
+        return stats
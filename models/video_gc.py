@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental garbage collection of the filestore "videos" directory
+Reconciles files against video.asset in bounded, resumable runs
+"""
+
+from odoo import models, fields, api, _
+from odoo.tools import SQL, split_every, str2bool
+import datetime
+import logging
+import os
+import time
+
+_logger = logging.getLogger(__name__)
+
+GC_ASSET_CURSOR_PARAM = 'website_video_upload.video_gc_last_id'
+GC_DRY_RUN_PARAM = 'website_video_upload.video_gc_dry_run'
+GC_GRACE_HOURS_PARAM = 'website_video_upload.video_gc_grace_hours'
+GC_BATCH_SIZE = 500
+# Names of a directory listing inserted per statement
+GC_LISTING_CHUNK = 10000
+
+
+class VideoGcPendingFile(models.Model):
+    """Directory listing of the current file scan, consumed batch by batch"""
+    _name = 'video.gc.pending.file'
+    _description = 'Video GC Pending File'
+    _order = 'id'
+    _log_access = False
+
+    name = fields.Char(string='File Name', required=True, readonly=True)
+
+
+class VideoOrphanFile(models.Model):
+    _name = 'video.orphan.file'
+    _description = 'Orphan Video File'
+    _order = 'file_size desc'
+
+    name = fields.Char(string='File Name', required=True, readonly=True)
+    file_size = fields.Integer(string='Size (bytes)', readonly=True, aggregator='sum')
+    modified_date = fields.Datetime(string='Last Modified', readonly=True)
+
+    _name_uniq = models.Constraint('UNIQUE(name)', 'This file is already reported.')
+
+    def _get_file_path(self):
+        self.ensure_one()
+        return os.path.join(self.env['video.asset']._get_videos_dir(), self.name)
+
+    def _delete_orphan_files(self):
+        """Delete the files of these orphans if they are still orphans, return the count"""
+        grace_limit = time.time() - self.env['video.asset']._get_gc_grace_seconds()
+        referenced = self.env['video.asset']._get_referenced_storage_keys(self.mapped('name'))
+        deleted = 0
+        for orphan in self:
+            path = orphan._get_file_path()
+            if orphan.name in referenced:
+                continue
+            try:
+                if os.path.isfile(path):
+                    if os.path.getmtime(path) > grace_limit:
+                        continue
+                    os.remove(path)
+                    deleted += 1
+                    _logger.info(f"Video GC: deleted orphan file {path}")
+            except OSError as e:
+                _logger.warning(f"Video GC: could not delete {path}: {e}")
+                continue
+        # Reports of files that were deleted, went away or got a video again
+        self.sudo().unlink()
+        return deleted
+
+    def action_delete_orphan_files(self):
+        deleted = self._delete_orphan_files()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _("%s orphan video files deleted.", deleted),
+                'type': 'info',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+
+class VideoAsset(models.Model):
+    _inherit = 'video.asset'
+
+    @api.model
+    def _get_referenced_storage_keys(self, names):
+        """Return the names among ``names`` that are still referenced, never garbage collected"""
+        return set(self.sudo().search([('storage_key', 'in', list(names))]).mapped('storage_key'))
+
+    @api.model
+    def _get_gc_grace_seconds(self):
+        param = self.env['ir.config_parameter'].sudo()
+        return float(param.get_param(GC_GRACE_HOURS_PARAM, 24)) * 3600
+
+    @api.model
+    def _is_gc_dry_run(self):
+        param = self.env['ir.config_parameter'].sudo()
+        return str2bool(param.get_param(GC_DRY_RUN_PARAM, 'True'), True)
+
+    @api.model
+    def _gc_list_files(self):
+        """Store the listing of the videos directory for a new file scan, return its size
+
+        The directory is read once per pass; each step then only reads its
+        batch of the listing, whatever the size of the directory.
+        """
+        try:
+            names = [entry.name for entry in os.scandir(self._get_videos_dir()) if entry.is_file()]
+        except FileNotFoundError:
+            names = []
+        for chunk in split_every(GC_LISTING_CHUNK, names, list):
+            self.env.cr.execute(SQL(
+                "INSERT INTO video_gc_pending_file (name) SELECT unnest(%s::varchar[])", chunk,
+            ))
+        return len(names)
+
+    @api.model
+    def _gc_scan_files(self, batch_size):
+        """Report the next ``batch_size`` listed files of the videos directory that have no video
+
+        :return: ``(scanned, orphans reported, done)``
+        """
+        Pending = self.env['video.gc.pending.file'].sudo()
+        pending = Pending.search([], limit=batch_size)
+        if not pending:
+            if not self._gc_list_files():
+                return 0, 0, True
+            pending = Pending.search([], limit=batch_size)
+        names = pending.mapped('name')
+        videos_dir = self._get_videos_dir()
+
+        known = self._get_referenced_storage_keys(names)
+        Orphan = self.env['video.orphan.file'].sudo()
+        reported = set(Orphan.search([('name', 'in', names)]).mapped('name'))
+        grace_limit = time.time() - self._get_gc_grace_seconds()
+        vals_list = []
+        for name in names:
+            if name in known or name in reported:
+                continue
+            try:
+                stat = os.stat(os.path.join(videos_dir, name))
+            except FileNotFoundError:
+                continue
+            # Uploads in flight write their file before the video exists
+            if stat.st_mtime > grace_limit:
+                continue
+            vals_list.append({
+                'name': name,
+                'file_size': stat.st_size,
+                'modified_date': datetime.datetime.fromtimestamp(stat.st_mtime),
+            })
+        Orphan.create(vals_list)
+        pending.unlink()
+        return len(names), len(vals_list), not Pending.search_count([], limit=1)
+
+    @api.model
+    def _gc_check_assets(self, batch_size):
+        """Flag the next ``batch_size`` videos whose file is missing, unflag restored ones
+
+        :return: ``(checked, missing, done)``
+        """
+        param = self.env['ir.config_parameter'].sudo()
+        last_id = int(param.get_param(GC_ASSET_CURSOR_PARAM, 0))
+        assets = self.sudo().search([('id', '>', last_id)], order='id', limit=batch_size)
+        if not assets:
+            param.set_param(GC_ASSET_CURSOR_PARAM, 0)
+            return 0, 0, True
+        missing = assets.filtered(lambda asset: not os.path.isfile(asset._get_file_path()))
+        (missing.filtered(lambda asset: asset.status != 'missing')).write({'status': 'missing'})
+        (assets - missing).filtered(lambda asset: asset.status == 'missing').write({'status': 'ready'})
+        param.set_param(GC_ASSET_CURSOR_PARAM, assets[-1].id)
+        return len(assets), len(missing), False
+
+    @api.model
+    def _gc_video_store(self, batch_size=None, dry_run=None, scan_files=True, check_assets=True, commit=True):
+        """One bounded garbage collection step over the videos directory
+
+        Files without a video are reported as ``video.orphan.file`` first.
+        Unless running dry, orphans reported more than the grace period ago
+        are deleted after being re-checked; videos whose file is gone are
+        flagged ``missing``. The file scan resumes from the directory listing
+        stored at the start of its pass, the video check from a cursor kept
+        in ``ir.config_parameter``.
+
+        :return: dict with ``scanned``, ``reported``, ``deleted``, ``checked``,
+                 ``missing``, ``orphan_bytes``, ``dry_run``, ``files_done``
+                 and ``assets_done``
+        """
+        batch_size = batch_size or GC_BATCH_SIZE
+        dry_run = self._is_gc_dry_run() if dry_run is None else dry_run
+        Orphan = self.env['video.orphan.file'].sudo()
+
+        scanned, reported, files_done = self._gc_scan_files(batch_size) if scan_files else (0, 0, True)
+        checked, missing, assets_done = self._gc_check_assets(batch_size) if check_assets else (0, 0, True)
+        deleted = 0
+        if not dry_run:
+            # Admins get the grace period to review the report before files go
+            reported_before = fields.Datetime.now() - datetime.timedelta(seconds=self._get_gc_grace_seconds())
+            deleted = Orphan.search([('create_date', '<', reported_before)], limit=batch_size)._delete_orphan_files()
+        if commit:
+            self.env.cr.commit()
+
+        orphan_bytes = Orphan._read_group([], aggregates=['file_size:sum'])[0][0]
+        stats = {
+            'scanned': scanned,
+            'reported': reported,
+            'deleted': deleted,
+            'checked': checked,
+            'missing': missing,
+            'orphan_bytes': orphan_bytes,
+            'dry_run': dry_run,
+            'files_done': files_done,
+            'assets_done': assets_done,
+        }
+        if orphan_bytes:
+            _logger.warning(f"Video GC: {orphan_bytes} bytes in orphan video files awaiting deletion")
+        _logger.info(f"Video GC step: {stats}")
+        return stats
+
+    @api.model
+    def _cron_gc_video_store(self, max_steps=20):
+        """Cron entry point: bounded run that re-triggers itself until a full pass is done"""
+        files_done = assets_done = False
+        for _step in range(max_steps):
+            stats = self._gc_video_store(scan_files=not files_done, check_assets=not assets_done)
+            files_done = files_done or stats['files_done']
+            assets_done = assets_done or stats['assets_done']
+            if files_done and assets_done:
+                return stats
+        self.env.ref('website_video_upload.ir_cron_gc_video_store')._trigger()
+        return stats
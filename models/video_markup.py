@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Server-side rendering of local-video markup
+Placeholders saved by the editor are stored as final <video> elements
+"""
+
+from odoo import models, api
+import logging
+
+from .video_asset import VIDEO_URL_PREFIX
+from .video_usage import VIEW_ARCH_FIELDS, extract_storage_keys
+from ..tools.video_markup import has_video_markup, normalize_video_markup
+
+_logger = logging.getLogger(__name__)
+
+
+class Base(models.AbstractModel):
+    _inherit = 'base'
+
+    def _normalize_video_markup_vals(self, vals):
+        """Return ``vals`` with the local-video markup of its HTML fields in final form"""
+        candidates = [
+            name for name, value in vals.items()
+            if isinstance(value, str) and VIDEO_URL_PREFIX in value and has_video_markup(value)
+        ]
+        if not candidates:
+            return vals
+        if self._name == 'ir.ui.view':
+            field_names = [name for name in candidates if name in VIEW_ARCH_FIELDS]
+        else:
+            field_names = self._get_video_usage_fields(candidates)
+        if not field_names:
+            return vals
+
+        keys = set().union(*(extract_storage_keys(vals[name]) for name in field_names))
+        assets = self.env['video.asset']._get_markup_assets(keys)
+        vals = dict(vals)
+        for name in field_names:
+            vals[name] = normalize_video_markup(
+                vals[name], VIDEO_URL_PREFIX, assets, xml=self._name == 'ir.ui.view',
+            )
+        return vals
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        return super().create([self._normalize_video_markup_vals(vals) for vals in vals_list])
+
+    def write(self, vals):
+        return super().write(self._normalize_video_markup_vals(vals))
+
+
+class VideoUsage(models.Model):
+    _inherit = 'video.usage'
+
+    @api.model
+    def _normalize_indexed_markup(self):
+        """Rewrite the markup of every indexed record embedding local videos
+
+        One-time pass for pages saved before the markup was rendered at
+        save time; relies on the usage index being complete.
+        """
+        rewritten = 0
+        groups = self.sudo()._read_group([], ['res_model', 'res_field'], ['res_id:array_agg'])
+        for res_model, res_field, res_ids in groups:
+            if res_model not in self.env:
+                continue
+            records = self.env[res_model].sudo().with_context(active_test=False).browse(set(res_ids)).exists()
+            for record in records:
+                value = record[res_field]
+                if not value:
+                    continue
+                new_value = normalize_video_markup(
+                    str(value), VIDEO_URL_PREFIX,
+                    record.env['video.asset']._get_markup_assets(extract_storage_keys(value)),
+                    xml=res_model == 'ir.ui.view',
+                )
+                if new_value != str(value):
+                    record.write({res_field: new_value})
+                    rewritten += 1
+        _logger.info(f"Local video markup rendered server-side on {rewritten} records")
+        return rewritten
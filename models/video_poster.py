@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+"""
+Poster frames of uploaded videos
+Extracted in the background after upload, shown by the click-to-play
+facade and saved in the <video> markup
+"""
+
+from odoo import models, fields, api
+import base64
+import logging
+import os
+import time
+
+from ..ADVANCED_CONFIG import MigrationSettings
+from ..tools.video_probe import can_extract_posters, extract_poster
+
+_logger = logging.getLogger(__name__)
+
+POSTER_CURSOR_PARAM = 'website_video_upload.video_poster_last_id'
+POSTER_URL_PREFIX = '/web/video_poster/'
+
+
+class VideoAsset(models.Model):
+    _inherit = 'video.asset'
+
+    poster = fields.Image(string='Poster', max_width=1280, max_height=1280, readonly=True,
+                          help='Frame of the video shown before it plays')
+    poster_failed = fields.Boolean(string='Poster Extraction Failed', readonly=True,
+                                   help='No frame could be extracted, the video is not retried')
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        assets = super().create(vals_list)
+        # Decoding a frame is left to the background job, uploads stay fast
+        if can_extract_posters() and assets.filtered(lambda asset: asset.status == 'ready'):
+            self.env.ref('website_video_upload.ir_cron_generate_video_posters')._trigger()
+        return assets
+
+    def _get_poster_url(self):
+        """URL of the poster, None when the video has none yet"""
+        self.ensure_one()
+        if not self.with_context(bin_size=True).poster:
+            return None
+        return f"{POSTER_URL_PREFIX}{self.storage_key}?unique={(self.checksum or '')[:8]}"
+
+    def _to_list_item(self):
+        item = super()._to_list_item()
+        item['poster'] = self._get_poster_url()
+        return item
+
+    @api.model
+    def _get_markup_assets(self, storage_keys):
+        """Return ``{storage_key: {'width', 'height', 'poster'}}`` for the saved <video> markup"""
+        assets = self.sudo().search([('storage_key', 'in', list(storage_keys))])
+        return {
+            asset.storage_key: {
+                'width': asset.width,
+                'height': asset.height,
+                'poster': asset._get_poster_url(),
+            }
+            for asset in assets
+        }
+
+    def _generate_posters(self):
+        """Extract and store the poster of these videos, return how many got one
+
+        Videos whose file is missing or unreadable are flagged so later
+        passes skip them.
+        """
+        generated = 0
+        for asset in self:
+            path = asset._get_file_path()
+            frame = os.path.isfile(path) and extract_poster(path, asset.duration)
+            if frame:
+                asset.poster = base64.b64encode(frame)
+                generated += 1
+            else:
+                asset.poster_failed = True
+        return generated
+
+    @api.model
+    def _generate_missing_posters(self, batch_size=None, max_batches=None, commit=True):
+        """Give a poster to ready videos without one, in resumable ``id``-ordered batches
+
+        Nothing is done without ``ffmpeg``; videos whose frame cannot be
+        extracted are flagged with ``poster_failed`` and not retried.
+
+        :return: dict with ``processed``, ``generated``, ``elapsed``, ``last_id`` and ``done``
+        """
+        param = self.env['ir.config_parameter'].sudo()
+        batch_size = batch_size or MigrationSettings.BATCH_SIZE
+        last_id = int(param.get_param(POSTER_CURSOR_PARAM, 0))
+        stats = {'processed': 0, 'generated': 0, 'elapsed': 0.0, 'last_id': last_id, 'done': True}
+        if not can_extract_posters():
+            _logger.info("Video posters skipped: ffmpeg is not installed")
+            return stats
+        start = time.monotonic()
+        batches = 0
+
+        while max_batches is None or batches < max_batches:
+            assets = self.sudo().search([
+                ('id', '>', last_id),
+                ('status', '=', 'ready'),
+                ('poster', '=', False),
+                ('poster_failed', '=', False),
+            ], order='id', limit=batch_size)
+            if not assets:
+                param.set_param(POSTER_CURSOR_PARAM, 0)
+                stats['done'] = True
+                break
+
+            stats['generated'] += assets._generate_posters()
+            last_id = assets[-1].id
+            param.set_param(POSTER_CURSOR_PARAM, last_id)
+            if commit:
+                self.env.cr.commit()
+            batches += 1
+            stats['processed'] += len(assets)
+            stats['last_id'] = last_id
+            stats['done'] = False
+            _logger.info("Video posters batch %s: %s videos, %s posters", batches, stats['processed'], stats['generated'])
+
+        stats['elapsed'] = time.monotonic() - start
+        return stats
+
+    @api.model
+    def _cron_generate_posters(self, max_batches=5):
+        """Cron entry point: bounded run that re-triggers itself until done"""
+        stats = self._generate_missing_posters(max_batches=max_batches)
+        if not stats['done']:
+            self.env.ref('website_video_upload.ir_cron_generate_video_posters')._trigger()
+        return stats
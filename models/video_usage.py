@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+Reverse index from uploaded videos to the views and HTML fields embedding them
+Kept up to date when views or HTML fields are written, rebuilt on demand
+"""
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+from urllib.parse import unquote
+import logging
+import re
+
+from .video_asset import VIDEO_URL_PREFIX
+
+_logger = logging.getLogger(__name__)
+
+VIDEO_URL_RE = re.compile(re.escape(VIDEO_URL_PREFIX) + r'''([^"'\s?#&<>()]+)''')
+
+# View fields written by the editor, all stored in arch_db
+VIEW_ARCH_FIELDS = ('arch', 'arch_base', 'arch_db')
+
+
+def extract_storage_keys(html):
+    """Return the storage keys of the local videos referenced in ``html``"""
+    if not html or VIDEO_URL_PREFIX not in html:
+        return set()
+    return {unquote(key) for key in VIDEO_URL_RE.findall(str(html))}
+
+
+class VideoUsage(models.Model):
+    _name = 'video.usage'
+    _description = 'Website Video Usage'
+    _order = 'res_model, res_id'
+
+    storage_key = fields.Char(string='Storage Key', required=True, index=True, readonly=True)
+    video_asset_id = fields.Many2one('video.asset', string='Video', index='btree_not_null',
+                                     ondelete='set null', readonly=True)
+    res_model = fields.Char(string='Model', required=True, readonly=True)
+    res_id = fields.Many2oneReference(string='Record ID', model_field='res_model', required=True, readonly=True)
+    res_field = fields.Char(string='Field', required=True, readonly=True)
+
+    _record_idx = models.Index('(res_model, res_id, res_field)')
+
+    @api.model
+    def _reindex_records(self, records, field_names):
+        """Rewrite the usages of ``field_names`` of ``records`` from their current value"""
+        if not records or not field_names:
+            return
+        self.sudo().search([
+            ('res_model', '=', records._name),
+            ('res_id', 'in', records.ids),
+            ('res_field', 'in', list(field_names)),
+        ]).unlink()
+        found = []
+        for record in records.sudo():
+            for field_name in field_names:
+                found += [(record.id, field_name, key) for key in extract_storage_keys(record[field_name])]
+        if not found:
+            return
+        assets = self.env['video.asset'].sudo().search([('storage_key', 'in', list({key for _id, _field, key in found}))])
+        asset_ids = {asset.storage_key: asset.id for asset in assets}
+        self.sudo().create([{
+            'storage_key': key,
+            'video_asset_id': asset_ids.get(key, False),
+            'res_model': records._name,
+            'res_id': res_id,
+            'res_field': field_name,
+        } for res_id, field_name, key in found])
+
+    @api.model
+    def _rebuild_usage_index(self):
+        """Scan every view arch and stored HTML field for local videos
+
+        Full scan, meant for installation and repairs; day-to-day changes
+        are indexed incrementally on write.
+        """
+        targets = [('ir.ui.view', 'arch_db')] + [
+            (model_name, field_name)
+            for model_name, model in self.env.registry.items()
+            if not model._abstract and not model._transient and model._auto
+            for field_name, field in model._fields.items()
+            if field.type == 'html' and field.store
+        ]
+        indexed = 0
+        for model_name, field_name in targets:
+            records = self.env[model_name].sudo().with_context(active_test=False).search([
+                (field_name, 'ilike', VIDEO_URL_PREFIX),
+            ])
+            self._reindex_records(records, [field_name])
+            indexed += len(records)
+        _logger.info(f"Video usage index rebuilt: {indexed} records referencing videos")
+        return indexed
+
+
+class VideoAsset(models.Model):
+    _inherit = 'video.asset'
+
+    usage_ids = fields.One2many('video.usage', 'video_asset_id', string='Used On', readonly=True)
+    usage_count = fields.Integer(string='Usages', compute='_compute_usage_count', store=True)
+
+    @api.depends('usage_ids')
+    def _compute_usage_count(self):
+        for asset in self:
+            asset.usage_count = len(asset.usage_ids)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        assets = super().create(vals_list)
+        # Pages may already point at the file, e.g. videos recreated by the migration
+        usages = self.env['video.usage'].sudo().search([
+            ('storage_key', 'in', assets.mapped('storage_key')),
+            ('video_asset_id', '=', False),
+        ])
+        for usage in usages:
+            usage.video_asset_id = assets.filtered(lambda asset: asset.storage_key == usage.storage_key)
+        return assets
+
+    @api.model
+    def _get_referenced_storage_keys(self, names):
+        """Files embedded in a page are kept even without a video, deleting them breaks the page"""
+        keys = super()._get_referenced_storage_keys(names)
+        usages = self.env['video.usage'].sudo().search([('storage_key', 'in', list(names))])
+        return keys | set(usages.mapped('storage_key'))
+
+    def _to_list_item(self):
+        item = super()._to_list_item()
+        item['usage_count'] = self.usage_count
+        return item
+
+    def _delete_videos(self):
+        """Refuse to delete videos still embedded in a page"""
+        in_use = self.filtered('usage_count')
+        if in_use:
+            raise UserError(_("%(video)s is still used on %(count)s pages.",
+                              video=in_use[0].name, count=in_use[0].usage_count))
+        return super()._delete_videos()
+
+    @api.model
+    def _batch_delete(self, attachment_ids):
+        """Skip videos still embedded in a page, reported as failed items"""
+        found = self._browse_by_attachment(attachment_ids)
+        in_use = {attachment_id: asset for attachment_id, asset in found.items() if asset.usage_count}
+        results = super()._batch_delete([attachment_id for attachment_id in attachment_ids
+                                         if int(attachment_id) not in in_use])
+        results_by_id = {result['id']: result for result in results}
+        for attachment_id, asset in in_use.items():
+            results_by_id[attachment_id] = {
+                'id': attachment_id,
+                'success': False,
+                'error': f"Video is used on {asset.usage_count} pages",
+            }
+        return [results_by_id[int(attachment_id)] for attachment_id in attachment_ids]
+
+    def action_rebuild_usage_index(self):
+        indexed = self.env['video.usage']._rebuild_usage_index()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _("%s records embedding videos indexed.", indexed),
+                'type': 'info',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
+
+
+class Base(models.AbstractModel):
+    _inherit = 'base'
+
+    def _get_video_usage_fields(self, field_names):
+        """Return the fields among ``field_names`` that may embed local videos"""
+        if self._transient or self._name == 'video.usage':
+            return []
+        if self._name == 'ir.ui.view':
+            return ['arch_db'] if any(name in VIEW_ARCH_FIELDS for name in field_names) else []
+        return [
+            name for name in field_names
+            if name in self._fields and self._fields[name].type == 'html' and self._fields[name].store
+        ]
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        field_names = {
+            name for vals in vals_list for name, value in vals.items()
+            if isinstance(value, str) and VIDEO_URL_PREFIX in value
+        }
+        usage_fields = self._get_video_usage_fields(field_names) if field_names else []
+        if usage_fields:
+            self.env['video.usage']._reindex_records(records, usage_fields)
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        usage_fields = self._get_video_usage_fields(vals)
+        if usage_fields and self._needs_video_usage_reindex(vals, usage_fields):
+            self.env['video.usage']._reindex_records(self, usage_fields)
+        return res
+
+    def _needs_video_usage_reindex(self, vals, usage_fields):
+        """Whether the new values embed a video, or replace values that did
+
+        Most HTML writes never involve a video: they are not reindexed.
+        """
+        written = VIEW_ARCH_FIELDS if self._name == 'ir.ui.view' else usage_fields
+        if any(isinstance(vals.get(name), str) and VIDEO_URL_PREFIX in vals[name] for name in written):
+            return True
+        return bool(self.ids) and bool(self.env['video.usage'].sudo().search_count([
+            ('res_model', '=', self._name),
+            ('res_id', 'in', self.ids),
+            ('res_field', 'in', usage_fields),
+        ], limit=1))
+
+    def unlink(self):
+        has_usages = self._get_video_usage_fields(
+            VIEW_ARCH_FIELDS if self._name == 'ir.ui.view' else list(self._fields)
+        )
+        if has_usages and self.ids:
+            self.env['video.usage'].sudo().search([
+                ('res_model', '=', self._name),
+                ('res_id', 'in', self.ids),
+            ]).unlink()
+        return super().unlink()
@@ -1,5 +1,7 @@
 /** @odoo-module **/
 
+import { onVideoNodesAdded, queryWithin } from "@website_video_upload/js/video_dom_observer";
+
 // ═══════════════════════════════════════════════════════════════════════════════
 // CRITICAL: Global Error Handlers - Load FIRST to prevent any crashes
 // This file MUST load before video_selector_upload.js
@@ -142,11 +144,16 @@ window.__safeClean = function(imageEl) {
 // ═══════════════════════════════════════════════════════════════════════════════
 
 // Python 3.12 has different asset loading timing, causing white boxes
-// This observer ensures videos are properly rendered after DOM updates
-
-const ensureVideoRender = () => {
-    // Find all video containers
-    const containers = document.querySelectorAll('.o_custom_video_container, .o_product_video_container');
+// The shared observer hands over added subtrees so videos are properly
+// rendered after DOM updates, without rescanning the whole document
+
+const ensureVideoRender = (root = document) => {
+    // Find the video containers in root, or the container a video was added to
+    const containers = queryWithin(root, '.o_custom_video_container, .o_product_video_container');
+    const ancestor = root.parentElement && root.parentElement.closest('.o_custom_video_container, .o_product_video_container');
+    if (ancestor) {
+        containers.push(ancestor);
+    }
     
     containers.forEach(container => {
         const video = container.querySelector('video');
@@ -184,41 +191,13 @@ const ensureVideoRender = () => {
 
 // Run on page load
 if (document.readyState === 'loading') {
-    document.addEventListener('DOMContentLoaded', ensureVideoRender);
+    document.addEventListener('DOMContentLoaded', () => ensureVideoRender());
 } else {
     ensureVideoRender();
 }
 
 // Watch for new videos being added (for AJAX/dynamic content)
-if (typeof MutationObserver !== 'undefined') {
-    const observer = new MutationObserver((mutations) => {
-        let hasVideoChanges = false;
-        mutations.forEach(mutation => {
-            mutation.addedNodes.forEach(node => {
-                if (node.nodeType === 1) { // Element node
-                    if (node.classList && 
-                        (node.classList.contains('o_custom_video_container') ||
-                         node.classList.contains('o_product_video_container') ||
-                         node.querySelector && node.querySelector('video, iframe'))) {
-                        hasVideoChanges = true;
-                    }
-                }
-            });
-        });
-        
-        if (hasVideoChanges) {
-            setTimeout(ensureVideoRender, 100);
-            console.log('🎬 [OBSERVER] Detected video changes, re-rendering');
-        }
-    });
-    
-    observer.observe(document.body, {
-        childList: true,
-        subtree: true
-    });
-    
-    console.log('🔭 [OBSERVER] Video mutation observer active');
-}
+onVideoNodesAdded((roots) => roots.forEach(ensureVideoRender));
 
 console.log('✅ [ERROR_HANDLERS] Global error suppression loaded successfully');
 console.log('🛡️ [ERROR_HANDLERS] Protected against: classList, imageEl, OwlError, Promise rejections');
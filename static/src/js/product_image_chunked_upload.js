@@ -0,0 +1,95 @@
+/** @odoo-module **/
+
+import { Component, useState } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { rpc } from "@web/core/network/rpc";
+import { useService } from "@web/core/utils/hooks";
+import { standardWidgetProps } from "@web/views/widgets/standard_widget_props";
+
+// ═══════════════════════════════════════════════════════════════════════════════
+// Chunked upload of large product image originals
+// The file is sliced and sent as raw bytes: never read into memory, never base64
+// ═══════════════════════════════════════════════════════════════════════════════
+
+export class ProductImageChunkedUpload extends Component {
+    static template = "website_video_upload.ProductImageChunkedUpload";
+    static props = { ...standardWidgetProps };
+
+    setup() {
+        this.notification = useService("notification");
+        this.state = useState({ uploading: false, progress: 0 });
+    }
+
+    async uploadChunk(uploadId, file, offset, chunkSize) {
+        const params = new URLSearchParams({ offset, csrf_token: odoo.csrf_token });
+        const response = await fetch(`/web/product_image/upload/chunk/${uploadId}?${params}`, {
+            method: "POST",
+            headers: { "Content-Type": "application/octet-stream" },
+            body: file.slice(offset, offset + chunkSize),
+        });
+        const result = await response.json();
+        if (!result.success) {
+            throw new Error(result.error);
+        }
+        return result;
+    }
+
+    async onFileChange(ev) {
+        const file = ev.target.files[0];
+        ev.target.value = "";
+        if (!file) {
+            return;
+        }
+        const record = this.props.record;
+        this.state.uploading = true;
+        this.state.progress = 0;
+        try {
+            if (record.isNew || record.dirty) {
+                await record.save();
+            }
+            const start = await rpc("/web/product_image/upload/start", {
+                filename: file.name,
+                size: file.size,
+            });
+            if (!start.success) {
+                throw new Error(start.error);
+            }
+            for (let offset = 0; offset < file.size; offset += start.chunk_size) {
+                let attempt = 0;
+                while (true) {
+                    try {
+                        await this.uploadChunk(start.upload_id, file, offset, start.chunk_size);
+                        break;
+                    } catch (error) {
+                        // Chunks are written at their offset: a retry is harmless
+                        if (++attempt >= 3 || offset === 0) {
+                            throw error;
+                        }
+                    }
+                }
+                this.state.progress = Math.round(
+                    (Math.min(offset + start.chunk_size, file.size) / file.size) * 100
+                );
+            }
+            const finish = await rpc("/web/product_image/upload/finish", {
+                upload_id: start.upload_id,
+                product_image_id: record.resId,
+            });
+            if (!finish.success) {
+                throw new Error(finish.error);
+            }
+            await record.load();
+            this.notification.add(`Original uploaded: ${finish.format} ${finish.dimensions}`, {
+                type: "success",
+            });
+        } catch (error) {
+            this.notification.add(error.message || String(error), { type: "danger" });
+        } finally {
+            this.state.uploading = false;
+        }
+    }
+}
+
+registry.category("view_widgets").add("product_image_chunked_upload", {
+    component: ProductImageChunkedUpload,
+});
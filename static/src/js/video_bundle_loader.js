@@ -0,0 +1,37 @@
+/** @odoo-module **/
+
+// ═══════════════════════════════════════════════════════════════════════════════
+// Video bundle loader
+// The video scripts and styles live in their own bundle: only pages showing
+// local videos download and run them.
+// ═══════════════════════════════════════════════════════════════════════════════
+
+import { loadBundle } from "@web/core/assets";
+
+const VIDEO_BUNDLE = 'website_video_upload.assets_frontend_video';
+
+const LOCAL_VIDEO_SELECTOR = [
+    '[data-is-local-video]',
+    'img.o_we_background_video',
+    'video[src*="/web/video/"]',
+    'iframe[src*="/web/video/"]',
+    'iframe[src*=".mp4"]',
+    'iframe[src*=".webm"]',
+].join(', ');
+
+function needsVideoBundle() {
+    // Pages shown in the website builder can get a video at any time
+    return window.self !== window.top || document.querySelector(LOCAL_VIDEO_SELECTOR) !== null;
+}
+
+function loadVideoBundle() {
+    if (needsVideoBundle()) {
+        loadBundle(VIDEO_BUNDLE).catch(e => console.warn('⚠️ Could not load the video bundle', e));
+    }
+}
+
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', loadVideoBundle);
+} else {
+    loadVideoBundle();
+}
@@ -0,0 +1,103 @@
+/** @odoo-module **/
+
+// ═══════════════════════════════════════════════════════════════════════════════
+// Shared DOM observer for the video scripts
+// One MutationObserver for the whole page: added subtrees (and iframes whose
+// src changes) are collected, reduced to their outermost roots and handed to
+// the registered handlers once per animation frame.
+// ═══════════════════════════════════════════════════════════════════════════════
+
+const handlers = [];
+let observer = null;
+let pendingRoots = new Set();
+let scheduled = false;
+
+// Read by the benchmark harness
+export const observerStats = { batches: 0, roots: 0, time: 0 };
+
+function isInsidePendingRoot(node, roots) {
+    for (let parent = node.parentElement; parent; parent = parent.parentElement) {
+        if (roots.has(parent)) {
+            return true;
+        }
+    }
+    return false;
+}
+
+function flush() {
+    scheduled = false;
+    const roots = pendingRoots;
+    pendingRoots = new Set();
+    // A subtree is examined once, through its outermost added ancestor
+    const outermost = [...roots].filter(node => node.isConnected && !isInsidePendingRoot(node, roots));
+    if (!outermost.length) {
+        return;
+    }
+    const start = performance.now();
+    for (const handler of handlers) {
+        handler(outermost);
+    }
+    observerStats.batches += 1;
+    observerStats.roots += outermost.length;
+    observerStats.time += performance.now() - start;
+}
+
+function schedule() {
+    if (scheduled) {
+        return;
+    }
+    scheduled = true;
+    if (typeof requestAnimationFrame === 'function') {
+        requestAnimationFrame(flush);
+    } else {
+        setTimeout(flush, 16);
+    }
+}
+
+function onMutations(mutations) {
+    for (const mutation of mutations) {
+        if (mutation.type === 'attributes') {
+            // Only iframes turn into videos when their src changes
+            if (mutation.target.tagName === 'IFRAME') {
+                pendingRoots.add(mutation.target);
+            }
+            continue;
+        }
+        for (const node of mutation.addedNodes) {
+            if (node.nodeType === 1) {
+                pendingRoots.add(node);
+            }
+        }
+    }
+    if (pendingRoots.size) {
+        schedule();
+    }
+}
+
+/**
+ * Call ``handler(roots)`` with the root elements of every batch of added
+ * subtrees. The handler must only look inside ``roots``.
+ */
+export function onVideoNodesAdded(handler) {
+    handlers.push(handler);
+    if (!observer && typeof MutationObserver !== 'undefined') {
+        observer = new MutationObserver(onMutations);
+        observer.observe(document.body || document.documentElement, {
+            childList: true,
+            subtree: true,
+            attributes: true,
+            attributeFilter: ['src', 'data-src'],
+        });
+    }
+}
+
+/**
+ * Return the elements matching ``selector`` in ``root``, ``root`` included.
+ */
+export function queryWithin(root, selector) {
+    const found = root.querySelectorAll ? [...root.querySelectorAll(selector)] : [];
+    if (root.matches && root.matches(selector)) {
+        found.unshift(root);
+    }
+    return found;
+}
@@ -2,9 +2,12 @@
 
 /**
  * Frontend Video Processor
- * Applies video controls based on data attributes when page loads
+ * Applies video controls based on data attributes when page loads, then on
+ * the subtrees added to the page
  */
 
+import { onVideoNodesAdded, queryWithin } from "@website_video_upload/js/video_dom_observer";
+
 // Suppress Odoo's SetCoverImagePositionAction errors for our video elements
 window.addEventListener('error', function(e) {
     if (e.message && (e.message.includes("Cannot read properties of null (reading 'src')") || 
@@ -29,426 +32,601 @@ window.addEventListener('unhandledrejection', function(e) {
     }
 });
 
-export function processLocalVideos() {
-    console.log('🎬 Video Frontend Processor Loaded');
-    
-    // Check if in editor mode - but still process background videos
-    const isEditorMode = document.body.classList.contains('editor_enable') ||
-                         document.body.classList.contains('o_website_preview') ||
-                         document.querySelector('.o_we_website_top_actions') ||
-                         document.querySelector('.oe_overlay') ||
-                         document.querySelector('#oe_snippets');
-    
-    if (isEditorMode) {
-        console.log('🎬 Editor mode detected - processing background videos only');
-        // Process background video iframes even in editor
-        processBackgroundVideoIframes();
-    }
-    
-    // Find all local video containers
-    const videoContainers = document.querySelectorAll('.o_custom_video_container[data-is-local-video="true"]');
-    console.log(`🎬 Found ${videoContainers.length} local video containers`);
-    
-    videoContainers.forEach((container) => {
-        const video = container.querySelector('video');
-        if (!video) {
-            console.warn('⚠️ No video element found in container');
-            return;
-        }
-        
-        console.log('🎬 Processing video container');
-        
-        // Read control settings from data attributes
-        const autoplay = container.getAttribute('data-video-autoplay') === 'true';
-        const loop = container.getAttribute('data-video-loop') === 'true';
-        const hideControls = container.getAttribute('data-video-hide-controls') === 'true';
-        const hideFullscreen = container.getAttribute('data-video-hide-fullscreen') === 'true';
-        
-        console.log('🎬 Control settings:', { autoplay, loop, hideControls, hideFullscreen });
-        
-        // Apply autoplay
-        if (autoplay) {
-            video.autoplay = true;
-            video.muted = true;
-            video.setAttribute('autoplay', '');
-            video.setAttribute('muted', '');
-            video.setAttribute('playsinline', '');
-            console.log('✅ Applied: Autoplay ON');
-        }
-        
-        // Apply loop
-        if (loop) {
-            video.loop = true;
-            video.setAttribute('loop', '');
-            console.log('✅ Applied: Loop ON');
+const CONTAINER_SELECTOR = '.o_custom_video_container[data-is-local-video="true"]';
+const FG_PLACEHOLDER_SELECTOR = 'img.o_local_video_placeholder[data-is-local-video="true"]';
+const BG_IMAGE_SELECTOR = 'img.o_we_background_video[data-is-local-video="true"]';
+const BG_CONTAINER_SELECTOR = '.o_background_video, .media_iframe_video.o_background_video';
+// Videos rendered in their final form when the page was saved, or by the uploader
+const SAVED_VIDEO_SELECTOR = 'video[data-is-local-video="true"][src], .o_custom_video_container[data-is-local-video="true"] video[src]';
+const VIDEO_EXTENSIONS = ['.webm', '.mp4', '.ogg', '.mov', '.avi'];
+
+// Elements already handled: each node is examined once, however often the DOM changes
+const processedNodes = new WeakSet();
+// Videos that got their container's settings. Tracked per video rather than
+// per container: a video replaced inside a container needs them again
+const configuredVideos = new WeakSet();
+
+function isEditorMode() {
+    return document.body.classList.contains('editor_enable') ||
+           document.body.classList.contains('o_website_preview') ||
+           document.querySelector('.o_we_website_top_actions') ||
+           document.querySelector('.oe_overlay') ||
+           document.querySelector('#oe_snippets');
+}
+
+function isLocalVideoIframeSrc(src) {
+    const isLocalVideo = src.includes('/web/video/') || src.includes('/web/content/');
+    return isLocalVideo || VIDEO_EXTENSIONS.some(ext => src.includes(ext));
+}
+
+// ═══════════════════════════════════════════════════════════════════
+// Lazy sources: no media request before a video is about to be seen
+// ═══════════════════════════════════════════════════════════════════
+
+const LAZY_ROOT_MARGIN = '300px 0px';
+const pendingSources = new WeakMap();
+let sourceObserver = null;
+// Set by processLocalVideos: the editor needs the real markup
+let editorMode = false;
+
+function prefersReducedData() {
+    const connection = navigator.connection;
+    return Boolean(connection && connection.saveData) ||
+           Boolean(window.matchMedia && window.matchMedia('(prefers-reduced-data: reduce)').matches);
+}
+
+function whenNearViewport(element, callback) {
+    if (typeof IntersectionObserver === 'undefined') {
+        callback();
+        return;
+    }
+    if (!sourceObserver) {
+        sourceObserver = new IntersectionObserver((entries) => {
+            for (const entry of entries) {
+                if (!entry.isIntersecting) {
+                    continue;
+                }
+                sourceObserver.unobserve(entry.target);
+                const pending = pendingSources.get(entry.target);
+                pendingSources.delete(entry.target);
+                if (pending) {
+                    pending();
+                }
+            }
+        }, { rootMargin: LAZY_ROOT_MARGIN });
+    }
+    pendingSources.set(element, callback);
+    sourceObserver.observe(element);
+}
+
+function loadSource(video, src, play) {
+    video.src = src;
+    video.preload = play ? 'auto' : 'metadata';
+    if (play) {
+        video.play().catch(e => console.log('Autoplay blocked, user interaction needed'));
+    }
+    if (video.autoplay || video.loop) {
+        managePlayback(video);
+    }
+}
+
+// ═══════════════════════════════════════════════════════════════════
+// Playback: autoplay and loop videos only run while they can be seen
+// ═══════════════════════════════════════════════════════════════════
+
+// Offscreen this long, a video gives its decoder and buffers back
+const OFFSCREEN_UNLOAD_DELAY = 60000;
+// Iterated on visibilitychange, pruned of the videos removed from the page
+const managedVideos = new Set();
+const visibleVideos = new WeakSet();
+// Videos paused or unloaded here rather than by the visitor
+const pausedVideos = new WeakSet();
+const unloadedAt = new WeakMap();
+const unloadTimers = new WeakMap();
+let playbackObserver = null;
+
+function pauseVideo(video) {
+    if (!video.paused) {
+        video.pause();
+        pausedVideos.add(video);
+    }
+}
+
+function unloadVideo(video) {
+    unloadTimers.delete(video);
+    if (!video.getAttribute('src') || visibleVideos.has(video)) {
+        return;
+    }
+    unloadedAt.set(video, video.currentTime);
+    video.removeAttribute('src');
+    video.load();
+}
+
+function resumeVideo(video) {
+    if (document.hidden || !visibleVideos.has(video)) {
+        return;
+    }
+    if (unloadedAt.has(video)) {
+        const currentTime = unloadedAt.get(video);
+        unloadedAt.delete(video);
+        video.addEventListener('loadedmetadata', () => {
+            video.currentTime = currentTime;
+        }, { once: true });
+        video.src = video.getAttribute('data-src');
+    }
+    if (video.paused && (video.autoplay || pausedVideos.has(video))) {
+        pausedVideos.delete(video);
+        video.play().catch(e => console.log('Autoplay blocked, user interaction needed'));
+    }
+}
+
+function onPlaybackIntersection(entries) {
+    for (const entry of entries) {
+        const video = entry.target;
+        if (!video.isConnected) {
+            playbackObserver.unobserve(video);
+            managedVideos.delete(video);
+            continue;
         }
-        
-        // Apply controls visibility
-        if (hideControls) {
-            video.controls = false;
-            video.removeAttribute('controls');
-            video.classList.add('no-controls');
-            console.log('✅ Applied: Controls HIDDEN');
+        clearTimeout(unloadTimers.get(video));
+        if (entry.isIntersecting) {
+            visibleVideos.add(video);
+            resumeVideo(video);
         } else {
-            video.controls = true;
-            video.setAttribute('controls', '');
-            video.classList.remove('no-controls');
-            console.log('✅ Applied: Controls VISIBLE');
+            visibleVideos.delete(video);
+            pauseVideo(video);
+            unloadTimers.set(video, setTimeout(() => unloadVideo(video), OFFSCREEN_UNLOAD_DELAY));
         }
-        
-        // Apply fullscreen restriction
-        if (hideFullscreen) {
-            video.setAttribute('controlsList', 'nodownload nofullscreen');
-            video.setAttribute('disablePictureInPicture', 'true');
-            console.log('✅ Applied: Fullscreen DISABLED');
+    }
+}
+
+function managePlayback(video) {
+    if (editorMode || managedVideos.has(video) || typeof IntersectionObserver === 'undefined') {
+        return;
+    }
+    if (!playbackObserver) {
+        playbackObserver = new IntersectionObserver(onPlaybackIntersection);
+    }
+    managedVideos.add(video);
+    playbackObserver.observe(video);
+}
+
+document.addEventListener('visibilitychange', () => {
+    for (const video of managedVideos) {
+        if (!video.isConnected) {
+            playbackObserver.unobserve(video);
+            managedVideos.delete(video);
+        } else if (document.hidden) {
+            pauseVideo(video);
         } else {
-            video.removeAttribute('controlsList');
-            video.removeAttribute('disablePictureInPicture');
-            console.log('✅ Applied: Fullscreen ENABLED');
+            resumeVideo(video);
         }
-        
-        console.log('✅ Video processing complete');
-    });
-    
-    // ═══════════════════════════════════════════════════════════════════
-    // Process background videos - Convert img with video src to video element
-    // ═══════════════════════════════════════════════════════════════════
-    
-    // Process ALL iframes - check if they contain local video URLs
-    const allIframes = document.querySelectorAll('iframe');
-    console.log(`🎬 Checking ${allIframes.length} iframes for local videos`);
-    
-    allIframes.forEach((iframe) => {
-        const src = iframe.src || iframe.getAttribute('data-src') || '';
-        
-        // Check if it's a local video URL
-        const isLocalVideo = src.includes('/web/video/') || src.includes('/web/content/');
-        const videoExtensions = ['.webm', '.mp4', '.ogg', '.mov', '.avi'];
-        const isVideoFile = videoExtensions.some(ext => src.includes(ext));
-        
-        if (isLocalVideo || isVideoFile) {
-            console.log('🎬 Found iframe with local video, converting:', src);
-            
-            // Clean the src (remove any query params like &enablejsapi=1)
-            let cleanSrc = src.split('&')[0].split('?')[0];
-            if (!cleanSrc.includes('.mp4') && !cleanSrc.includes('.webm')) {
-                cleanSrc = src;
-            }
-            
-            // Get parent container to read control settings
-            const container = iframe.closest('.media_iframe_video, .o_custom_video_container');
-            
-            // Read control settings from container data attributes
-            let autoplay = false;
-            let loop = false;
-            let hideControls = false;
-            let hideFullscreen = false;
-            let isBackground = false;
-            
-            if (container) {
-                autoplay = container.getAttribute('data-video-autoplay') === 'true';
-                loop = container.getAttribute('data-video-loop') === 'true';
-                hideControls = container.getAttribute('data-video-hide-controls') === 'true';
-                hideFullscreen = container.getAttribute('data-video-hide-fullscreen') === 'true';
-                isBackground = container.classList.contains('o_background_video');
-            }
-            
-            // Also check if iframe itself has background class
-            if (iframe.classList.contains('o_bg_video_iframe')) {
-                isBackground = true;
-            }
-            
-            // Check parent elements for background indicators
-            const parentSection = iframe.closest('.s_cover, [data-bg-video-src], .o_we_bg_filter');
-            if (parentSection) {
-                isBackground = true;
-            }
-            
-            // Background videos always have specific settings
-            if (isBackground) {
-                autoplay = true;
-                loop = true;
-                hideControls = true;
-                hideFullscreen = true;
-                console.log('🎬 Background video detected - forcing background settings');
-            }
-            
-            console.log('🎬 Video settings:', { autoplay, loop, hideControls, hideFullscreen, isBackground });
-            
-            const video = document.createElement('video');
-            video.src = cleanSrc;
-            video.className = iframe.className;
-            video.style.cssText = iframe.style.cssText;
-            video.setAttribute('data-src', cleanSrc);
-            video.setAttribute('data-is-local-video', 'true');
-            video.style.width = '100%';
-            video.style.height = '100%';
-            video.preload = 'metadata';
-            
-            // Apply autoplay
-            if (autoplay) {
-                video.autoplay = true;
-                video.muted = true;  // Required for autoplay
-                video.setAttribute('autoplay', '');
-                video.setAttribute('muted', '');
-                video.setAttribute('playsinline', '');
-            }
-            
-            // Apply loop
-            if (loop) {
-                video.loop = true;
-                video.setAttribute('loop', '');
-            }
-            
-            // Apply controls
-            if (hideControls) {
-                video.controls = false;
-                video.removeAttribute('controls');
-            } else {
-                video.controls = true;
-                video.setAttribute('controls', '');
-            }
-            
-            // Apply fullscreen restriction
-            if (hideFullscreen) {
-                video.setAttribute('controlsList', 'nodownload nofullscreen');
-                video.setAttribute('disablePictureInPicture', 'true');
-            }
-            
-            // Object fit based on context
-            video.style.objectFit = isBackground ? 'cover' : 'contain';
-            
-            iframe.replaceWith(video);
-            console.log('✅ Converted iframe to video element with controls:', !hideControls);
-            
-            // Try to play if autoplay
-            if (autoplay) {
-                video.play().catch(e => console.log('Autoplay blocked, user interaction needed'));
-            }
-        }
-    });
-    
-    // Convert foreground video IMG placeholders to actual video elements
-    const fgVideoImages = document.querySelectorAll('img.o_local_video_placeholder[data-is-local-video="true"]');
-    console.log(`🎬 Found ${fgVideoImages.length} foreground video image placeholders to convert`);
-    
-    fgVideoImages.forEach((img) => {
-        const src = img.getAttribute('data-video-src') || img.src;
-        if (!src) return;
-        
-        console.log('🎬 Converting foreground video placeholder to video:', src);
-        
-        const video = document.createElement('video');
-        video.src = src;
-        video.className = 'img img-fluid o_we_custom_image';
-        video.setAttribute('data-src', src);
-        video.setAttribute('data-is-local-video', 'true');
-        video.style.width = '100%';
-        video.style.height = 'auto';
-        video.preload = 'metadata';
-        
-        // Apply control settings from data attributes
-        const autoplay = img.getAttribute('data-video-autoplay') === 'true';
-        const loop = img.getAttribute('data-video-loop') === 'true';
-        const hideControls = img.getAttribute('data-video-hide-controls') === 'true';
-        
-        if (autoplay) {
-            video.autoplay = true;
-            video.muted = true;
-            video.setAttribute('autoplay', '');
-            video.setAttribute('muted', '');
-        }
-        if (loop) {
-            video.loop = true;
-            video.setAttribute('loop', '');
-        }
-        if (!hideControls) {
-            video.controls = true;
-            video.setAttribute('controls', '');
-        }
-        video.playsInline = true;
-        video.setAttribute('playsinline', '');
-        
-        img.parentNode.replaceChild(video, img);
-        console.log('✅ Foreground video placeholder converted to video element');
-    });
-    
-    const bgVideoImages = document.querySelectorAll('img.o_we_background_video[data-is-local-video="true"]');
-    console.log(`🎬 Found ${bgVideoImages.length} background video images to convert`);
-    
-    bgVideoImages.forEach((img) => {
-        console.log('🎬 Converting background video img to actual video element');
-        console.log('🎬 IMG src:', img.src);
-        
-        // Only process if src ends with video extension
-        const videoExtensions = ['.webm', '.mp4', '.ogg', '.mov', '.avi'];
-        const isVideoFile = videoExtensions.some(ext => img.src.endsWith(ext) || img.src.includes(ext + '?'));
-        
-        if (!isVideoFile) {
-            console.log('⚠️ Image src is not a video file, skipping:', img.src);
-            return;
-        }
-        
-        console.log('✅ Image is a video file, converting...');
-        
-        // Get the parent cover section
-        const coverSection = img.closest('.s_cover, [data-bg-image-src]');
-        if (!coverSection) {
-            console.warn('⚠️ Could not find cover section parent');
+    }
+});
+
+// A video behind the facade only gets its controls with its source
+function setControls(video, enabled) {
+    if (video.classList.contains('o_video_facade')) {
+        video.dataset.facadeControls = String(enabled);
+        return;
+    }
+    video.controls = enabled;
+    if (enabled) {
+        video.setAttribute('controls', '');
+    } else {
+        video.removeAttribute('controls');
+    }
+}
+
+// Poster and play button until the visitor asks for the video
+function showFacade(video, src) {
+    const host = video.parentElement;
+    const button = document.createElement('button');
+    button.type = 'button';
+    button.className = 'o_video_facade_play';
+    button.setAttribute('aria-label', 'Play video');
+    // Native controls would offer a play button with no source behind it
+    const controls = video.hasAttribute('controls');
+    setControls(video, false);
+    host.classList.add('o_video_facade_host');
+    video.classList.add('o_video_facade');
+    video.dataset.facadeControls = String(controls);
+    host.insertBefore(button, video.nextSibling);
+    button.addEventListener('click', () => {
+        button.remove();
+        video.classList.remove('o_video_facade');
+        setControls(video, video.dataset.facadeControls === 'true');
+        delete video.dataset.facadeControls;
+        loadSource(video, src, true);
+    }, { once: true });
+}
+
+/**
+ * Give ``video`` its source once it is needed: autoplay videos when they
+ * near the viewport, others behind a click-to-play facade. With Save-Data
+ * or prefers-reduced-data, background videos stay still and autoplay ones
+ * wait for a click. ``video`` must already be in the page.
+ */
+function attachSource(video, src, { autoplay = false, background = false } = {}) {
+    video.setAttribute('data-src', src);
+    if (editorMode) {
+        loadSource(video, src, autoplay);
+        return;
+    }
+    video.preload = 'none';
+    if (autoplay && prefersReducedData()) {
+        if (background) {
             return;
         }
-        
-        // Create video element
-        const video = document.createElement('video');
-        video.src = img.src;
-        video.className = img.className;
-        video.setAttribute('data-src', img.getAttribute('data-src'));
-        video.setAttribute('data-video-src', img.getAttribute('data-video-src'));
-        video.setAttribute('data-bg-video', img.getAttribute('data-bg-video'));
-        video.setAttribute('data-is-local-video', 'true');
-        video.style.width = img.style.width || '100%';
-        video.style.height = img.style.height || '100%';
-        video.style.objectFit = img.style.objectFit || 'cover';
-        video.style.display = img.style.display || 'block';
-        
-        // Background videos should autoplay
+        autoplay = false;
+    }
+    if (autoplay) {
+        whenNearViewport(video, () => loadSource(video, src, true));
+    } else {
+        showFacade(video, src);
+    }
+}
+
+/**
+ * Return the elements matching ``selector`` in ``root``, plus the closest
+ * matching ancestor: a video added into an existing container still needs
+ * that container's settings applied.
+ */
+function collectWithAncestor(root, selector) {
+    const found = queryWithin(root, selector);
+    const ancestor = root.parentElement && root.parentElement.closest(selector);
+    if (ancestor) {
+        found.push(ancestor);
+    }
+    return found;
+}
+
+function applyContainerSettings(container) {
+    const video = container.querySelector('video');
+    if (!video || configuredVideos.has(video)) {
+        // Processed again once a new video is added
+        return false;
+    }
+
+    // Read control settings from data attributes
+    const autoplay = container.getAttribute('data-video-autoplay') === 'true';
+    const loop = container.getAttribute('data-video-loop') === 'true';
+    const hideControls = container.getAttribute('data-video-hide-controls') === 'true';
+    const hideFullscreen = container.getAttribute('data-video-hide-fullscreen') === 'true';
+
+    // Apply autoplay
+    if (autoplay) {
         video.autoplay = true;
         video.muted = true;
-        video.loop = true;
-        video.playsInline = true;
         video.setAttribute('autoplay', '');
         video.setAttribute('muted', '');
-        video.setAttribute('loop', '');
         video.setAttribute('playsinline', '');
-        video.removeAttribute('controls');
-        
-        // Hide controls and disable fullscreen for background videos
+    }
+
+    // Apply loop
+    if (loop) {
+        video.loop = true;
+        video.setAttribute('loop', '');
+    }
+
+    // Apply controls visibility
+    setControls(video, !hideControls);
+    video.classList.toggle('no-controls', hideControls);
+
+    // Apply fullscreen restriction
+    if (hideFullscreen) {
         video.setAttribute('controlsList', 'nodownload nofullscreen');
         video.setAttribute('disablePictureInPicture', 'true');
-        
-        // Replace img with video
-        img.replaceWith(video);
-        
-        console.log('✅ Background video element created and inserted');
-        console.log('✅ Video autoplay:', video.autoplay);
-        console.log('✅ Video muted:', video.muted);
-        console.log('✅ Video loop:', video.loop);
-    });
+    } else {
+        video.removeAttribute('controlsList');
+        video.removeAttribute('disablePictureInPicture');
+    }
+    configuredVideos.add(video);
+    return true;
 }
 
-// Run when DOM is ready
-if (document.readyState === 'loading') {
-    document.addEventListener('DOMContentLoaded', processLocalVideos);
-} else {
-    // DOM already loaded
-    processLocalVideos();
+// Saved markup carries the src: drop it until the video is needed
+function deferSavedVideo(video) {
+    if (editorMode) {
+        return false;
+    }
+    const src = video.getAttribute('src');
+    video.removeAttribute('src');
+    video.load();
+    const background = Boolean(video.closest('.o_background_video')) ||
+                       video.classList.contains('o_we_background_video');
+    attachSource(video, src, { autoplay: video.autoplay || background, background });
+    return true;
 }
 
-// Also process dynamically added videos
-const observer = new MutationObserver((mutations) => {
-    let shouldProcess = false;
-    
-    mutations.forEach((mutation) => {
-        if (mutation.type === 'childList') {
-            // Check for new video containers
-            const newVideos = document.querySelectorAll('.o_custom_video_container[data-is-local-video="true"]:not(.video-processed)');
-            if (newVideos.length > 0) {
-                newVideos.forEach(v => v.classList.add('video-processed'));
-                shouldProcess = true;
-            }
-            
-            // Check for new iframes with video URLs
-            mutation.addedNodes.forEach(node => {
-                if (node.nodeType === 1) { // Element node
-                    const iframes = node.querySelectorAll ? node.querySelectorAll('iframe') : [];
-                    iframes.forEach(iframe => {
-                        const src = iframe.src || '';
-                        if (src.includes('/web/video/') || src.includes('.mp4') || src.includes('.webm')) {
-                            shouldProcess = true;
-                        }
-                    });
-                    // Also check if the node itself is an iframe
-                    if (node.tagName === 'IFRAME') {
-                        const src = node.src || '';
-                        if (src.includes('/web/video/') || src.includes('.mp4') || src.includes('.webm')) {
-                            shouldProcess = true;
-                        }
-                    }
-                }
-            });
-        }
-    });
-    
-    if (shouldProcess) {
-        console.log('🎬 DOM changed, re-processing videos...');
-        // Small delay to let DOM settle
-        setTimeout(processLocalVideos, 100);
+function convertIframe(iframe) {
+    const src = iframe.src || iframe.getAttribute('data-src') || '';
+    if (!isLocalVideoIframeSrc(src)) {
+        return false;
     }
-});
+    console.log('🎬 Found iframe with local video, converting:', src);
 
-// Observe the document body for changes
-observer.observe(document.body, {
-    childList: true,
-    subtree: true,
-});
+    // Clean the src (remove any query params like &enablejsapi=1)
+    let cleanSrc = src.split('&')[0].split('?')[0];
+    if (!cleanSrc.includes('.mp4') && !cleanSrc.includes('.webm')) {
+        cleanSrc = src;
+    }
+
+    // Get parent container to read control settings
+    const container = iframe.closest('.media_iframe_video, .o_custom_video_container');
 
-// Also run periodically for editor scenarios
-setInterval(() => {
-    const iframesWithVideo = document.querySelectorAll('iframe[src*="/web/video/"], iframe[src*=".mp4"]');
-    if (iframesWithVideo.length > 0) {
-        console.log('🎬 Found unconverted video iframes, processing...');
-        processLocalVideos();
+    // Read control settings from container data attributes
+    let autoplay = false;
+    let loop = false;
+    let hideControls = false;
+    let hideFullscreen = false;
+    let isBackground = false;
+
+    if (container) {
+        autoplay = container.getAttribute('data-video-autoplay') === 'true';
+        loop = container.getAttribute('data-video-loop') === 'true';
+        hideControls = container.getAttribute('data-video-hide-controls') === 'true';
+        hideFullscreen = container.getAttribute('data-video-hide-fullscreen') === 'true';
+        isBackground = container.classList.contains('o_background_video');
     }
-}, 2000);
 
-console.log('✅ Video Frontend Processor Initialized');
+    // Also check if iframe itself has background class
+    if (iframe.classList.contains('o_bg_video_iframe')) {
+        isBackground = true;
+    }
 
-// Function to process background video iframes specifically
-function processBackgroundVideoIframes() {
-    const bgContainers = document.querySelectorAll('.o_background_video, .media_iframe_video.o_background_video');
-    console.log(`🎬 Processing ${bgContainers.length} background video containers`);
-    
-    bgContainers.forEach(container => {
-        const iframe = container.querySelector('iframe');
-        if (!iframe) return;
-        
-        const src = iframe.src || iframe.getAttribute('data-src') || '';
-        if (!src.includes('/web/video/') && !src.includes('.mp4') && !src.includes('.webm')) return;
-        
-        console.log('🎬 Converting background iframe to video:', src);
-        
-        // Clean src
-        let cleanSrc = src.split('&')[0].split('?')[0];
-        
-        const video = document.createElement('video');
-        video.src = cleanSrc;
-        video.className = iframe.className;
-        video.style.cssText = iframe.style.cssText;
-        video.setAttribute('data-src', cleanSrc);
-        video.setAttribute('data-is-local-video', 'true');
-        
-        // Background video settings
+    // Check parent elements for background indicators
+    const parentSection = iframe.closest('.s_cover, [data-bg-video-src], .o_we_bg_filter');
+    if (parentSection) {
+        isBackground = true;
+    }
+
+    // Background videos always have specific settings
+    if (isBackground) {
+        autoplay = true;
+        loop = true;
+        hideControls = true;
+        hideFullscreen = true;
+    }
+
+    const video = document.createElement('video');
+    video.className = iframe.className;
+    video.style.cssText = iframe.style.cssText;
+    video.setAttribute('data-is-local-video', 'true');
+    video.style.width = '100%';
+    video.style.height = '100%';
+
+    // Apply autoplay
+    if (autoplay) {
         video.autoplay = true;
-        video.muted = true;
-        video.loop = true;
-        video.playsInline = true;
+        video.muted = true;  // Required for autoplay
         video.setAttribute('autoplay', '');
         video.setAttribute('muted', '');
-        video.setAttribute('loop', '');
         video.setAttribute('playsinline', '');
+    }
+
+    // Apply loop
+    if (loop) {
+        video.loop = true;
+        video.setAttribute('loop', '');
+    }
+
+    // Apply controls
+    if (hideControls) {
         video.controls = false;
         video.removeAttribute('controls');
-        video.classList.add('no-controls');
-        video.style.objectFit = 'cover';
-        video.style.pointerEvents = 'none';
-        
-        iframe.replaceWith(video);
-        console.log('✅ Background iframe converted to video');
-        
-        video.play().catch(e => console.log('Autoplay blocked'));
-    });
+    } else {
+        video.controls = true;
+        video.setAttribute('controls', '');
+    }
+
+    // Apply fullscreen restriction
+    if (hideFullscreen) {
+        video.setAttribute('controlsList', 'nodownload nofullscreen');
+        video.setAttribute('disablePictureInPicture', 'true');
+    }
+
+    // Object fit based on context
+    video.style.objectFit = isBackground ? 'cover' : 'contain';
+
+    processedNodes.add(video);
+    iframe.replaceWith(video);
+    attachSource(video, cleanSrc, { autoplay, background: isBackground });
+    return true;
 }
 
+function convertForegroundPlaceholder(img) {
+    const src = img.getAttribute('data-video-src') || img.src;
+    if (!src) return false;
+
+    const video = document.createElement('video');
+    video.className = 'img img-fluid o_we_custom_image';
+    video.setAttribute('data-is-local-video', 'true');
+    video.style.width = '100%';
+    video.style.height = 'auto';
+
+    // Apply control settings from data attributes
+    const autoplay = img.getAttribute('data-video-autoplay') === 'true';
+    const loop = img.getAttribute('data-video-loop') === 'true';
+    const hideControls = img.getAttribute('data-video-hide-controls') === 'true';
+
+    if (autoplay) {
+        video.autoplay = true;
+        video.muted = true;
+        video.setAttribute('autoplay', '');
+        video.setAttribute('muted', '');
+    }
+    if (loop) {
+        video.loop = true;
+        video.setAttribute('loop', '');
+    }
+    if (!hideControls) {
+        video.controls = true;
+        video.setAttribute('controls', '');
+    }
+    video.playsInline = true;
+    video.setAttribute('playsinline', '');
+
+    processedNodes.add(video);
+    img.parentNode.replaceChild(video, img);
+    attachSource(video, src, { autoplay });
+    return true;
+}
+
+function convertBackgroundImage(img) {
+    // Only process if src ends with video extension
+    const isVideoFile = VIDEO_EXTENSIONS.some(ext => img.src.endsWith(ext) || img.src.includes(ext + '?'));
+    if (!isVideoFile) {
+        return false;
+    }
+
+    // Get the parent cover section
+    const coverSection = img.closest('.s_cover, [data-bg-image-src]');
+    if (!coverSection) {
+        console.warn('⚠️ Could not find cover section parent');
+        return false;
+    }
+
+    // Create video element
+    const src = img.src;
+    const video = document.createElement('video');
+    video.className = img.className;
+    video.setAttribute('data-video-src', img.getAttribute('data-video-src'));
+    video.setAttribute('data-bg-video', img.getAttribute('data-bg-video'));
+    video.setAttribute('data-is-local-video', 'true');
+    video.style.width = img.style.width || '100%';
+    video.style.height = img.style.height || '100%';
+    video.style.objectFit = img.style.objectFit || 'cover';
+    video.style.display = img.style.display || 'block';
+
+    // Background videos should autoplay
+    video.autoplay = true;
+    video.muted = true;
+    video.loop = true;
+    video.playsInline = true;
+    video.setAttribute('autoplay', '');
+    video.setAttribute('muted', '');
+    video.setAttribute('loop', '');
+    video.setAttribute('playsinline', '');
+    video.removeAttribute('controls');
+
+    // Hide controls and disable fullscreen for background videos
+    video.setAttribute('controlsList', 'nodownload nofullscreen');
+    video.setAttribute('disablePictureInPicture', 'true');
+
+    // Replace img with video
+    processedNodes.add(video);
+    img.replaceWith(video);
+    attachSource(video, src, { autoplay: true, background: true });
+    return true;
+}
+
+// Background video iframes are converted even in the editor
+function convertBackgroundIframe(container) {
+    const iframe = container.querySelector('iframe');
+    if (!iframe) return false;
+
+    const src = iframe.src || iframe.getAttribute('data-src') || '';
+    if (!src.includes('/web/video/') && !src.includes('.mp4') && !src.includes('.webm')) return false;
+
+    // Clean src
+    let cleanSrc = src.split('&')[0].split('?')[0];
+
+    const video = document.createElement('video');
+    video.className = iframe.className;
+    video.style.cssText = iframe.style.cssText;
+    video.setAttribute('data-is-local-video', 'true');
+
+    // Background video settings
+    video.autoplay = true;
+    video.muted = true;
+    video.loop = true;
+    video.playsInline = true;
+    video.setAttribute('autoplay', '');
+    video.setAttribute('muted', '');
+    video.setAttribute('loop', '');
+    video.setAttribute('playsinline', '');
+    video.controls = false;
+    video.removeAttribute('controls');
+    video.classList.add('no-controls');
+    video.style.objectFit = 'cover';
+    video.style.pointerEvents = 'none';
+
+    processedNodes.add(video);
+    iframe.replaceWith(video);
+    attachSource(video, cleanSrc, { autoplay: true, background: true });
+    return true;
+}
+
+/**
+ * Run ``convert`` once on each element: elements it handles are remembered,
+ * elements it skips (e.g. an iframe whose src is not set yet) are retried
+ * when they change again.
+ */
+function processOnce(elements, convert) {
+    let converted = 0;
+    for (const element of elements) {
+        if (processedNodes.has(element) || !element.isConnected) {
+            continue;
+        }
+        if (convert(element)) {
+            processedNodes.add(element);
+            converted += 1;
+        }
+    }
+    return converted;
+}
+
+/**
+ * Apply video settings and convert local video placeholders inside ``root``
+ *
+ * Only ``root`` and its descendants are examined, never the whole document
+ * again: the initial pass covers the document, the shared observer then
+ * hands over the subtrees added later. Pages saved since the markup is
+ * rendered server-side only have videos left to defer.
+ *
+ * @returns {number} number of elements processed
+ */
+export function processLocalVideos(root = document) {
+    let processed = 0;
+    editorMode = Boolean(isEditorMode());
+    if (editorMode) {
+        // Process background video iframes even in editor
+        processed += processOnce(collectWithAncestor(root, BG_CONTAINER_SELECTOR), convertBackgroundIframe);
+    }
+    processed += processOnce(queryWithin(root, 'iframe'), convertIframe);
+    processed += processOnce(queryWithin(root, FG_PLACEHOLDER_SELECTOR), convertForegroundPlaceholder);
+    processed += processOnce(queryWithin(root, BG_IMAGE_SELECTOR), convertBackgroundImage);
+    // After the conversions, so the videos they create get their settings
+    // in this pass. Containers are never marked processed: their current
+    // video decides
+    processed += collectWithAncestor(root, CONTAINER_SELECTOR)
+        .filter(container => container.isConnected && applyContainerSettings(container)).length;
+    processed += processOnce(queryWithin(root, SAVED_VIDEO_SELECTOR), deferSavedVideo);
+    if (processed) {
+        console.log(`🎬 Processed ${processed} local video elements`);
+    }
+    return processed;
+}
+
+// Run when DOM is ready
+if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', () => processLocalVideos());
+} else {
+    // DOM already loaded
+    processLocalVideos();
+}
+
+// Then only look at what gets added (snippets dropped, editor re-renders,
+// iframes getting their src): no periodic full-document polling
+onVideoNodesAdded((roots) => {
+    for (const root of roots) {
+        processLocalVideos(root);
+    }
+});
+
+console.log('✅ Video Frontend Processor Initialized');
+
 
 
 // ═══════════════════════════════════════════════════════════════════
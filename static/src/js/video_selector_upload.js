@@ -236,6 +236,10 @@ const SUPPORTED_VIDEO_FORMATS = [
 ];
 const MAX_VIDEO_SIZE = 100 * 1024 * 1024; // 100 MB
 
+// Library pages already received, keyed by request: reused while the server
+// answers "not_modified" for their etag
+const videoLibraryPages = new Map();
+
 patch(VideoSelector.prototype, {
     setup() {
         try {
@@ -245,7 +249,7 @@ patch(VideoSelector.prototype, {
             this.videoFileInputRef = useRef("videoFileInput");
             
             // State for uploaded videos list
-            this.uploadedVideos = useState({ list: [] });
+            this.uploadedVideos = useState({ list: [], search: "", nextCursor: null, total: 0, totalIsEstimate: false, selected: [] });
             
             // CRITICAL: Initialize local video options
             this.localVideoOptions = useState({
@@ -409,11 +413,22 @@ patch(VideoSelector.prototype, {
         }
     },
 
-    async loadUploadedVideos() {
+    async loadUploadedVideos({ append = false } = {}) {
     try {
-        const result = await rpc("/web/video/list", {});
+        const params = {
+            search: this.uploadedVideos.search || null,
+            cursor: append ? this.uploadedVideos.nextCursor : null,
+        };
+        const pageKey = JSON.stringify(params);
+        const cached = videoLibraryPages.get(pageKey);
+        let result = await rpc("/web/video/list", { ...params, etag: cached?.etag || null });
+        if (result.not_modified && cached) {
+            result = cached;
+        } else if (result.success && result.etag) {
+            videoLibraryPages.set(pageKey, result);
+        }
         if (result.success) {
-            this.uploadedVideos.list = (result.videos || []).map(video => {
+            const videos = (result.videos || []).map(video => {
                 // Add options to video object if they exist
                 return {
                     ...video,
@@ -425,12 +440,28 @@ patch(VideoSelector.prototype, {
                     }
                 };
             });
+            this.uploadedVideos.list = append ? [...this.uploadedVideos.list, ...videos] : videos;
+            this.uploadedVideos.nextCursor = result.next_cursor || null;
+            this.uploadedVideos.total = result.total || 0;
+            this.uploadedVideos.totalIsEstimate = !!result.total_is_estimate;
             console.log(`✅ Loaded ${this.uploadedVideos.list.length} videos with options`);
         }
     } catch (err) {
         console.error("Failed to load videos:", err);
     }
 },
+
+    onSearchUploadedVideos(ev) {
+        this.uploadedVideos.search = ev.target.value.trim();
+        clearTimeout(this._uploadedVideosSearchTimeout);
+        this._uploadedVideosSearchTimeout = setTimeout(() => this.loadUploadedVideos(), 300);
+    },
+
+    async onLoadMoreUploadedVideos(ev) {
+        ev.preventDefault();
+        await this.loadUploadedVideos({ append: true });
+    },
+
     onClickUploadVideo(ev) {
         ev.preventDefault();
         this.videoFileInputRef.el?.click();
@@ -573,6 +604,72 @@ async saveVideoOptionsToServer(videoId, options) {
         }
     },
 
+    onToggleSelectVideo(ev, video) {
+        const selected = this.uploadedVideos.selected;
+        const index = selected.indexOf(video.id);
+        if (index >= 0) {
+            selected.splice(index, 1);
+        } else {
+            selected.push(video.id);
+        }
+    },
+
+    _notifyBatchResults(results, successMessage) {
+        const failed = results.filter(item => !item.success);
+        if (failed.length) {
+            this.notification.add(
+                _t("%s of %s videos failed: %s", failed.length, results.length, failed[0].error),
+                { type: "warning" }
+            );
+        } else {
+            this.notification.add(successMessage, { type: "success" });
+        }
+    },
+
+    async onDeleteSelectedVideos(ev) {
+        ev.preventDefault();
+        const ids = [...this.uploadedVideos.selected];
+        if (!ids.length || !confirm(`Delete ${ids.length} videos?`)) {
+            return;
+        }
+        try {
+            const result = await rpc("/web/video/delete/batch", { attachment_ids: ids });
+            if (!result.success) {
+                throw new Error(result.error || "Delete failed");
+            }
+            this._notifyBatchResults(result.results, _t("%s videos deleted!", ids.length));
+            this.uploadedVideos.selected = [];
+            await this.loadUploadedVideos();
+        } catch (err) {
+            console.error("Batch delete failed:", err);
+            this.notification.add(err.message || _t("Delete failed"), { type: "danger" });
+        }
+    },
+
+    async onApplyOptionsToSelectedVideos(ev) {
+        ev.preventDefault();
+        const options = { ...this.localVideoOptions };
+        const patches = this.uploadedVideos.selected.map(id => ({ attachment_id: id, options }));
+        if (!patches.length) {
+            return;
+        }
+        try {
+            const result = await rpc("/web/video/save-options/batch", { patches });
+            if (!result.success) {
+                throw new Error(result.error || "Save failed");
+            }
+            for (const video of this.uploadedVideos.list) {
+                if (this.uploadedVideos.selected.includes(video.id)) {
+                    video.options = { ...options };
+                }
+            }
+            this._notifyBatchResults(result.results, _t("Options applied to %s videos", patches.length));
+        } catch (err) {
+            console.error("Batch options save failed:", err);
+            this.notification.add(err.message || _t("Save failed"), { type: "danger" });
+        }
+    },
+
     async onChangeOption(optionId) {
     if (this.state.platform !== 'local') {
         return super.onChangeOption(...arguments);
@@ -0,0 +1,52 @@
+/** @odoo-module **/
+
+import { onWillStart } from "@odoo/owl";
+import { MediaDialog } from "@html_editor/main/media/media_dialog/media_dialog";
+import { loadBundle } from "@web/core/assets";
+import { patch } from "@web/core/utils/patch";
+
+// ═══════════════════════════════════════════════════════════════════════════════
+// Video uploader loader
+// The uploader (video_selector_upload.js, its templates and styles) is its own
+// bundle, loaded the first time a media dialog shows its video tab. It must be
+// loaded before the VideoSelector is created: its setup and template patches
+// only apply to selectors created afterwards.
+// ═══════════════════════════════════════════════════════════════════════════════
+
+const UPLOADER_BUNDLE = 'website_video_upload.assets_video_uploader';
+
+let uploaderLoaded = null;
+
+export function loadVideoUploader() {
+    if (!uploaderLoaded) {
+        uploaderLoaded = loadBundle(UPLOADER_BUNDLE).catch((e) => {
+            uploaderLoaded = null;
+            throw e;
+        });
+    }
+    return uploaderLoaded;
+}
+
+function isVideoTab(tab) {
+    const id = typeof tab === 'string' ? tab : tab?.id;
+    return Boolean(id) && id.toUpperCase().includes('VIDEO');
+}
+
+patch(MediaDialog.prototype, {
+    setup() {
+        super.setup(...arguments);
+        // Dialogs opened on an existing video start on the video tab
+        onWillStart(async () => {
+            if (isVideoTab(this.state?.activeTab)) {
+                await loadVideoUploader();
+            }
+        });
+    },
+
+    async onTabChange(tab) {
+        if (isVideoTab(tab)) {
+            await loadVideoUploader();
+        }
+        return super.onTabChange(...arguments);
+    },
+});
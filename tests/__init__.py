@@ -1 +1,2 @@
 from . import test_image_preservation
+from . import test_video_asset
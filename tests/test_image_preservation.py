@@ -10,8 +10,14 @@ This file contains tests to verify that:
 
 import base64
 import io
-from PIL import Image
-from odoo.tests.common import TransactionCase
+import os
+import zipfile
+from lxml import html
+from PIL import Image, PngImagePlugin
+from odoo.tests.common import HttpCase, TransactionCase, tagged
+from odoo.tools import config
+
+from ..tools.image_variants import cache_path
 
 
 class TestProductImagePreservation(TransactionCase):
@@ -113,6 +119,18 @@ class TestProductImagePreservation(TransactionCase):
         self.assertEqual(product_image.original_format, 'JPEG')
         self.assertEqual(product_image.original_dimensions, '1024 x 768 px')
 
+    def test_format_detection_with_wrapped_base64(self):
+        """Test that line-wrapped base64 values larger than the probed head are detected"""
+        buffer = io.BytesIO()
+        Image.effect_noise((1200, 900), 64).convert('RGB').save(buffer, format='PNG')
+        product_image = self.ProductImage.create({
+            'name': 'Test Wrapped',
+            'image_1920': base64.encodebytes(buffer.getvalue()),
+        })
+
+        self.assertEqual(product_image.original_format, 'PNG')
+        self.assertEqual(product_image.original_dimensions, '1200 x 900 px')
+
     def test_high_resolution_image_preservation(self):
         """Test that high-resolution image dimensions are preserved"""
         # Create a 4K image (3840x2160)
@@ -155,6 +173,428 @@ class TestProductImagePreservation(TransactionCase):
         self.assertNotEqual(product_image.original_dimensions, '')
         self.assertNotEqual(product_image.original_dimensions, 'UNKNOWN')
 
+    def test_template_main_image_info_stored(self):
+        """Test that template image info is stored and searchable"""
+        image_data = self._create_test_image('PNG', 1280, 720)
+
+        template = self.ProductTemplate.create({
+            'name': 'Test Stored Image Info',
+            'image_1920': image_data,
+        })
+
+        self.assertEqual(template.main_image_format, 'PNG')
+        self.assertEqual(template.main_image_dimensions, '1280 x 720 px')
+        self.assertEqual(template.main_image_width, 1280)
+        self.assertEqual(template.main_image_height, 720)
+        self.assertEqual(template.main_image_size, len(base64.b64decode(image_data)))
+
+        # Stored fields can be used in domains without decoding images
+        found = self.ProductTemplate.search([
+            ('id', '=', template.id),
+            ('main_image_width', '>=', 1280),
+        ])
+        self.assertEqual(found, template)
+
+        # Recomputed when the image changes
+        template.write({'image_1920': self._create_test_image('JPEG', 640, 480)})
+        self.assertEqual(template.main_image_format, 'JPEG')
+        self.assertEqual(template.main_image_width, 640)
+        self.assertEqual(template.main_image_height, 480)
+
+    def test_backfill_original_info(self):
+        """Test that the backfill fills metadata on pre-existing images"""
+        product_image = self.ProductImage.create({
+            'name': 'Test Backfill',
+            'image_1920': self._create_test_image('JPEG', 640, 480),
+        })
+        # Simulate an image created before the module was installed
+        product_image.write({'original_format': False, 'original_dimensions': False})
+        self.env['ir.config_parameter'].sudo().set_param('website_video_upload.backfill_last_id', 0)
+
+        stats = self.ProductImage._backfill_original_info(workers=1, commit=False)
+
+        self.assertGreaterEqual(stats['updated'], 1)
+        self.assertTrue(stats['done'])
+        self.assertEqual(product_image.original_format, 'JPEG')
+        self.assertEqual(product_image.original_dimensions, '640 x 480 px')
+
+    def test_batched_detection_keeps_order(self):
+        """Test that detection on a multi-record create writes results back in order"""
+        sizes = [('PNG', 300, 200), ('JPEG', 640, 480), ('GIF', 128, 64), ('PNG', 1024, 512)]
+        product_images = self.ProductImage.create([
+            {'name': f'Batch {index}', 'image_1920': self._create_test_image(*size)}
+            for index, size in enumerate(sizes)
+        ])
+
+        for product_image, (fmt, width, height) in zip(product_images, sizes):
+            self.assertEqual(product_image.original_format, fmt)
+            self.assertEqual(product_image.original_dimensions, f'{width} x {height} px')
+
+    def test_responsive_image_attrs(self):
+        """Test that srcset candidates stop at the original width"""
+        template = self.ProductTemplate.create({
+            'name': 'Test Responsive',
+            'image_1920': self._create_test_image('JPEG', 1000, 500),
+        })
+
+        attrs = template._get_responsive_image_attrs('image_1024')
+
+        self.assertEqual(attrs['width'], '1000')
+        self.assertEqual(attrs['height'], '500')
+        self.assertIn('320w', attrs['srcset'])
+        self.assertIn('960w', attrs['srcset'])
+        self.assertIn('1000w', attrs['srcset'])
+        self.assertNotIn('1280w', attrs['srcset'])
+        self.assertTrue(attrs['sizes'])
+
+    def test_lossless_optimization_on_upload(self):
+        """Test that optional lossless optimization keeps pixels and format"""
+        self.env['ir.config_parameter'].sudo().set_param('website_video_upload.lossless_optimize', 'True')
+        img = Image.new('RGB', (400, 300), color=(200, 30, 30))
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', compress_level=0)
+        original_bytes = buffer.getvalue()
+
+        product_image = self.ProductImage.create({
+            'name': 'Test Lossless',
+            'image_1920': base64.b64encode(original_bytes),
+        })
+
+        stored_bytes = base64.b64decode(product_image.image_1920)
+        self.assertLess(len(stored_bytes), len(original_bytes))
+        self.assertEqual(product_image.lossless_saved_bytes, len(original_bytes) - len(stored_bytes))
+        self.assertEqual(product_image.original_format, 'PNG')
+        self.assertEqual(product_image.original_dimensions, '400 x 300 px')
+        self.assertEqual(Image.open(io.BytesIO(stored_bytes)).tobytes(), img.tobytes())
+
+    def test_lossless_batch_skips_optimized_images(self):
+        """Test that the batch job does not process an unchanged original twice"""
+        img = Image.new('RGB', (400, 300), color=(30, 200, 30))
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', compress_level=0)
+        product_image = self.ProductImage.create({
+            'name': 'Test Lossless Batch',
+            'image_1920': base64.b64encode(buffer.getvalue()),
+        })
+        self.env['ir.config_parameter'].sudo().set_param('website_video_upload.optimize_last_id', 0)
+
+        self.ProductImage._optimize_existing_images(commit=False)
+        saved = product_image.lossless_saved_bytes
+        self.assertGreater(saved, 0)
+        self.assertTrue(product_image.lossless_checksum)
+
+        stats = self.ProductImage._optimize_existing_images(commit=False)
+        self.assertGreaterEqual(stats['skipped'], 1)
+        self.assertEqual(product_image.lossless_saved_bytes, saved)
+
+    def test_lossless_optimization_skips_16_bit_png(self):
+        """Test that 16-bit PNG originals are not re-saved with 8-bit samples"""
+        self.env['ir.config_parameter'].sudo().set_param('website_video_upload.lossless_optimize', 'True')
+        img = Image.new('I;16', (400, 300))
+        img.putdata([(x * 163) % 65536 for x in range(400 * 300)])
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', compress_level=0)
+        original_bytes = buffer.getvalue()
+
+        product_image = self.ProductImage.create({
+            'name': 'Test Lossless 16-bit',
+            'image_1920': base64.b64encode(original_bytes),
+        })
+
+        self.assertEqual(base64.b64decode(product_image.image_1920), original_bytes)
+        self.assertFalse(product_image.lossless_saved_bytes)
+
+    def test_lossless_optimization_keeps_gamma(self):
+        """Test that the PNG colour chunks survive the lossless re-save"""
+        self.env['ir.config_parameter'].sudo().set_param('website_video_upload.lossless_optimize', 'True')
+        pnginfo = PngImagePlugin.PngInfo()
+        pnginfo.add(b'gAMA', (45455).to_bytes(4, 'big'))
+        buffer = io.BytesIO()
+        Image.new('RGB', (400, 300), color=(30, 30, 200)).save(
+            buffer, format='PNG', compress_level=0, pnginfo=pnginfo)
+
+        product_image = self.ProductImage.create({
+            'name': 'Test Lossless Gamma',
+            'image_1920': base64.b64encode(buffer.getvalue()),
+        })
+
+        self.assertGreater(product_image.lossless_saved_bytes, 0)
+        stored = Image.open(io.BytesIO(base64.b64decode(product_image.image_1920)))
+        self.assertEqual(stored.info.get('gamma'), 0.45455)
+
+    def test_placeholder_and_dominant_color(self):
+        """Test that a tiny placeholder and dominant colour are stored"""
+        product_image = self.ProductImage.create({
+            'name': 'Test Placeholder',
+            'image_1920': self._create_test_image('JPEG', 1600, 1200),
+        })
+
+        self.assertTrue(product_image.placeholder_data_uri.startswith('data:image/jpeg;base64,'))
+        self.assertLess(len(product_image.placeholder_data_uri), 2000)
+        self.assertRegex(product_image.dominant_color, r'^#[0-9a-f]{6}$')
+        self.assertIn(product_image.dominant_color, product_image._get_image_placeholder_style())
+
+    def _create_test_packshot(self, format='PNG', width=800, height=600):
+        """Create a non-uniform test image (a perceptual hash needs structure)"""
+        img = Image.linear_gradient('L').rotate(30).resize((width, height)).convert('RGB')
+        buffer = io.BytesIO()
+        img.save(buffer, format=format)
+        return base64.b64encode(buffer.getvalue()).decode('utf-8')
+
+    def test_duplicate_detection_and_merge(self):
+        """Test that re-exports of one image are detected and merged onto one blob"""
+        original = self.ProductImage.create({
+            'name': 'Packshot PNG',
+            'image_1920': self._create_test_packshot('PNG', 1600, 1200),
+        })
+        reexport = self.ProductImage.create({
+            'name': 'Packshot JPEG',
+            'image_1920': self._create_test_packshot('JPEG', 800, 600),
+        })
+        self.assertTrue(original.image_phash)
+
+        self.ProductImage._scan_duplicates()
+
+        # The highest resolution image is kept
+        self.assertFalse(original.duplicate_of_id)
+        self.assertEqual(reexport.duplicate_of_id, original)
+
+        reexport.action_merge_duplicates()
+
+        self.assertFalse(reexport.duplicate_of_id)
+        self.assertEqual(reexport.original_format, 'PNG')
+        checksums = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', 'product.image'),
+            ('res_field', '=', 'image_1920'),
+            ('res_id', 'in', (original + reexport).ids),
+        ]).mapped('checksum')
+        self.assertEqual(len(set(checksums)), 1)
+
+    def test_duplicate_scan_ignores_colour_variants_and_solid_images(self):
+        """Test that colour variants and uniform images are never grouped"""
+        gradient = Image.linear_gradient('L').rotate(30).resize((800, 600))
+        dark = gradient.point(lambda value: value // 3)
+        images = self.ProductImage
+        for name, channels in (('Red', (gradient, dark, dark)), ('Blue', (dark, dark, gradient))):
+            buffer = io.BytesIO()
+            Image.merge('RGB', channels).save(buffer, format='PNG')
+            images |= self.ProductImage.create({'name': name, 'image_1920': base64.b64encode(buffer.getvalue())})
+        for name in ('Solid 1', 'Solid 2'):
+            images |= self.ProductImage.create({'name': name, 'image_1920': self._create_test_image('PNG', 100, 100)})
+        red, blue, solid_1, solid_2 = images
+        self.assertEqual(red.image_phash, blue.image_phash)
+        self.assertNotEqual(red.image_color_signature, blue.image_color_signature)
+        self.assertEqual(solid_1.image_phash, '0000000000000000')
+        self.assertFalse(solid_1.phash_seg0)
+
+        self.ProductImage._scan_duplicates()
+
+        self.assertFalse(images.duplicate_of_id)
+
+    def test_duplicate_members_are_close_to_keeper(self):
+        """Test that a chain of near pairs does not join images far from the keeper"""
+        images = self.ProductImage
+        for name, width in (('Chain A', 1600), ('Chain B', 1200), ('Chain C', 800)):
+            images |= self.ProductImage.create({'name': name, 'image_1920': self._create_test_packshot('PNG', width, 600)})
+        chain_a, chain_b, chain_c = images
+        # B is 3 bits from A and from C, C is 6 bits from A
+        base = int('5a5a5a5a5a5a5a5a', 16)
+        chain_a.write({'image_phash': f"{base:016x}"})
+        chain_b.write({'image_phash': f"{base ^ 0b111:016x}"})
+        chain_c.write({'image_phash': f"{base ^ 0b111111:016x}"})
+
+        self.ProductImage._scan_duplicates()
+
+        self.assertEqual(chain_b.duplicate_of_id, chain_a)
+        self.assertFalse(chain_c.duplicate_of_id)
+
+    def test_bulk_import_from_zip(self):
+        """Test that ZIP entries are matched to products by file name"""
+        template = self.ProductTemplate.create({'name': 'Bulk Import', 'default_code': 'BULK001'})
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, 'w') as zf:
+            zf.writestr('BULK001_front.png', base64.b64decode(self._create_test_image('PNG', 640, 480)))
+            zf.writestr('BULK001-back.jpg', base64.b64decode(self._create_test_image('JPEG', 320, 240)))
+            zf.writestr('UNKNOWN999.png', base64.b64decode(self._create_test_image('PNG', 10, 10)))
+            zf.writestr('notes.txt', b'not an image')
+        archive.seek(0)
+
+        stats = self.ProductImage._bulk_import_images(archive, workers=1, commit=False, prewarm=False)
+
+        self.assertEqual(stats['processed'], 3)
+        self.assertEqual(stats['created'], 2)
+        self.assertEqual(stats['unmatched'], ['UNKNOWN999.png'])
+        images = template.product_template_image_ids.sorted('name')
+        self.assertEqual(images.mapped('original_format'), ['JPEG', 'PNG'])
+        self.assertEqual(images.mapped('original_dimensions'), ['320 x 240 px', '640 x 480 px'])
+
+    def test_attach_original_from_file(self):
+        """Test that a file on disk becomes the shared blob of every size field"""
+        template = self.ProductTemplate.create({'name': 'Large Original'})
+        product_image = self.ProductImage.create({'name': 'Large', 'product_tmpl_id': template.id})
+        uploads_dir = os.path.join(config.filestore(self.env.cr.dbname), 'product_image_uploads')
+        os.makedirs(uploads_dir, exist_ok=True)
+        path = os.path.join(uploads_dir, 'test_attach_original.part')
+        with open(path, 'wb') as f:
+            f.write(base64.b64decode(self._create_test_image('PNG', 2400, 1600)))
+
+        product_image._attach_original_from_file(path)
+
+        self.assertFalse(os.path.exists(path))
+        self.assertEqual(product_image.original_format, 'PNG')
+        self.assertEqual(product_image.original_dimensions, '2400 x 1600 px')
+        attachments = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', 'product.image'),
+            ('res_id', '=', product_image.id),
+            ('res_field', '!=', False),
+        ])
+        self.assertEqual(len(attachments), 5)
+        self.assertEqual(len(set(attachments.mapped('checksum'))), 1)
+        self.assertEqual(product_image.image_1920, product_image.image_128)
+
+    def test_storage_ledger_counts_shared_blob(self):
+        """Test that replicated size fields are accounted as one shared blob"""
+        template = self.ProductTemplate.create({'name': 'Storage Ledger'})
+        product_image = self.ProductImage.create({
+            'name': 'Ledger',
+            'product_tmpl_id': template.id,
+            'image_1920': self._create_test_image('PNG', 777, 555),
+        })
+        lines = self.env['product.image.storage.line'].search([('product_image_id', '=', product_image.id)])
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(len(set(lines.mapped('store_fname'))), 1)
+        self.assertTrue(all(lines.mapped('is_shared')))
+        self.assertEqual(lines.mapped('product_tmpl_id'), template)
+        self.assertAlmostEqual(sum(lines.mapped('physical_size')), lines[0].file_size)
+        self.assertAlmostEqual(sum(lines.mapped('blob_share')), 1.0)
+
+        product_image.unlink()
+        self.assertFalse(lines.exists())
+
+    def test_storage_ledger_covers_product_and_variant_images(self):
+        """Test that the image fields of products and variants are in the ledger too"""
+        Ledger = self.env['product.image.storage.line']
+        template = self.ProductTemplate.create({
+            'name': 'Storage Ledger Product',
+            'image_1920': self._create_test_image('PNG', 640, 480),
+        })
+        template_lines = Ledger.search([('res_model', '=', 'product.template'), ('res_id', '=', template.id)])
+        self.assertTrue(template_lines)
+        self.assertEqual(template_lines.product_tmpl_id, template)
+
+        variant = template.product_variant_id
+        variant.write({'image_variant_1920': self._create_test_image('JPEG', 320, 240)})
+        variant_lines = Ledger.search([('res_model', '=', 'product.product'), ('res_id', '=', variant.id)])
+        self.assertTrue(variant_lines)
+        self.assertTrue(all(name.startswith('image_variant_') for name in variant_lines.mapped('res_field')))
+        self.assertEqual(variant_lines.product_tmpl_id, template)
+
+        template.unlink()
+        self.assertFalse((template_lines | variant_lines).exists())
+
+
+@tagged('post_install', '-at_install')
+class TestLosslessAlternates(HttpCase):
+    """Test cases for the Accept-negotiated lossless alternates of product images"""
+
+    def setUp(self):
+        super().setUp()
+        self.env['ir.config_parameter'].sudo().set_param('website_video_upload.serve_lossless_alternates', 'True')
+        # Uncompressed PNG: a lossless WebP of it is always smaller
+        img = Image.new('RGB', (320, 240), color=(40, 90, 160))
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', compress_level=0)
+        self.pixels = img.tobytes()
+        self.product_image = self.env['product.image'].create({
+            'name': 'Test Alternate',
+            'image_1920': base64.b64encode(buffer.getvalue()),
+        })
+        self.url = f'/web/image/product.image/{self.product_image.id}/image_1920'
+        checksum = self.product_image._get_preserved_image_attachment().checksum
+        self.webp_path = cache_path(config.filestore(self.env.cr.dbname), 'image_alternates', checksum, 'webp')
+        self.addCleanup(lambda: os.path.exists(self.webp_path) and os.remove(self.webp_path))
+
+    def test_original_served_without_accept(self):
+        """Test that clients not accepting WebP/AVIF get the original format"""
+        response = self.url_open(self.url, headers={'Accept': 'image/png,image/*;q=0.8'})
+        self.assertEqual(response.headers['Content-Type'], 'image/png')
+        self.assertIn('Accept', response.headers.get('Vary', ''))
+        self.assertFalse(os.path.exists(self.webp_path))
+
+    def test_alternate_served_when_accepted(self):
+        """Test that a pixel-identical WebP is served when Accept allows it"""
+        response = self.url_open(self.url, headers={'Accept': 'image/webp,image/*;q=0.8'})
+        self.assertEqual(response.headers['Content-Type'], 'image/webp')
+        self.assertIn('Accept', response.headers.get('Vary', ''))
+        served = Image.open(io.BytesIO(response.content))
+        self.assertEqual(served.format, 'WEBP')
+        self.assertEqual(served.convert('RGB').tobytes(), self.pixels)
+
+        # Refused explicitly, even if listed
+        response = self.url_open(self.url, headers={'Accept': 'image/webp;q=0,image/png'})
+        self.assertEqual(response.headers['Content-Type'], 'image/png')
+
+    def test_alternate_cached_and_reused(self):
+        """Test that the alternate is generated once and then read from the cache"""
+        self.url_open(self.url, headers={'Accept': 'image/webp'})
+        self.assertTrue(os.path.exists(self.webp_path))
+
+        with open(self.webp_path, 'wb') as f:
+            f.write(b'cached alternate')
+        response = self.url_open(self.url, headers={'Accept': 'image/webp'})
+        self.assertEqual(response.content, b'cached alternate')
+        self.assertIn('Accept', response.headers.get('Vary', ''))
+
+    def test_no_alternate_for_16_bit_source(self):
+        """Test that a 16-bit original is served as is, even when WebP is accepted"""
+        img = Image.new('I;16', (320, 240))
+        img.putdata([(x * 163) % 65536 for x in range(320 * 240)])
+        buffer = io.BytesIO()
+        img.save(buffer, format='PNG', compress_level=0)
+        product_image = self.env['product.image'].create({
+            'name': 'Test Alternate 16-bit',
+            'image_1920': base64.b64encode(buffer.getvalue()),
+        })
+
+        response = self.url_open(
+            f'/web/image/product.image/{product_image.id}/image_1920',
+            headers={'Accept': 'image/webp,image/*;q=0.8'},
+        )
+        self.assertEqual(response.headers['Content-Type'], 'image/png')
+        self.assertEqual(response.content, buffer.getvalue())
+
+
+@tagged('post_install', '-at_install')
+class TestProductImagePreload(HttpCase):
+    """Test cases for the preload link of the main product image"""
+
+    def test_preload_link_matches_rendered_image(self):
+        """Test that the Link header announces the srcset of the rendered main <img>"""
+        buffer = io.BytesIO()
+        Image.new('RGB', (1200, 900), color=(200, 60, 30)).save(buffer, format='PNG')
+        template = self.env['product.template'].create({
+            'name': 'Preload Test',
+            'is_published': True,
+            'image_1920': base64.b64encode(buffer.getvalue()),
+        })
+        variant = template.product_variant_id
+
+        response = self.url_open(template.website_url)
+        self.assertEqual(response.status_code, 200)
+        link = next((value for value in response.headers.get('Link', '').split(', <')
+                     if 'rel=preload; as=image' in value), None)
+        self.assertTrue(link)
+        self.assertIn(f'/web/image/product.product/{variant.id}/image_1920', link)
+
+        srcset = link.split('imagesrcset="', 1)[1].split('"', 1)[0]
+        sizes = link.split('imagesizes="', 1)[1].split('"', 1)[0]
+        rendered = [
+            img for img in html.fromstring(response.text).iter('img')
+            if f'/web/image/product.product/{variant.id}/image_1920' in (img.get('srcset') or '')
+        ]
+        self.assertTrue(rendered)
+        self.assertEqual(rendered[0].get('srcset'), srcset)
+        self.assertEqual(rendered[0].get('sizes'), sizes)
 
 # Usage: Run tests with:
 # ./odoo-bin -d mydb -m website_video_upload --test-enable -u website_video_upload
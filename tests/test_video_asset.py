@@ -0,0 +1,238 @@
+"""
+Test cases for the video library
+
+This file contains tests to verify that:
+1. Legacy video attachments are migrated to video.asset records
+2. The library pages, caches and batch operations behave as documented
+3. Orphan files and deleted videos are cleaned up safely
+4. Videos embedded in pages are indexed and saved as final markup
+"""
+
+import base64
+import io
+import json
+import os
+from PIL import Image
+from odoo.tests.common import TransactionCase
+
+
+class TestVideoAsset(TransactionCase):
+    """Test cases for the video.asset library"""
+
+    def test_video_asset_migration_from_attachment(self):
+        """Test that JSON video options of legacy attachments become video.asset columns"""
+        attachment = self.env['ir.attachment'].create({
+            'name': 'legacy.mp4',
+            'type': 'url',
+            'url': '/web/video/legacy_missing_file.mp4',
+            'mimetype': 'video/mp4',
+            'res_model': 'ir.ui.view',
+            'res_id': 0,
+            'description': json.dumps({'video_options': {'autoplay': True, 'loop': True}}),
+        })
+
+        self.env['video.asset']._migrate_from_attachments()
+        self.env['video.asset']._migrate_from_attachments()
+
+        asset = self.env['video.asset'].search([('attachment_id', '=', attachment.id)])
+        self.assertEqual(len(asset), 1)
+        self.assertEqual(asset.url, attachment.url)
+        self.assertEqual(asset.status, 'missing')
+        self.assertEqual(asset._get_video_options(), {
+            'autoplay': True, 'loop': True, 'hideControls': False, 'hideFullscreen': False,
+        })
+
+    def _create_test_video_asset(self, name, mimetype='video/mp4', file_size=1000):
+        attachment = self.env['ir.attachment'].create({
+            'name': name,
+            'type': 'url',
+            'url': f'/web/video/{name}',
+            'mimetype': mimetype,
+            'res_model': 'ir.ui.view',
+            'res_id': 0,
+        })
+        return self.env['video.asset'].create({
+            'name': name,
+            'attachment_id': attachment.id,
+            'storage_key': name,
+            'mimetype': mimetype,
+            'file_size': file_size,
+        })
+
+    def test_video_library_keyset_pagination(self):
+        """Test that library pages chain through next_cursor and filters apply"""
+        VideoAsset = self.env['video.asset']
+        VideoAsset.search([]).write({'status': 'missing'})
+        assets = [self._create_test_video_asset(f'library_{index}.mp4', file_size=index * 1000)
+                  for index in range(5)]
+        self._create_test_video_asset('other.webm', mimetype='video/webm')
+
+        first = VideoAsset._search_library(limit=2, mimetypes=['video/mp4'])
+        self.assertEqual([video['name'] for video in first['videos']], ['library_4.mp4', 'library_3.mp4'])
+        self.assertEqual(first['total'], 5)
+        self.assertFalse(first['total_is_estimate'])
+        second = VideoAsset._search_library(cursor=first['next_cursor'], limit=2, mimetypes=['video/mp4'])
+        self.assertEqual([video['name'] for video in second['videos']], ['library_2.mp4', 'library_1.mp4'])
+        last = VideoAsset._search_library(cursor=second['next_cursor'], limit=2, mimetypes=['video/mp4'])
+        self.assertEqual([video['id'] for video in last['videos']], [assets[0].attachment_id.id])
+        self.assertIsNone(last['next_cursor'])
+
+        found = VideoAsset._search_library(search='RARY_3', min_size=2000)
+        self.assertEqual([video['name'] for video in found['videos']], ['library_3.mp4'])
+
+    def test_video_library_cache_version(self):
+        """Test that library changes bump the version and change the page etag"""
+        VideoAsset = self.env['video.asset']
+        etag, page = VideoAsset._get_library_page(search='cache_test')
+        self.assertEqual(VideoAsset._get_library_page(search='cache_test'), (etag, page))
+
+        asset = self._create_test_video_asset('cache_test.mp4')
+        new_etag, new_page = VideoAsset._get_library_page(search='cache_test')
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual([video['name'] for video in new_page['videos']], ['cache_test.mp4'])
+
+        asset.write({'autoplay': True})
+        self.assertNotEqual(VideoAsset._get_library_etag(search='cache_test')[0], new_etag)
+
+    def test_video_batch_operations(self):
+        """Test that batch endpoints apply set-based changes and report per item"""
+        VideoAsset = self.env['video.asset']
+        first = self._create_test_video_asset('batch_1.mp4')
+        second = self._create_test_video_asset('batch_2.mp4')
+        first_id, second_id = first.attachment_id.id, second.attachment_id.id
+        missing_id = max(first_id, second_id) + 1000
+
+        results = VideoAsset._batch_update_options([
+            {'attachment_id': first_id, 'options': {'loop': True}},
+            {'attachment_id': second_id, 'options': {'loop': True}},
+            {'attachment_id': missing_id, 'options': {'loop': True}},
+        ])
+        self.assertEqual([result['success'] for result in results], [True, True, False])
+        self.assertTrue(all((first | second).mapped('loop')))
+
+        results = VideoAsset._batch_metadata([second_id, missing_id])
+        self.assertEqual(results[0]['video']['name'], 'batch_2.mp4')
+        self.assertEqual(results[1]['error'], 'Video not found')
+
+        results = VideoAsset._batch_delete([first_id, second_id])
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertFalse((first | second).exists())
+        self.assertFalse(self.env['ir.attachment'].browse([first_id, second_id]).exists())
+
+    def test_video_gc_reports_before_deleting(self):
+        """Test that orphan files are reported in dry run and deleted once past the grace period"""
+        VideoAsset = self.env['video.asset']
+        self.env['ir.config_parameter'].set_param('website_video_upload.video_gc_grace_hours', 0)
+        videos_dir = VideoAsset._get_videos_dir()
+        os.makedirs(videos_dir, exist_ok=True)
+        orphan_path = os.path.join(videos_dir, 'gc_test_orphan.mp4')
+        with open(orphan_path, 'wb') as f:
+            f.write(b'not referenced')
+        asset = self._create_test_video_asset('gc_test_missing_file.mp4')
+
+        files_done = assets_done = False
+        while not (files_done and assets_done):
+            stats = VideoAsset._gc_video_store(
+                dry_run=True, scan_files=not files_done, check_assets=not assets_done, commit=False,
+            )
+            files_done = files_done or stats['files_done']
+            assets_done = assets_done or stats['assets_done']
+        orphan = self.env['video.orphan.file'].search([('name', '=', 'gc_test_orphan.mp4')])
+        self.assertTrue(orphan)
+        self.assertTrue(os.path.exists(orphan_path))
+        self.assertEqual(asset.status, 'missing')
+
+        orphan._delete_orphan_files()
+        self.assertFalse(os.path.exists(orphan_path))
+        self.assertFalse(orphan.exists())
+
+    def test_video_usage_index_blocks_delete(self):
+        """Test that views embedding a video are indexed and protect it from deletion"""
+        asset = self._create_test_video_asset('usage_test.mp4')
+        view = self.env['ir.ui.view'].create({
+            'name': 'Usage Test Page',
+            'type': 'qweb',
+            'arch': '<t t-name="usage_test"><video src="/web/video/usage_test.mp4"/></t>',
+        })
+        self.assertEqual(asset.usage_count, 1)
+        self.assertEqual(asset.usage_ids.res_model, 'ir.ui.view')
+        self.assertEqual(asset.usage_ids.res_id, view.id)
+
+        results = self.env['video.asset']._batch_delete([asset.attachment_id.id])
+        self.assertFalse(results[0]['success'])
+        self.assertTrue(asset.exists())
+
+        view.write({'arch': '<t t-name="usage_test"><div/></t>'})
+        self.assertEqual(asset.usage_count, 0)
+
+    def test_video_file_deleted_after_queue_processing(self):
+        """Test that deleting a video only queues its file until the queue is processed"""
+        asset = self._create_test_video_asset('deferred_delete.mp4')
+        path = asset._get_file_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'video bytes')
+
+        asset._delete_videos()
+        self.assertTrue(os.path.exists(path))
+        queued = self.env['video.file.deletion'].search([('storage_key', '=', 'deferred_delete.mp4')])
+        self.assertEqual(len(queued), 1)
+
+        stats = self.env['video.file.deletion']._process_queue(commit=False)
+        self.assertGreaterEqual(stats['deleted'], 1)
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(queued.exists())
+
+    def test_video_markup_rendered_at_save(self):
+        """Test that local-video placeholders are saved as final video elements"""
+        asset = self._create_test_video_asset('markup_test.mp4')
+        asset.write({'width': 1280, 'height': 720})
+        view = self.env['ir.ui.view'].create({
+            'name': 'Markup Test Page',
+            'type': 'qweb',
+            'arch': '<t t-name="markup_test"><div>'
+                    '<img class="o_local_video_placeholder" data-is-local-video="true" '
+                    'data-video-src="/web/video/markup_test.mp4" data-video-loop="true" src="/web/video/markup_test.mp4"/>'
+                    '<div class="media_iframe_video o_custom_video_container" data-is-local-video="true" '
+                    'data-video-autoplay="true"><iframe src="/web/video/markup_test.mp4?autoplay=1"/></div>'
+                    '</div></t>',
+        })
+        self.assertNotIn('o_local_video_placeholder', view.arch_db)
+        self.assertNotIn('<iframe', view.arch_db)
+        self.assertEqual(view.arch_db.count('<video'), 2)
+        self.assertIn('width="1280"', view.arch_db)
+        self.assertIn('preload="none"', view.arch_db)
+        self.assertEqual(asset.usage_count, 1)
+
+        # Already rendered markup is left as saved
+        arch = view.arch_db
+        view.write({'arch': arch})
+        self.assertEqual(view.arch_db, arch)
+
+    def test_video_poster_in_saved_markup(self):
+        """Test that saved videos point at their poster once it is generated"""
+        asset = self._create_test_video_asset('poster_test.mp4')
+        self.assertIsNone(asset._to_list_item()['poster'])
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 36), color=(10, 20, 30)).save(buffer, format='JPEG')
+        asset.poster = base64.b64encode(buffer.getvalue())
+        self.assertTrue(asset._to_list_item()['poster'].startswith('/web/video_poster/poster_test.mp4'))
+
+        view = self.env['ir.ui.view'].create({
+            'name': 'Poster Test Page',
+            'type': 'qweb',
+            'arch': '<t t-name="poster_test"><div>'
+                    '<img class="o_local_video_placeholder" data-is-local-video="true" '
+                    'data-video-src="/web/video/poster_test.mp4" src="/web/video/poster_test.mp4"/>'
+                    '</div></t>',
+        })
+        self.assertIn('poster="/web/video_poster/poster_test.mp4', view.arch_db)
+
+        # No frame without ffmpeg or file: nothing stored, nothing raised
+        missing = self._create_test_video_asset('poster_missing.mp4')
+        self.assertEqual(missing._generate_posters(), 0)
+        self.assertFalse(missing.poster)
+        self.assertTrue(missing.poster_failed)
+
+# Usage: Run tests with:
+# ./odoo-bin -d mydb -m website_video_upload --test-enable -u website_video_upload
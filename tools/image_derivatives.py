@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""
+Single-pass computation of all derived data of a stored image
+
+Used by the backfill job so each original is read and decoded once.
+"""
+
+from .image_phash import perceptual_hashes
+from .image_placeholder import compute_placeholder
+from .image_probe import probe_image_source
+
+
+def probe_image_derivatives(source):
+    """Process-pool worker: header info, placeholder and perceptual hash
+
+    ``source`` is a filestore path or the image bytes. Returns a dict with
+    ``format``, ``width``, ``height``, ``placeholder``, ``color``, ``phash``
+    and ``color_signature`` (values are None when they could not be computed).
+    """
+    if isinstance(source, str):
+        try:
+            with open(source, 'rb') as f:
+                source = f.read()
+        except OSError:
+            source = None
+    image_format, width, height = probe_image_source(source) if source else (None, None, None)
+    placeholder, color = compute_placeholder(source)
+    phash, color_signature = perceptual_hashes(source)
+    return {
+        'format': image_format,
+        'width': width,
+        'height': height,
+        'placeholder': placeholder,
+        'color': color,
+        'phash': phash,
+        'color_signature': color_signature,
+    }
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""
+Perceptual hashing of product images
+
+64-bit difference hash (dHash): stable across re-exports of the same
+packshot at another size, format or compression level. Hashes are split
+into four 16-bit segments for multi-index hashing: two hashes within
+Hamming distance 3 share at least one segment exactly, so candidates can
+be found with plain equality lookups on indexed columns.
+
+dHash only looks at luminance, so the same product in two colours hashes
+alike: a coarse colour signature (mean colour of a 2x2 grid) is stored
+next to it and compared before two images are called duplicates.
+"""
+
+import base64
+import binascii
+import io
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+HASH_BITS = 64
+SEGMENTS = 4
+SEGMENT_BITS = HASH_BITS // SEGMENTS
+# Largest distance multi-index lookups are exhaustive for (pigeonhole)
+MAX_INDEXED_DISTANCE = SEGMENTS - 1
+# Hashes with fewer set (or unset) bits carry too little structure: solid
+# colours hash to all zeros, plain gradients to all ones
+MIN_HASH_BITS = 6
+# A flat segment is a uniform band (e.g. a white background) shared by
+# unrelated packshots, it is not indexed
+FLAT_SEGMENTS = (0, (1 << SEGMENT_BITS) - 1)
+
+COLOR_GRID = 2
+# Largest per-channel difference (0-255) between two cells of the colour
+# signatures of duplicates; re-encoding and resizing stay well below
+MAX_COLOR_DISTANCE = 32
+
+
+def _open_for_hash(image_bytes):
+    """Open ``image_bytes`` as RGB, transparent areas composited on white"""
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft('RGB', (64, 64))
+    if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+        rgba = image.convert('RGBA')
+        background = Image.new('RGBA', rgba.size, (255, 255, 255, 255))
+        image = Image.alpha_composite(background, rgba)
+    return image.convert('RGB')
+
+
+def _dhash_image(image):
+    pixels = list(image.convert('L').resize((9, 8), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return f"{value:016x}"
+
+
+def _color_signature_image(image):
+    cells = image.resize((COLOR_GRID, COLOR_GRID), Image.BOX).getdata()
+    return ''.join(f"{red:02x}{green:02x}{blue:02x}" for red, green, blue in cells)
+
+
+def dhash(image_bytes):
+    """Return the 64-bit dHash of raw image bytes as 16 hex digits, or None"""
+    return perceptual_hashes(image_bytes)[0]
+
+
+def perceptual_hashes(image_bytes):
+    """Return ``(dhash, color_signature)`` of raw image bytes, decoding them once
+
+    Both are None when the image cannot be decoded.
+    """
+    if not image_bytes or not HAS_PIL:
+        return None, None
+    try:
+        image = _open_for_hash(image_bytes)
+        return _dhash_image(image), _color_signature_image(image)
+    except Exception:
+        return None, None
+
+
+def perceptual_hashes_from_base64(image_data):
+    """Process-pool worker: ``(dhash, color_signature)`` of a base64 image value"""
+    if not image_data:
+        return None, None
+    try:
+        return perceptual_hashes(base64.b64decode(image_data))
+    except (binascii.Error, ValueError, TypeError):
+        return None, None
+
+
+def is_informative_hash(hex_hash):
+    """Whether a hash has enough structure to identify an image"""
+    bits = bin(int(hex_hash, 16)).count('1')
+    return MIN_HASH_BITS <= bits <= HASH_BITS - MIN_HASH_BITS
+
+
+def hash_segments(hex_hash):
+    """Split a hex hash into its ``SEGMENTS`` integer segments (high bits first)"""
+    value = int(hex_hash, 16)
+    mask = (1 << SEGMENT_BITS) - 1
+    return [(value >> (SEGMENT_BITS * (SEGMENTS - 1 - index))) & mask for index in range(SEGMENTS)]
+
+
+def hamming_distance(hash_a, hash_b):
+    """Number of differing bits between two hex hashes"""
+    return bin(int(hash_a, 16) ^ int(hash_b, 16)).count('1')
+
+
+def color_distance(signature_a, signature_b):
+    """Largest per-channel difference between two colour signatures (0-255)"""
+    values_a = bytes.fromhex(signature_a)
+    values_b = bytes.fromhex(signature_b)
+    if len(values_a) != len(values_b):
+        return 255
+    return max(abs(a - b) for a, b in zip(values_a, values_b))
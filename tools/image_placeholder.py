@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""
+Low-quality image placeholders (LQIP) and dominant colour
+
+A ~20px JPEG data URI and a hex colour are small enough to be inlined in
+the page, so the gallery paints immediately while originals download.
+"""
+
+import base64
+import binascii
+import io
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_QUALITY = 50
+DOMINANT_COLORS = 8
+
+
+def compute_placeholder(image_bytes):
+    """Return ``(data_uri, '#rrggbb')`` for raw image bytes, or ``(None, None)``"""
+    if not image_bytes or not HAS_PIL:
+        return None, None
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        # draft() lets the JPEG decoder skip most DCT work for tiny targets
+        image.draft('RGB', (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        image.thumbnail((PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        if image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info:
+            # Transparent packshots sit on a white page background
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image.convert('RGBA'), mask=image.convert('RGBA').getchannel('A'))
+            image = background
+        else:
+            image = image.convert('RGB')
+
+        palette = image.quantize(colors=DOMINANT_COLORS)
+        count, index = max(palette.getcolors())
+        red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+        dominant_color = f"#{red:02x}{green:02x}{blue:02x}"
+
+        image.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE))
+        buffer = io.BytesIO()
+        image.save(buffer, format='JPEG', quality=PLACEHOLDER_QUALITY, optimize=True)
+        data_uri = 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode()
+        return data_uri, dominant_color
+    except Exception:
+        return None, None
+
+
+def placeholder_from_base64(image_data):
+    """Process-pool worker: placeholder of a base64 image value"""
+    if not image_data:
+        return None, None
+    try:
+        return compute_placeholder(base64.b64decode(image_data))
+    except (binascii.Error, ValueError, TypeError):
+        return None, None
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Image header probing helpers
+
+Pure PIL helpers (no ORM access) so they can run inside the process pools
+of the batch jobs and be benchmarked outside of an Odoo server.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import base64
+import binascii
+import io
+import multiprocessing
+import os
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# Enough for the header of PNG, GIF, WebP, BMP and most JPEG files
+HEADER_PROBE_BYTES = 64 * 1024
+
+
+def parse_image_header(image_bytes):
+    """Return ``(format, width, height)`` for raw image bytes
+
+    PIL only parses the header on ``Image.open``, pixel data is never decoded.
+    Returns ``(None, None, None)`` when the bytes cannot be identified.
+    """
+    if not image_bytes or not HAS_PIL:
+        return None, None, None
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        width, height = image.size
+        return image.format or 'UNKNOWN', width, height
+    except Exception:
+        return None, None, None
+
+
+def probe_image_source(source):
+    """Process-pool worker: parse the header of a filestore path or raw bytes
+
+    ``source`` is either a filesystem path (``str``) or the image bytes.
+    Only the header is read from disk, so large originals stay cheap.
+    """
+    if isinstance(source, str):
+        if not HAS_PIL:
+            return None, None, None
+        try:
+            with Image.open(source) as image:
+                width, height = image.size
+                return image.format or 'UNKNOWN', width, height
+        except Exception:
+            return None, None, None
+    return parse_image_header(source)
+
+
+def probe_image_base64(image_data, head_size=None):
+    """Parse the header of a base64 image value, decoding only its first bytes
+
+    Formats keep their dimensions within the first few KB; the whole value
+    is only decoded when the head is not enough (e.g. a JPEG with a large
+    EXIF block before its frame header).
+    """
+    if not image_data:
+        return None, None, None
+    head_size = head_size or HEADER_PROBE_BYTES
+    # 4 base64 characters per 3 bytes
+    head = image_data[:(head_size // 3) * 4]
+    if len(head) < len(image_data):
+        # Wrapped values (e.g. base64.encodebytes) carry newlines: drop them
+        # and cut the head back to whole 4-character groups
+        head = head[:0].join(head.split())
+        head = head[:len(head) - len(head) % 4]
+        try:
+            result = parse_image_header(base64.b64decode(head))
+        except (binascii.Error, ValueError, TypeError):
+            result = (None, None, None)
+        if result[0]:
+            return result
+    try:
+        return parse_image_header(base64.b64decode(image_data))
+    except (binascii.Error, ValueError, TypeError):
+        return None, None, None
+
+
+def make_pool(workers):
+    """Return a process pool of ``workers`` processes, or None for in-process work
+
+    Workers are forked explicitly: the probe functions live inside an Odoo
+    addon package that a spawned/forkserver child could not import. Meant
+    for batch jobs only, never for request handlers: forking a threaded
+    HTTP worker can deadlock the child.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('fork'))
+
+
+def pool_map(executor, func, items, workers):
+    """``map`` over ``items`` in ``executor`` (or in-process), preserving order"""
+    if executor is None:
+        return list(map(func, items))
+    chunksize = max(1, len(items) // (workers * 4))
+    return list(executor.map(func, items, chunksize=chunksize))
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Responsive width variants of preserved product images
+
+Variants keep the original format (no WebP conversion); only the pixel
+width changes. Used to build ``srcset`` candidates for the storefront.
+"""
+
+import io
+import os
+
+try:
+    from PIL import Image
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+# srcset width candidates, the original itself is always the last candidate
+VARIANT_WIDTHS = (320, 480, 640, 960, 1280, 1920, 2560)
+
+# Formats that can be resized without losing anything but pixels
+RESIZABLE_FORMATS = ('JPEG', 'PNG', 'WEBP', 'BMP', 'TIFF')
+
+FORMAT_MIMETYPES = {
+    'PNG': 'image/png',
+    'GIF': 'image/gif',
+    'WEBP': 'image/webp',
+    'SVG': 'image/svg+xml',
+    'JPEG': 'image/jpeg',
+    'JPG': 'image/jpeg',
+    'BMP': 'image/bmp',
+    'TIFF': 'image/tiff',
+    'AVIF': 'image/avif',
+}
+
+
+def variant_widths(original_width, image_format):
+    """Return the srcset widths (smaller than the original) for an image"""
+    if not original_width or (image_format or '').upper() not in RESIZABLE_FORMATS:
+        return []
+    return [width for width in VARIANT_WIDTHS if width < original_width]
+
+
+def resize_to_width(image_bytes, width, quality=95):
+    """Downscale ``image_bytes`` to ``width`` pixels, keeping format and ratio
+
+    Returns ``(bytes, format)``, or ``(None, format)`` when the image is not
+    resizable (animated, vector, unknown format, or already narrower).
+    """
+    if not HAS_PIL:
+        return None, None
+    image = Image.open(io.BytesIO(image_bytes))
+    image_format = image.format
+    if image_format not in RESIZABLE_FORMATS or getattr(image, 'is_animated', False) or image.width <= width:
+        return None, image_format
+
+    height = max(1, round(image.height * width / image.width))
+    resized = image.resize((width, height), Image.LANCZOS)
+    save_options = {}
+    if image_format == 'JPEG':
+        save_options = {'quality': quality}
+        if 'icc_profile' in image.info:
+            save_options['icc_profile'] = image.info['icc_profile']
+        if resized.mode not in ('RGB', 'L', 'CMYK'):
+            resized = resized.convert('RGB')
+    elif image_format == 'PNG':
+        save_options = {'optimize': True}
+    elif image_format == 'WEBP':
+        save_options = {'lossless': True}
+
+    buffer = io.BytesIO()
+    resized.save(buffer, format=image_format, **save_options)
+    return buffer.getvalue(), image_format
+
+
+def cache_path(filestore_path, kind, checksum, suffix):
+    """Return the filestore path of a derived image, keyed by source checksum"""
+    return os.path.join(filestore_path, kind, checksum[:2], f"{checksum}_{suffix}")
+
+
+def write_cache_file(path, data):
+    """Atomically write a derived image so concurrent workers never read partial files"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def generate_variant_files(task):
+    """Process-pool worker: write the missing width variants of one image
+
+    ``task`` is ``(source, [(width, path), ...], quality)`` where ``source``
+    is a filestore path or the image bytes. Returns the number of files written.
+    """
+    source, targets, quality = task
+    targets = [(width, path) for width, path in targets if not os.path.exists(path)]
+    if not targets:
+        return 0
+    try:
+        if isinstance(source, str):
+            with open(source, 'rb') as f:
+                source = f.read()
+        written = 0
+        for width, path in targets:
+            data, _format = resize_to_width(source, width, quality=quality)
+            if data:
+                write_cache_file(path, data)
+                written += 1
+        return written
+    except Exception:
+        return 0
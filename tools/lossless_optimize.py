@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+Strictly lossless byte optimization of preserved originals
+
+PNG is re-deflated at maximum compression without ancillary metadata
+chunks other than the colour-management ones; JPEG is losslessly transcoded by ``jpegtran`` (optimized Huffman
+tables, progressive scans, DCT coefficients untouched). A result is only
+kept when it decodes to exactly the same pixels and is smaller.
+"""
+
+import io
+import logging
+import shutil
+import struct
+import subprocess
+
+try:
+    from PIL import Image, PngImagePlugin
+    HAS_PIL = True
+except ImportError:
+    HAS_PIL = False
+
+_logger = logging.getLogger(__name__)
+
+# PNG modes PIL can write back without altering samples
+PNG_SAFE_MODES = ('1', 'L', 'LA', 'P', 'RGB', 'RGBA')
+
+# PNG chunks describing how samples map to colours (iCCP goes through icc_profile)
+PNG_COLOUR_CHUNKS = (b'cHRM', b'cICP', b'gAMA', b'sRGB')
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+TIFF_BITS_PER_SAMPLE = 258
+EXIF_ORIENTATION = 0x0112
+
+
+def _png_header_chunks(image_bytes):
+    """Yield ``(type, data)`` of the PNG chunks preceding the image data"""
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(image_bytes):
+        length, chunk_type = struct.unpack('>I4s', image_bytes[offset:offset + 8])
+        if chunk_type == b'IDAT':
+            return
+        yield chunk_type, image_bytes[offset + 8:offset + 8 + length]
+        # Skip the data and its CRC
+        offset += 12 + length
+
+
+def _png_colour_chunks(image_bytes):
+    return [(chunk_type, data) for chunk_type, data in _png_header_chunks(image_bytes)
+            if chunk_type in PNG_COLOUR_CHUNKS]
+
+
+def is_high_bit_depth(image, image_bytes):
+    """Return True when ``image`` stores more than 8 bits per channel
+
+    PIL opens 16-bit RGB(A) PNG and TIFF files in 8-bit modes, so the depth
+    is read from the file header rather than inferred from the mode.
+    """
+    if image.mode.startswith(('I', 'F')):
+        return True
+    if image.format == 'PNG' and image_bytes.startswith(PNG_SIGNATURE):
+        # IHDR is always first: width, height, then the bit depth byte
+        return image_bytes[24] > 8
+    if image.format == 'TIFF':
+        bits = image.tag_v2.get(TIFF_BITS_PER_SAMPLE, 8)
+        return max(bits if isinstance(bits, tuple) else (bits,)) > 8
+    return False
+
+
+def _optimize_png(image_bytes):
+    image = Image.open(io.BytesIO(image_bytes))
+    if getattr(image, 'is_animated', False) or image.mode not in PNG_SAFE_MODES:
+        return None
+    if is_high_bit_depth(image, image_bytes):
+        # The re-save would write the 8-bit samples PIL decoded
+        return None
+    save_options = {'optimize': True}
+    # Keep only what changes how pixels render: transparency and colour data
+    if 'transparency' in image.info:
+        save_options['transparency'] = image.info['transparency']
+    if 'icc_profile' in image.info:
+        save_options['icc_profile'] = image.info['icc_profile']
+    colour_chunks = _png_colour_chunks(image_bytes)
+    if colour_chunks:
+        pnginfo = PngImagePlugin.PngInfo()
+        for chunk_type, data in colour_chunks:
+            pnginfo.add(chunk_type, data)
+        save_options['pnginfo'] = pnginfo
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', **save_options)
+    return buffer.getvalue()
+
+
+def _optimize_jpeg(image_bytes):
+    jpegtran = shutil.which('jpegtran')
+    if not jpegtran:
+        return None
+    image = Image.open(io.BytesIO(image_bytes))
+    # Dropping EXIF would lose the orientation flag and rotate the photo
+    copy = 'all' if image.getexif().get(EXIF_ORIENTATION, 1) != 1 else 'icc'
+    for copy_mode in (copy, 'all'):
+        try:
+            result = subprocess.run(
+                [jpegtran, '-copy', copy_mode, '-optimize', '-progressive'],
+                input=image_bytes, capture_output=True, check=True, timeout=60,
+            )
+            return result.stdout
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired):
+            # Older jpegtran builds do not know "-copy icc"
+            continue
+    return None
+
+
+def pixels_identical(original_bytes, optimized_bytes):
+    """Return True when both images decode to exactly the same pixels
+
+    Only meaningful for sources of at most 8 bits per channel: PIL reduces
+    deeper samples while decoding.
+    """
+    with Image.open(io.BytesIO(original_bytes)) as original, \
+            Image.open(io.BytesIO(optimized_bytes)) as optimized:
+        if original.size != optimized.size:
+            return False
+        if original.mode == optimized.mode and original.tobytes() == optimized.tobytes():
+            return True
+        # Palette images may be re-indexed by the encoder: compare colours
+        if 'P' in (original.mode, optimized.mode):
+            return original.convert('RGBA').tobytes() == optimized.convert('RGBA').tobytes()
+        return False
+
+
+def optimize_image(image_bytes):
+    """Losslessly shrink ``image_bytes`` if possible
+
+    Returns ``(bytes, saved)``: the optimized bytes and the number of bytes
+    saved, or the untouched input and 0 when nothing smaller and
+    pixel-identical could be produced.
+    """
+    if not image_bytes or not HAS_PIL:
+        return image_bytes, 0
+    try:
+        image_format = Image.open(io.BytesIO(image_bytes)).format
+        if image_format == 'PNG':
+            optimized = _optimize_png(image_bytes)
+        elif image_format == 'JPEG':
+            optimized = _optimize_jpeg(image_bytes)
+        else:
+            optimized = None
+        if not optimized or len(optimized) >= len(image_bytes):
+            return image_bytes, 0
+        if not pixels_identical(image_bytes, optimized):
+            _logger.warning("Lossless optimization changed pixels, keeping original %s", image_format)
+            return image_bytes, 0
+        return optimized, len(image_bytes) - len(optimized)
+    except Exception as e:
+        _logger.warning(f"Lossless optimization failed: {e}")
+        return image_bytes, 0
+
+
+# Lossless encoders for format alternates, keyed by target format
+ALTERNATE_SAVE_OPTIONS = {
+    'WEBP': {'lossless': True, 'quality': 100, 'method': 4},
+    'AVIF': {'quality': 100, 'subsampling': '4:4:4'},
+}
+
+# Source modes that map onto 8-bit RGB(A) without touching sample values
+ALTERNATE_SOURCE_MODES = ('1', 'L', 'LA', 'P', 'RGB', 'RGBA')
+
+
+def lossless_alternate(image_bytes, target_format):
+    """Encode ``image_bytes`` as a pixel-identical ``target_format`` image
+
+    Returns the encoded bytes, or None when the encoder is unavailable, the
+    source cannot be represented exactly (more than 8 bits per channel,
+    PNG gamma or chromaticity the target cannot carry), the decoded pixels
+    differ (e.g. a lossy AVIF encoder) or the result is not smaller than
+    the original.
+    """
+    save_options = ALTERNATE_SAVE_OPTIONS.get(target_format)
+    if not image_bytes or not HAS_PIL or save_options is None:
+        return None
+    try:
+        image = Image.open(io.BytesIO(image_bytes))
+        if getattr(image, 'is_animated', False) or image.mode not in ALTERNATE_SOURCE_MODES:
+            return None
+        if is_high_bit_depth(image, image_bytes):
+            return None
+        # WebP and AVIF keep an ICC profile, and untagged output is sRGB
+        if image.format == 'PNG' and any(
+                chunk_type != b'sRGB' for chunk_type, _data in _png_colour_chunks(image_bytes)):
+            return None
+        has_alpha = 'A' in image.mode or 'transparency' in image.info
+        source = image.convert('RGBA' if has_alpha else 'RGB')
+        buffer = io.BytesIO()
+        save_options = dict(save_options)
+        if 'icc_profile' in image.info:
+            save_options['icc_profile'] = image.info['icc_profile']
+        source.save(buffer, format=target_format, **save_options)
+        alternate = buffer.getvalue()
+        if len(alternate) >= len(image_bytes):
+            return None
+        with Image.open(io.BytesIO(alternate)) as decoded:
+            if has_alpha and 'A' not in decoded.mode:
+                decoded_pixels = decoded.convert('RGBA').tobytes()
+            else:
+                decoded_pixels = decoded.convert(source.mode).tobytes()
+            if decoded.size != source.size or decoded_pixels != source.tobytes():
+                return None
+        return alternate
+    except Exception as e:
+        # KeyError/OSError when the encoder is not compiled into Pillow
+        _logger.info(f"No lossless {target_format} alternate: {e}")
+        return None
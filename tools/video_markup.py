@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Final markup for the local videos saved by the website editor
+
+The editor saves placeholders (``img.o_local_video_placeholder``, iframes
+pointing at a video file, background ``img.o_we_background_video``) that
+the frontend used to rewrite into ``<video>`` elements on every page view.
+They are rewritten here once, with the same rules, when the markup is
+saved. No ORM access.
+"""
+
+from lxml import etree, html
+
+VIDEO_EXTENSIONS = ('.webm', '.mp4', '.ogg', '.mov', '.avi')
+# Markup without any of these has nothing to rewrite, it is not parsed
+VIDEO_MARKERS = ('o_local_video_placeholder', 'o_custom_video_container', 'o_we_background_video', '<iframe')
+BACKGROUND_OPTIONS = {'autoplay': True, 'loop': True, 'hide-controls': True, 'hide-fullscreen': True}
+
+
+def _classes(element):
+    return (element.get('class') or '').split()
+
+
+def _closest(element, predicate):
+    while element is not None:
+        if isinstance(element.tag, str) and predicate(element):
+            return element
+        element = element.getparent()
+    return None
+
+
+def _read_options(element):
+    """Return the ``data-video-*`` flags of ``element``"""
+    return {
+        name: element is not None and element.get(f'data-video-{name}') == 'true'
+        for name in BACKGROUND_OPTIONS
+    }
+
+
+def _is_video_src(src, url_prefix):
+    path = src.split('?')[0].split('#')[0].lower()
+    return url_prefix in src or path.endswith(VIDEO_EXTENSIONS)
+
+
+def _storage_key(src, url_prefix):
+    if url_prefix not in src:
+        return None
+    return src.split(url_prefix, 1)[1].split('?')[0].split('#')[0]
+
+
+def _set_flag(video, name, value):
+    if value:
+        video.set(name, '')
+    elif name in video.attrib:
+        del video.attrib[name]
+
+
+def _apply_options(video, options, src, url_prefix, assets):
+    """Set the attributes the frontend derives from the video options"""
+    _set_flag(video, 'autoplay', options['autoplay'])
+    _set_flag(video, 'muted', options['autoplay'])
+    _set_flag(video, 'loop', options['loop'])
+    _set_flag(video, 'controls', not options['hide-controls'])
+    _set_flag(video, 'playsinline', True)
+    classes = [name for name in _classes(video) if name != 'no-controls']
+    if options['hide-controls']:
+        classes.append('no-controls')
+    if classes:
+        video.set('class', ' '.join(classes))
+    if options['hide-fullscreen']:
+        video.set('controlslist', 'nodownload nofullscreen')
+        video.set('disablepictureinpicture', 'true')
+    else:
+        video.attrib.pop('controlslist', None)
+        video.attrib.pop('disablepictureinpicture', None)
+    video.set('src', src)
+    video.set('data-src', src)
+    video.set('data-is-local-video', 'true')
+    # The frontend attaches the source when the video is about to be seen
+    video.set('preload', 'none')
+    asset = assets.get(_storage_key(src, url_prefix)) or {}
+    if asset.get('width') and asset.get('height'):
+        video.set('width', str(asset['width']))
+        video.set('height', str(asset['height']))
+    if asset.get('poster') and not video.get('poster'):
+        video.set('poster', asset['poster'])
+
+
+def _replace(old, new):
+    new.tail, old.tail = old.tail, None
+    old.getparent().replace(old, new)
+
+
+def _new_video(classes, style):
+    video = etree.Element('video')
+    if classes:
+        video.set('class', classes)
+    if style:
+        video.set('style', style)
+    return video
+
+
+def _join_style(*parts):
+    return '; '.join(part.strip().rstrip(';') for part in parts if part and part.strip())
+
+
+def _normalize_tree(root, url_prefix, assets):
+    """Rewrite the local-video markup under ``root`` in place, return whether anything changed"""
+    changed = False
+    # Background settings win over the options of the container
+    background_videos = set()
+
+    for iframe in list(root.iter('iframe')):
+        src = iframe.get('src') or iframe.get('data-src') or ''
+        if not _is_video_src(src, url_prefix):
+            continue
+        clean_src = src.split('&')[0].split('?')[0]
+        if '.mp4' not in clean_src and '.webm' not in clean_src:
+            clean_src = src
+        container = _closest(iframe.getparent(), lambda el: bool(
+            {'media_iframe_video', 'o_custom_video_container'} & set(_classes(el))
+        ))
+        options = _read_options(container)
+        background = (
+            (container is not None and 'o_background_video' in _classes(container))
+            or 'o_bg_video_iframe' in _classes(iframe)
+            or _closest(iframe.getparent(), lambda el: bool(
+                {'s_cover', 'o_we_bg_filter'} & set(_classes(el)) or el.get('data-bg-video-src')
+            )) is not None
+        )
+        if background:
+            options = dict(BACKGROUND_OPTIONS)
+        video = _new_video(iframe.get('class'), _join_style(
+            iframe.get('style'), 'width: 100%', 'height: 100%',
+            f"object-fit: {'cover' if background else 'contain'}",
+        ))
+        _apply_options(video, options, clean_src, url_prefix, assets)
+        _replace(iframe, video)
+        if background:
+            background_videos.add(video)
+        changed = True
+
+    for img in list(root.iter('img')):
+        classes = _classes(img)
+        if img.get('data-is-local-video') != 'true':
+            continue
+        if 'o_local_video_placeholder' in classes:
+            src = img.get('data-video-src') or img.get('src')
+            if not src:
+                continue
+            video = _new_video('img img-fluid o_we_custom_image', 'width: 100%; height: auto')
+            options = _read_options(img)
+            options['hide-fullscreen'] = False
+            _apply_options(video, options, src, url_prefix, assets)
+            _replace(img, video)
+            changed = True
+        elif 'o_we_background_video' in classes:
+            src = img.get('src') or ''
+            path = src.split('?')[0].lower()
+            if not path.endswith(VIDEO_EXTENSIONS):
+                continue
+            if _closest(img, lambda el: 's_cover' in _classes(el) or el.get('data-bg-image-src')) is None:
+                continue
+            # The image's own sizing wins over the background defaults
+            style = img.get('style') or ''
+            defaults = [
+                f'{prop}: {value}'
+                for prop, value in (('width', '100%'), ('height', '100%'), ('object-fit', 'cover'), ('display', 'block'))
+                if f'{prop}:' not in style.replace(' ', '')
+            ]
+            video = _new_video(img.get('class'), _join_style(style, *defaults))
+            for name in ('data-video-src', 'data-bg-video'):
+                if img.get(name):
+                    video.set(name, img.get(name))
+            _apply_options(video, BACKGROUND_OPTIONS, src, url_prefix, assets)
+            _replace(img, video)
+            changed = True
+
+    for container in root.iter():
+        if not isinstance(container.tag, str) or 'o_custom_video_container' not in _classes(container):
+            continue
+        if container.get('data-is-local-video') != 'true':
+            continue
+        video = next(container.iter('video'), None)
+        src = video is not None and (video.get('src') or container.get('data-video-src'))
+        if not src or video in background_videos:
+            continue
+        before = dict(video.attrib)
+        _apply_options(video, _read_options(container), src, url_prefix, assets)
+        changed = changed or dict(video.attrib) != before
+
+    return changed
+
+
+def has_video_markup(markup):
+    """Cheap check before parsing: may ``markup`` hold local-video markup to rewrite?"""
+    return bool(markup) and any(marker in markup for marker in VIDEO_MARKERS)
+
+
+def normalize_video_markup(markup, url_prefix, assets=None, xml=False):
+    """Return ``markup`` with its local-video placeholders rewritten into ``<video>``
+
+    :param url_prefix: URL prefix of the local videos, e.g. ``/web/video/``
+    :param assets: ``{storage_key: {'width': ..., 'height': ..., 'poster': ...}}``
+                   used for the intrinsic dimensions and posters of the videos
+    :param xml: ``markup`` is a view arch (XML) rather than an HTML fragment
+    :return: the rewritten markup, or ``markup`` itself when nothing changed
+             or it could not be parsed
+    """
+    if not has_video_markup(markup) or url_prefix not in markup:
+        return markup
+    assets = assets or {}
+    try:
+        if xml:
+            root = etree.fromstring(markup)
+            if not _normalize_tree(root, url_prefix, assets):
+                return markup
+            return etree.tostring(root, encoding='unicode')
+        wrapper = html.fragment_fromstring(markup, create_parent='div')
+        if not _normalize_tree(wrapper, url_prefix, assets):
+            return markup
+        return (wrapper.text or '') + ''.join(
+            etree.tostring(child, encoding='unicode', method='html') for child in wrapper
+        )
+    except (etree.ParserError, etree.XMLSyntaxError, ValueError):
+        return markup
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+"""
+Video metadata probing helpers
+
+MP4/MOV headers are parsed directly (ISO base media boxes, only the
+``moov`` metadata is read); other containers fall back to ``ffprobe``
+when it is installed. Poster frames need ``ffmpeg``. No ORM access.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import struct
+import subprocess
+
+_logger = logging.getLogger(__name__)
+
+ISO_BMFF_EXTENSIONS = ('.mp4', '.m4v', '.mov')
+CHECKSUM_BLOCK_SIZE = 1024 * 1024
+POSTER_MAX_WIDTH = 1280
+
+
+def _iter_boxes(f, start, end):
+    """Yield ``(type, payload_start, payload_end)`` of the boxes in ``[start, end)``"""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack('>I4s', header)
+        payload = offset + 8
+        if size == 1:
+            size = struct.unpack('>Q', f.read(8))[0]
+            payload += 8
+        elif size == 0:
+            size = end - offset
+        if size < payload - offset:
+            return
+        yield box_type, payload, min(offset + size, end)
+        offset += size
+
+
+def _find_box(f, start, end, box_type):
+    for found, payload, box_end in _iter_boxes(f, start, end):
+        if found == box_type:
+            return payload, box_end
+    return None
+
+
+def probe_mp4(path):
+    """Return ``{'duration', 'width', 'height'}`` from the ``moov`` box of an MP4/MOV file"""
+    info = {'duration': 0.0, 'width': 0, 'height': 0}
+    with open(path, 'rb') as f:
+        moov = _find_box(f, 0, os.path.getsize(path), b'moov')
+        if not moov:
+            return info
+        mvhd = _find_box(f, *moov, b'mvhd')
+        if mvhd:
+            f.seek(mvhd[0])
+            version = f.read(1)[0]
+            f.seek(3 + (16 if version == 1 else 8), 1)
+            if version == 1:
+                timescale, duration = struct.unpack('>IQ', f.read(12))
+            else:
+                timescale, duration = struct.unpack('>II', f.read(8))
+            if timescale:
+                info['duration'] = duration / timescale
+        for box_type, payload, box_end in _iter_boxes(f, *moov):
+            if box_type != b'trak':
+                continue
+            tkhd = _find_box(f, payload, box_end, b'tkhd')
+            if not tkhd:
+                continue
+            # Width and height are the last two 16.16 fixed-point fields
+            f.seek(tkhd[1] - 8)
+            width, height = struct.unpack('>II', f.read(8))
+            if width and height:
+                info['width'], info['height'] = width >> 16, height >> 16
+                break
+    return info
+
+
+def probe_ffprobe(path):
+    """Return ``{'duration', 'width', 'height'}`` using ``ffprobe``, or None when unavailable"""
+    ffprobe = shutil.which('ffprobe')
+    if not ffprobe:
+        return None
+    result = subprocess.run(
+        [ffprobe, '-v', 'error', '-select_streams', 'v:0', '-show_entries',
+         'stream=width,height:format=duration', '-of', 'json', path],
+        capture_output=True, check=True, timeout=60,
+    )
+    data = json.loads(result.stdout or b'{}')
+    stream = (data.get('streams') or [{}])[0]
+    return {
+        'duration': float(data.get('format', {}).get('duration') or 0.0),
+        'width': int(stream.get('width') or 0),
+        'height': int(stream.get('height') or 0),
+    }
+
+
+def probe_video(path):
+    """Return ``{'duration', 'width', 'height'}`` of the video at ``path``, zeros when unknown"""
+    info = {'duration': 0.0, 'width': 0, 'height': 0}
+    try:
+        if path.lower().endswith(ISO_BMFF_EXTENSIONS):
+            info = probe_mp4(path)
+        if not info['width']:
+            info = probe_ffprobe(path) or info
+    except Exception as e:
+        _logger.info(f"Could not probe video {path}: {e}")
+    return info
+
+
+def can_extract_posters():
+    """Return True when ``ffmpeg`` is available to extract poster frames"""
+    return bool(shutil.which('ffmpeg'))
+
+
+def extract_poster(path, duration=0.0):
+    """Return a JPEG frame of the video at ``path`` to show as its poster, or None
+
+    The frame is taken a tenth into the video, at most 1 s in: the very
+    first frame is often black. None when ``ffmpeg`` is not installed.
+    """
+    ffmpeg = shutil.which('ffmpeg')
+    if not ffmpeg:
+        return None
+    position = min(1.0, (duration or 0.0) / 10)
+    try:
+        result = subprocess.run(
+            [ffmpeg, '-v', 'error', '-ss', f'{position:.3f}', '-i', path, '-frames:v', '1',
+             '-vf', f"scale='min({POSTER_MAX_WIDTH},iw)':-2", '-c:v', 'mjpeg', '-q:v', '3',
+             '-f', 'image2pipe', 'pipe:1'],
+            capture_output=True, check=True, timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        _logger.info(f"Could not extract a poster from {path}: {e}")
+        return None
+    return result.stdout or None
+
+
+def file_sha1(path):
+    """Return the SHA1 hex digest of the file at ``path``, read in blocks"""
+    sha = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(CHECKSUM_BLOCK_SIZE), b''):
+            sha.update(block)
+    return sha.hexdigest()
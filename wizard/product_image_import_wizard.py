@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""
+Wizard for bulk product image imports from a ZIP archive or server directory
+"""
+
+from odoo import models, fields, _
+from odoo.exceptions import AccessError, UserError
+import base64
+import os
+import tempfile
+
+from ..ADVANCED_CONFIG import MigrationSettings
+from ..models.product_image_import import DEFAULT_FILENAME_PATTERN
+
+# base64 characters decoded at a time (a multiple of 4)
+ZIP_DECODE_CHUNK = 4 * 1024 * 1024
+
+
+class ProductImageImportWizard(models.TransientModel):
+    _name = 'product.image.import.wizard'
+    _description = 'Bulk Product Image Import'
+
+    source_type = fields.Selection([
+        ('zip', 'ZIP Archive'),
+        ('directory', 'Server Directory'),
+    ], string='Source', default='zip', required=True)
+    zip_file = fields.Binary(string='ZIP Archive', attachment=False)
+    zip_filename = fields.Char(string='File Name')
+    directory = fields.Char(string='Directory', help='Absolute path of a directory on the server')
+    filename_pattern = fields.Char(
+        string='File Name Pattern',
+        default=DEFAULT_FILENAME_PATTERN,
+        required=True,
+        help='Regular expression applied to file names (without extension). '
+             'The "ref" group, or the whole match, identifies the product.'
+    )
+    match_field = fields.Selection([
+        ('default_code', 'Internal Reference'),
+        ('barcode', 'Barcode'),
+        ('name', 'Product Name'),
+    ], string='Match Products On', default='default_code', required=True)
+    batch_size = fields.Integer(string='Batch Size', default=MigrationSettings.BATCH_SIZE, required=True)
+    prewarm = fields.Boolean(string='Pre-generate Responsive Variants', default=True)
+    state = fields.Selection([('draft', 'Draft'), ('done', 'Done')], default='draft')
+    result_message = fields.Text(string='Result', readonly=True)
+
+    def action_import(self):
+        self.ensure_one()
+        if self.source_type == 'directory':
+            if not self.env.is_system():
+                raise AccessError(_("Only administrators can import from a server directory."))
+            if not self.directory or not os.path.isdir(self.directory):
+                raise UserError(_("Directory %s does not exist.", self.directory or ''))
+            source = self.directory
+        else:
+            if not self.zip_file:
+                raise UserError(_("Please upload a ZIP archive."))
+            source = self._spool_zip_file()
+
+        # Runs inside the HTTP request: no forked pool, no partial commits
+        try:
+            stats = self.env['product.image']._bulk_import_images(
+                source,
+                pattern=self.filename_pattern,
+                match_field=self.match_field,
+                batch_size=self.batch_size,
+                workers=1,
+                commit=False,
+                prewarm=self.prewarm,
+            )
+        finally:
+            if not isinstance(source, str):
+                source.close()
+
+        lines = [
+            _("%(created)s images created from %(processed)s files in %(elapsed).1fs (%(rate).1f files/s).", **stats),
+            _("%s responsive variants generated.", stats['variants']),
+        ]
+        if stats['unmatched']:
+            lines.append(_("No matching product (%s): %s", len(stats['unmatched']), ', '.join(stats['unmatched'][:50])))
+        if stats['invalid']:
+            lines.append(_("Not a readable image (%s): %s", len(stats['invalid']), ', '.join(stats['invalid'][:50])))
+        self.write({'state': 'done', 'result_message': '\n'.join(lines), 'zip_file': False})
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def _spool_zip_file(self):
+        """Decode the uploaded archive to a temporary file, chunk by chunk
+
+        The base64 value is dropped from the cache afterwards so the archive
+        is not held in memory twice during the import.
+        """
+        data = memoryview(self.zip_file)
+        spool = tempfile.TemporaryFile()
+        for offset in range(0, len(data), ZIP_DECODE_CHUNK):
+            spool.write(base64.b64decode(data[offset:offset + ZIP_DECODE_CHUNK]))
+        del data
+        self.invalidate_recordset(['zip_file'])
+        spool.seek(0)
+        return spool